@@ -0,0 +1,471 @@
+"""
+Single-pass AST analysis of code attempts: concepts and time complexity.
+
+    parse_code(code)                 -> counts from one traversal of the AST
+    estimate_time_complexity(counts) -> "O(n^2)" ...
+    detect_concepts(code, counts)    -> {concept: {"used": ..., "proficiency": ...}}
+    analyze(code)                    -> all three together
+    analyze_batch(codes)             -> analyze() over many attempts, on a process pool
+    analyze_cohort({student: [code, ...]})
+
+``parse_code`` makes exactly one walk of the tree.  A single ``_Counter``
+visitor counts loops, conditionals, functions, recursive calls, list, string,
+dict, set, queue and heap use and edge-case guards, and tracks loop-nesting
+depth and recursion fan-out on the way down, so the concept detector and
+the complexity heuristic read its counts instead of walking the tree again.
+Fan-out is the most recursive calls any one path through a function makes:
+the two calls in the branches of a binary search are one per path, the two
+halves of a merge sort are two.  Each function (and the module body) also
+gets a profile in ``counts["profiles"]``, and the complexity estimate is
+the worst of the per-profile estimates.
+The walk is iterative; code nested too deeply even for ``ast.parse`` gets an
+``error`` result like a syntax error rather than raising.
+
+Results are cached by a BLAKE2 digest of the code with LRU eviction
+(``CACHE_SIZE`` entries), so resubmitted or unchanged code is never parsed
+twice.  ``analyze_batch`` also de-duplicates by digest before handing the
+distinct sources to worker processes, which matters for attempt histories
+where most consecutive attempts differ by a line or not at all.
+"""
+
+import ast
+import hashlib
+import itertools
+import os
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+
+CACHE_SIZE = 4096
+MIN_PARALLEL = 64  # fewer distinct sources than this are analysed in-process
+
+COUNTS = ("loops", "conditionals", "functions", "recursion", "lists", "strings", "dicts",
+          "sets", "queues", "heaps", "edge_cases", "sorting", "halving", "max_loop_depth",
+          "recursive_branching", "memoized")
+
+_LIST_CALLS = frozenset(("list", "append", "extend", "insert", "pop", "index"))
+_STR_CALLS = frozenset(("str", "split", "join", "strip", "lstrip", "rstrip", "lower", "upper",
+                        "replace", "find", "startswith", "endswith", "isdigit", "isalpha", "ord", "chr"))
+_DICT_CALLS = frozenset(("dict", "defaultdict", "Counter", "OrderedDict", "items", "keys",
+                         "values", "get", "setdefault"))
+_SET_CALLS = frozenset(("set", "frozenset", "add", "discard", "union", "intersection"))
+_QUEUE_CALLS = frozenset(("deque", "appendleft", "popleft", "Queue"))
+_HEAP_CALLS = frozenset(("heappush", "heappop", "heapify", "heappushpop", "nlargest", "nsmallest"))
+_SORT_CALLS = frozenset(("sorted", "sort"))
+_MEMO_DECORATORS = frozenset(("cache", "lru_cache"))
+
+CONCEPTS = {  # concept -> count it is detected from
+    "loops": "loops",
+    "conditionals": "conditionals",
+    "recursion": "recursion",
+    "arrays": "lists",
+    "string-manipulation": "strings",
+    "hash-maps": "dicts",
+    "sets": "sets",
+    "queues": "queues",
+    "heaps": "heaps",
+    "sorting": "sorting",
+    "edge-cases": "edge_cases",
+}
+
+
+def _name(node):
+    """Bare name of a call target: ``f`` for ``f(...)``, ``m`` for ``x.m(...)``."""
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    return None
+
+
+def _is_two(node):
+    return isinstance(node, ast.Constant) and node.value == 2
+
+
+def _profile(name):
+    """What the complexity estimate needs to know about one function."""
+    return {"name": name, "recursive_calls": 0, "loops": 0, "loop_depth": 0,
+            "halving": 0, "sorting": 0, "memoized": False}
+
+
+class _Counter:
+    """One walk over a module, dispatching on node type.
+
+    The walk keeps its own stack, so deeply nested code (a long chain of
+    ``+`` is a left-leaning tree hundreds of levels deep) cannot hit the
+    interpreter's recursion limit.  Handlers that need to undo state after a
+    subtree push a callable that runs once the subtree is done.
+    """
+
+    def __init__(self):
+        self.counts = dict.fromkeys(COUNTS, 0)
+        self.stack = []
+        self.depth = 0
+        self.functions = []  # enclosing function names
+        self.paths = []  # per enclosing function: recursive calls on the path so far, per open branch
+        self.profiles = [_profile("<module>")]  # innermost last
+        self.counts["profiles"] = [self.profiles[0]]
+        self.dispatch = {
+            ast.For: self.loop, ast.AsyncFor: self.loop, ast.While: self.loop,
+            ast.ListComp: self.comprehension, ast.SetComp: self.comprehension,
+            ast.DictComp: self.comprehension, ast.GeneratorExp: self.comprehension,
+            ast.If: self.conditional, ast.IfExp: self.conditional,
+            ast.FunctionDef: self.function, ast.AsyncFunctionDef: self.function,
+            ast.Call: self.call, ast.Compare: self.compare, ast.UnaryOp: self.unary,
+            ast.BinOp: self.binop, ast.AugAssign: self.binop,
+            ast.List: self.list_, ast.Subscript: self.list_, ast.Dict: self.dict_,
+            ast.Set: self.set_, ast.JoinedStr: self.string, ast.Constant: self.constant,
+        }
+        if hasattr(ast, "Match"):
+            self.dispatch[ast.Match] = self.conditional
+
+    def visit(self, tree):
+        stack = self.stack
+        stack.append(tree)
+        while stack:
+            item = stack.pop()
+            if not isinstance(item, ast.AST):
+                item()  # leaving a subtree
+                continue
+            handler = self.dispatch.get(type(item))
+            if handler is not None:
+                handler(item)
+            else:
+                self.children(item)
+
+    def children(self, node):
+        self.stack.extend(reversed(list(ast.iter_child_nodes(node))))
+
+    def _nested(self, node, loops):
+        self.counts["loops"] += loops
+        self.depth += loops
+        self.counts["max_loop_depth"] = max(self.counts["max_loop_depth"], self.depth)
+        profile = self.profiles[-1]
+        profile["loops"] += loops
+        profile["loop_depth"] = max(profile["loop_depth"], self.depth)
+        self.stack.append(lambda: self._unnest(loops))
+        self.children(node)
+
+    def _unnest(self, loops):
+        self.depth -= loops
+
+    def loop(self, node):
+        self._nested(node, 1)
+
+    def comprehension(self, node):
+        kind = type(node)
+        if kind is ast.ListComp:
+            self.counts["lists"] += 1
+        elif kind is ast.SetComp:
+            self.counts["sets"] += 1
+        elif kind is ast.DictComp:
+            self.counts["dicts"] += 1
+        self._nested(node, len(node.generators))
+
+    def conditional(self, node):
+        self.counts["conditionals"] += 1
+        if isinstance(node, (ast.If, ast.IfExp)):
+            body, orelse = node.body, node.orelse
+            self._branches([node.test], [body if isinstance(body, list) else [body],
+                                         orelse if isinstance(orelse, list) else [orelse]])
+        else:  # match: one case runs, or none
+            self._branches([node.subject], [[case] for case in node.cases] + [[]])
+
+    def _branches(self, before, branches):
+        """Visit ``before``, then ``branches`` as alternatives: only the branch
+        with the most recursive calls counts towards the enclosing path."""
+        stack = self.stack
+        if not self.paths:
+            for nodes in [before] + branches[::-1]:
+                stack.extend(reversed(nodes))
+            return
+        frames, taken = self.paths[-1], []
+        stack.append(lambda: self._join(frames, taken))
+        for nodes in reversed(branches):
+            stack.append(lambda: taken.append(frames.pop()))
+            stack.extend(reversed(nodes))
+            stack.append(lambda: frames.append(0))
+        stack.extend(reversed(before))
+
+    @staticmethod
+    def _join(frames, taken):
+        frames[-1] += max(taken)
+
+    def function(self, node):
+        self.counts["functions"] += 1
+        profile = _profile(node.name)
+        if any(_name(d.func if isinstance(d, ast.Call) else d) in _MEMO_DECORATORS
+               for d in node.decorator_list):
+            self.counts["memoized"] += 1
+            profile["memoized"] = True
+        depth, self.depth = self.depth, 0  # a function's loops are its own
+        self.functions.append(node.name)
+        self.paths.append([0])
+        self.profiles.append(profile)
+        self.counts["profiles"].append(profile)
+        self.stack.append(lambda: self._leave_function(depth))
+        self.children(node)
+
+    def _leave_function(self, depth):
+        [branching] = self.paths.pop()
+        self.profiles.pop()["recursive_calls"] = branching
+        self.functions.pop()
+        self.depth = depth
+        self.counts["recursive_branching"] = max(self.counts["recursive_branching"], branching)
+
+    def call(self, node):
+        name = _name(node.func)
+        if name is not None:
+            if name in self.functions:
+                self.counts["recursion"] += 1
+                self.paths[self.functions.index(name)][-1] += 1
+            if name in _SORT_CALLS:
+                self.counts["sorting"] += 1
+                self.profiles[-1]["sorting"] += 1
+            if name in _LIST_CALLS:
+                self.counts["lists"] += 1
+            if name in _STR_CALLS:
+                self.counts["strings"] += 1
+            if name in _DICT_CALLS:
+                self.counts["dicts"] += 1
+            if name in _SET_CALLS:
+                self.counts["sets"] += 1
+            if name in _QUEUE_CALLS:
+                self.counts["queues"] += 1
+            if name in _HEAP_CALLS:
+                self.counts["heaps"] += 1
+        self.children(node)
+
+    def compare(self, node):
+        # len(x) == 0, len(x) < 1, x is None, x == ""
+        left, right = node.left, node.comparators[0]
+        if (isinstance(left, ast.Call) and _name(left.func) == "len"
+                and isinstance(right, ast.Constant) and right.value in (0, 1)):
+            self.counts["edge_cases"] += 1
+        elif isinstance(right, ast.Constant) and (right.value is None or right.value == ""):
+            self.counts["edge_cases"] += 1
+        self.children(node)
+
+    def unary(self, node):
+        if isinstance(node.op, ast.Not) and isinstance(node.operand, ast.Name):
+            self.counts["edge_cases"] += 1  # if not x
+        self.children(node)
+
+    def binop(self, node):
+        op, right = node.op, node.value if isinstance(node, ast.AugAssign) else node.right
+        if (isinstance(op, (ast.FloorDiv, ast.Div)) and _is_two(right)
+                or isinstance(op, ast.RShift) and isinstance(right, ast.Constant) and right.value == 1):
+            self.counts["halving"] += 1
+            self.profiles[-1]["halving"] += 1
+        self.children(node)
+
+    def list_(self, node):
+        self.counts["lists"] += 1
+        self.children(node)
+
+    def dict_(self, node):
+        self.counts["dicts"] += 1
+        self.children(node)
+
+    def set_(self, node):
+        self.counts["sets"] += 1
+        self.children(node)
+
+    def string(self, node):
+        self.counts["strings"] += 1
+        self.children(node)
+
+    def constant(self, node):
+        if isinstance(node.value, str):
+            self.counts["strings"] += 1
+
+
+# ── Cache ───────────────────────────────────────────────────────────
+_cache = OrderedDict()  # digest -> analyze() result
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+
+
+def code_digest(code):
+    return hashlib.blake2b(code.encode("utf-8"), digest_size=16).digest()
+
+
+def cache_info():
+    with _lock:
+        return {**_stats, "size": len(_cache), "maxsize": CACHE_SIZE}
+
+
+def clear_cache():
+    with _lock:
+        _cache.clear()
+        _stats.update(hits=0, misses=0)
+
+
+def _cached(digest):
+    with _lock:
+        result = _cache.get(digest)
+        if result is None:
+            _stats["misses"] += 1
+            return None
+        _cache.move_to_end(digest)
+        _stats["hits"] += 1
+        return result
+
+
+def _store(digest, result):
+    with _lock:
+        _cache[digest] = result
+        _cache.move_to_end(digest)
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+# ── Analysis ────────────────────────────────────────────────────────
+def _parse(code):
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError, RecursionError, MemoryError) as exc:  # too deep for the parser
+        counts = dict.fromkeys(COUNTS, 0)
+        counts["profiles"] = []
+        line = f" (line {exc.lineno})" if getattr(exc, "lineno", None) else ""
+        counts["error"] = f"{type(exc).__name__}: {getattr(exc, 'msg', exc)}{line}"
+        return counts
+    counter = _Counter()
+    counter.visit(tree)
+    return counter.counts
+
+
+def parse_code(code):
+    """Counts of loops, conditionals, recursion, data structures etc. in ``code``.
+
+    Code that does not parse gets all-zero counts and an ``error`` message.
+    """
+    return dict(analyze(code)["counts"])
+
+
+def _function_complexity(profile):
+    calls, depth, halving = profile["recursive_calls"], profile["loop_depth"], profile["halving"]
+    if calls:
+        if halving and calls == 1 and not depth:
+            return "O(log n)"  # binary search
+        if halving and calls >= 2:
+            return "O(n log n)"  # merge sort
+        if calls >= 2 and not profile["memoized"]:
+            return "O(2^n)"
+        return f"O(n^{depth + 1})" if depth else "O(n)"
+    if depth >= 2:
+        return f"O(n^{depth})"
+    if profile["sorting"]:
+        return "O(n log n)"
+    if depth == 1:
+        return "O(log n)" if halving and profile["loops"] == 1 else "O(n)"
+    return "O(1)"
+
+
+def _rank(estimate):
+    if estimate == "O(2^n)":
+        return (4, 0)
+    if estimate.startswith("O(n^"):
+        return (3, int(estimate[4:-1]))
+    return (("O(1)", "O(log n)", "O(n)", "O(n log n)").index(estimate), 0)
+
+
+def estimate_time_complexity(counts):
+    """Rule-based big-O estimate from ``parse_code`` counts: the worst of the
+    estimates for each function and for the module body."""
+    return max((_function_complexity(p) for p in counts["profiles"]), key=_rank, default="O(1)")
+
+
+def _proficiency(uses):
+    return "beginner" if uses <= 1 else "intermediate" if uses <= 3 else "advanced"
+
+
+def detect_concepts(code, counts=None):
+    """{concept: {"used": bool, "proficiency": ...}} for every known concept."""
+    counts = counts if counts is not None else analyze(code)["counts"]
+    return {concept: {"used": bool(counts[key]),
+                      "proficiency": _proficiency(counts[key]) if counts[key] else None}
+            for concept, key in CONCEPTS.items()}
+
+
+def _analyze_uncached(code):
+    counts = _parse(code)
+    return {"counts": counts,
+            "concepts": detect_concepts(code, counts),
+            "complexity": None if "error" in counts else estimate_time_complexity(counts)}
+
+
+def analyze(code):
+    """``counts``, ``concepts`` and ``complexity`` for ``code``, from the cache when seen before.
+
+    The result is shared with the cache; copy it before changing it.
+    """
+    digest = code_digest(code)
+    result = _cached(digest)
+    if result is None:
+        result = _analyze_uncached(code)
+        _store(digest, result)
+    return result
+
+
+# ── Batch ───────────────────────────────────────────────────────────
+def _analyze_chunk(codes):
+    return [_analyze_uncached(code) for code in codes]
+
+
+def analyze_batch(codes, workers=None, chunksize=32):
+    """``analyze()`` for every code string, in order, on a process pool.
+
+    Identical sources are analysed once, cached results are reused, and only
+    the remaining distinct sources go to the workers (in-process when there
+    are fewer than ``MIN_PARALLEL`` of them or ``workers`` is 1).  Results
+    are added to this process's cache.
+    """
+    codes = list(codes)
+    digests = [code_digest(code) for code in codes]
+    results = {}
+    todo = {}
+    for digest, code in zip(digests, codes):
+        if digest in results or digest in todo:
+            continue
+        cached = _cached(digest)
+        if cached is not None:
+            results[digest] = cached
+        else:
+            todo[digest] = code
+
+    workers = workers or os.cpu_count() or 1
+    keys, sources = list(todo), list(todo.values())
+    if workers == 1 or len(sources) < MIN_PARALLEL:
+        computed = _analyze_chunk(sources)
+    else:
+        computed = []
+        chunks = [sources[i:i + chunksize] for i in range(0, len(sources), chunksize)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = deque(pool.submit(_analyze_chunk, c) for c in itertools.islice(chunks, 2 * workers))
+            rest = iter(chunks[2 * workers:])
+            while pending:
+                computed.extend(pending.popleft().result())
+                chunk = next(rest, None)
+                if chunk is not None:
+                    pending.append(pool.submit(_analyze_chunk, chunk))
+    for digest, result in zip(keys, computed):
+        _store(digest, result)
+        results[digest] = result
+    return [results[digest] for digest in digests]
+
+
+def analyze_history(attempts, workers=1):
+    """Analyse one attempt history (code strings, oldest first)."""
+    return analyze_batch(attempts, workers=workers)
+
+
+def analyze_cohort(histories, workers=None, chunksize=32):
+    """Analyse ``{student: [code, ...]}`` in one batch; returns the same shape."""
+    histories = {student: list(codes) for student, codes in histories.items()}
+    flat = analyze_batch(itertools.chain.from_iterable(histories.values()), workers, chunksize)
+    out, pos = {}, 0
+    for student, codes in histories.items():
+        out[student] = flat[pos:pos + len(codes)]
+        pos += len(codes)
+    return out
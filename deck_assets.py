@@ -0,0 +1,133 @@
+"""
+Image asset pipeline for deck builders.
+
+Pictures are embedded at the size they are placed on the slide rather than
+at source resolution: each image is downscaled to its placed dimensions at a
+target DPI, re-encoded once, and the resulting variant is kept both in memory
+(for the rest of the run) and on disk under ``.deck_cache/assets/`` (for later
+runs and other worker processes).  Variants are keyed by the SHA-256 of the
+source bytes, so the same picture reached through different paths or decks
+maps to one variant, and python-pptx then stores it once per package.
+
+Flat-colour graphics (diagrams, UI captures) are palettised after resampling,
+which keeps them crisp at a fraction of the size.  Images already at or below
+the target pixel size, or whose variant would not come out smaller than the
+source file, are passed through untouched.
+"""
+
+import hashlib
+import io
+import os
+
+from PIL import Image
+
+EMU_PER_INCH = 914400
+DEFAULT_ASSET_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                 ".deck_cache", "assets")
+DEFAULT_DPI = 150
+JPEG_QUALITY = 85
+# Sources with at most this many distinct colours are treated as flat graphics.
+FLAT_COLOURS = 4096
+
+
+class AssetPipeline:
+    """Produces slide-sized image variants, memoised in memory and on disk."""
+
+    def __init__(self, cache_dir=DEFAULT_ASSET_DIR, dpi=DEFAULT_DPI):
+        self.cache_dir = cache_dir
+        self.dpi = dpi
+        self._sources = {}   # (path, size, mtime_ns) -> (digest, (w, h), format)
+        self._variants = {}  # variant name -> bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _source(self, path):
+        st = os.stat(path)
+        key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+        info = self._sources.get(key)
+        if info is None:
+            with open(path, "rb") as fh:
+                digest = hashlib.sha256(fh.read()).hexdigest()
+            with Image.open(path) as im:  # header only, no pixel decode
+                info = (digest, im.size, im.format)
+            self._sources[key] = info
+        return info
+
+    @staticmethod
+    def placed_size(px_size, width=None, height=None):
+        """Fill in a missing EMU dimension from the image aspect ratio."""
+        px_w, px_h = px_size
+        if width is None and height is None:
+            return None, None
+        if width is None:
+            width = int(round(height * px_w / px_h))
+        elif height is None:
+            height = int(round(width * px_h / px_w))
+        return width, height
+
+    def _encode(self, path, target_px, fmt):
+        with Image.open(path) as im:
+            flat = fmt != "JPEG" and im.getcolors(FLAT_COLOURS) is not None
+            im = im.resize(target_px, Image.LANCZOS)
+            buf = io.BytesIO()
+            if fmt == "JPEG":
+                im.convert("RGB").save(buf, "JPEG", quality=JPEG_QUALITY, optimize=True)
+            else:
+                if flat:
+                    im = im.quantize(256, method=Image.Quantize.FASTOCTREE)
+                im.save(buf, "PNG", optimize=True)
+        blob = buf.getvalue()
+        if len(blob) >= os.path.getsize(path):
+            with open(path, "rb") as fh:
+                blob = fh.read()
+        return blob
+
+    def prepare(self, path, width=None, height=None):
+        """Return ``(image_file, width, height)`` ready for ``shapes.add_picture``.
+
+        ``width``/``height`` are EMU as passed to python-pptx; when only one
+        is given the other follows the source aspect ratio.
+        """
+        digest, px_size, fmt = self._source(path)
+        width, height = self.placed_size(px_size, width, height)
+        if width is None:
+            return path, None, None
+
+        target_px = (max(1, round(width / EMU_PER_INCH * self.dpi)),
+                     max(1, round(height / EMU_PER_INCH * self.dpi)))
+        if target_px[0] >= px_size[0] or target_px[1] >= px_size[1]:
+            return path, width, height
+
+        ext = "jpg" if fmt == "JPEG" else "png"
+        name = f"{digest}-{target_px[0]}x{target_px[1]}.{ext}"
+        blob = self._variants.get(name)
+        if blob is None:
+            variant_path = os.path.join(self.cache_dir, name)
+            try:
+                with open(variant_path, "rb") as fh:
+                    blob = fh.read()
+            except OSError:
+                blob = self._encode(path, target_px, fmt)
+                tmp = f"{variant_path}.{os.getpid()}.tmp"
+                with open(tmp, "wb") as fh:
+                    fh.write(blob)
+                os.replace(tmp, variant_path)
+            self._variants[name] = blob
+        return io.BytesIO(blob), width, height
+
+
+_pipeline = None
+_cache_dir = DEFAULT_ASSET_DIR
+
+
+def set_cache_dir(path):
+    """Keep ``prepare_image``'s variants under ``path`` for the rest of this process."""
+    global _pipeline, _cache_dir
+    _pipeline, _cache_dir = None, path
+
+
+def prepare_image(path, width=None, height=None, dpi=DEFAULT_DPI):
+    """Module-level convenience wrapper around a shared ``AssetPipeline``."""
+    global _pipeline
+    if _pipeline is None or _pipeline.dpi != dpi:
+        _pipeline = AssetPipeline(_cache_dir, dpi=dpi)
+    return _pipeline.prepare(path, width, height)
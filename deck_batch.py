@@ -0,0 +1,443 @@
+"""
+Batch deck generation: render many decks in one process from JSON deck specs.
+
+A deck spec is a JSON object such as
+
+    {"name": "alice", "output": "alice.pptx",
+     "slides": ["title", "tech_deep_dive", "closing"],
+     "template": "templates/cohort.pptx"}
+
+Only one of ``name``/``output`` is required; ``slides`` defaults to the full
+deck and ``template`` to python-pptx's blank template.  A slide entry is a
+builder name, a path to a declarative slide spec (``.json``/``.yaml``) or an
+inline spec object (see ``deck_spec``).  Specs are read from a
+``.jsonl`` stream (one spec per line, ``-`` for stdin), a ``.json`` file
+holding one spec or a list of specs, or a directory of such files.  A
+malformed line of a stream becomes a failed deck named after its file and
+line number, and a malformed ``.json`` file one named after the file; the
+rest of the batch still renders.
+
+The interpreter, python-pptx import, template blobs and resolved builder
+lists are paid for once per run instead of once per deck.  With
+``--workers`` the batch is split into chunks across a process pool; each
+worker keeps its own renderer, is recycled after ``--max-decks-per-worker``
+decks to bound its memory, and results are reported in spec order exactly as
+a serial run would report them.  Unless ``--no-cache`` is given, decks and
+slides are rebuilt only when their inputs change (see ``deck_cache``).
+``--stream`` writes every slide to disk as soon as it is built, keeping
+memory flat for decks with thousands of slides (see ``deck_stream``).
+Decks are saved with ``deck_package``'s parallel writer; ``--compress-level``
+trades package size for save time.
+
+python-pptx and the deck modules are imported on first build, so a batch
+whose decks are all up to date (see ``deck_manifest``) never loads them.
+
+Usage:
+    python deck_batch.py specs.jsonl --out-dir build/decks
+    python deck_batch.py specs/ --out-dir build/decks --workers 8 --chunksize 4
+"""
+
+import argparse
+import io
+import itertools
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+
+import deck_manifest
+from deck_manifest import DEFAULT_CACHE_DIR, spec_digest
+from deck_trace import span, worker_init as _trace_worker_init
+
+_SPEC_FILES = (".json", ".yaml", ".yml")
+
+
+@dataclass(frozen=True)
+class DeckSpec:
+    name: str
+    output: str
+    slides: tuple = None  # None: the full deck (``generate_ppt.DEFAULT_SLIDES``)
+    template: str = None
+    error: str = None  # set for a spec that could not be read; it renders as a failure
+
+    @classmethod
+    def from_dict(cls, data):
+        if not isinstance(data, dict):
+            raise ValueError(f"Deck spec must be an object, got {type(data).__name__}")
+        name = data.get("name")
+        output = data.get("output")
+        if not name and not output:
+            raise ValueError("Deck spec needs a 'name' or an 'output'")
+        if not name:
+            name = os.path.splitext(os.path.basename(output))[0]
+        if not output:
+            output = f"{name}.pptx"
+        slides = data.get("slides")
+        if slides is not None and not (isinstance(slides, list)
+                                       and all(isinstance(s, (str, dict)) for s in slides)):
+            raise ValueError("Deck spec 'slides' must be a list of slide names, "
+                             "spec paths or spec objects")
+        slides = tuple(slides) if slides else None
+        return cls(name=name, output=output, slides=slides,
+                   template=data.get("template"))
+
+    @property
+    def digest(self):
+        return spec_digest(self.slides and list(self.slides), self.template)
+
+    def spec_files(self):
+        """Slide-spec files this deck reads, which its manifest must track."""
+        return [s for s in self.slides or () if isinstance(s, str) and s.endswith(_SPEC_FILES)]
+
+
+@dataclass
+class DeckResult:
+    name: str
+    output: str
+    slides: int = 0
+    seconds: float = 0.0
+    error: str = None
+    skipped: bool = False
+    overflows: tuple = ()  # deck_textfit.Overflow records flagged while building
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+# ── Spec loading ────────────────────────────────────────────────────
+def _parse_specs(text):
+    data = json.loads(text)
+    return [DeckSpec.from_dict(item) for item in (data if isinstance(data, list) else [data])]
+
+
+def _specs_from_json(text, origin):
+    try:
+        return _parse_specs(text)
+    except ValueError as exc:  # json.JSONDecodeError included
+        return [DeckSpec(name=origin, output="", error=f"bad deck spec: {exc}")]
+
+
+def _specs_from_lines(lines, origin):
+    for lineno, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        where = f"{origin}:{lineno}"
+        try:
+            specs = _parse_specs(line)
+        except ValueError as exc:
+            yield DeckSpec(name=where, output="", error=f"bad deck spec: {exc}")
+            continue
+        yield from specs
+
+
+def iter_specs(source):
+    """Yield ``DeckSpec`` objects from a JSONL/JSON file, a directory or stdin."""
+    if source == "-":
+        yield from _specs_from_lines(sys.stdin, "<stdin>")
+    elif os.path.isdir(source):
+        for entry in sorted(os.listdir(source)):
+            path = os.path.join(source, entry)
+            if entry.endswith((".json", ".jsonl")) and os.path.isfile(path):
+                yield from iter_specs(path)
+    elif source.endswith(".jsonl"):
+        with open(source, encoding="utf-8") as fh:
+            yield from _specs_from_lines(fh, source)
+    else:
+        with open(source, encoding="utf-8") as fh:
+            yield from _specs_from_json(fh.read(), source)
+
+
+# ── Rendering ───────────────────────────────────────────────────────
+class DeckRenderer:
+    """Renders deck specs while holding per-run state shared across decks.
+
+    Template files are read into memory once and every deck opens its
+    presentation from that blob; builder lists are resolved once per
+    distinct slide selection.  With a ``cache_dir`` up-to-date decks are
+    skipped and unchanged slides are restored instead of rebuilt.
+    """
+
+    def __init__(self, out_dir=None, cache_dir=None, stream=False, compress_level=6):
+        self.out_dir = out_dir
+        self.cache_dir = cache_dir
+        self.stream = stream
+        self.compress_level = compress_level
+        self._cache = None
+        self._templates = {}
+        self._plans = {}
+
+    @property
+    def cache(self):
+        if self._cache is None and self.cache_dir:
+            from deck_cache import SlideCache
+
+            self._cache = SlideCache(self.cache_dir)
+        return self._cache
+
+    def _template(self, path):
+        if path is None:
+            return None
+        blob = self._templates.get(path)
+        if blob is None:
+            with open(path, "rb") as fh:
+                blob = self._templates[path] = fh.read()
+        return io.BytesIO(blob)
+
+    def _builders(self, slides):
+        key = json.dumps(slides, sort_keys=True)
+        builders = self._plans.get(key)
+        if builders is None:
+            import generate_ppt as gp
+            from deck_spec import resolve_slide
+
+            builders = self._plans[key] = tuple(
+                resolve_slide(s) for s in slides or gp.DEFAULT_SLIDES)
+        return builders
+
+    def output_path(self, spec):
+        if self.out_dir and not os.path.isabs(spec.output):
+            return os.path.join(self.out_dir, spec.output)
+        return spec.output
+
+    def build(self, spec):
+        """Build the presentation for ``spec`` without saving it."""
+        import generate_ppt as gp
+
+        prs = gp.new_presentation(self._template(spec.template))
+        builders = self._builders(spec.slides)
+        if self.cache is not None:
+            from deck_cache import build_deck_cached
+
+            return build_deck_cached(prs, builders, self.cache)
+        return gp.build_deck(prs, builders)
+
+    def render(self, spec):
+        """Build and save one deck; failures are reported, not raised."""
+        if spec.error:
+            return DeckResult(spec.name, spec.output, error=spec.error)
+        output = self.output_path(spec)
+        start = time.perf_counter()
+        try:
+            key = None
+            if self.cache_dir:
+                manifest = deck_manifest.is_fresh(self.cache_dir, output, spec.digest)
+                if manifest is not None:
+                    return DeckResult(spec.name, output, slides=manifest.get("slides") or 0,
+                                      seconds=time.perf_counter() - start, skipped=True)
+                from deck_cache import deck_key
+
+                key = deck_key(self._builders(spec.slides), spec.template)
+                if self.cache.deck_is_current(output, key):
+                    # Inputs were touched but hash the same: refresh the manifest
+                    # so the next run takes the stat-only path again.
+                    slides = len(self._builders(spec.slides))
+                    self.cache.record_deck(output, key, slides, spec.digest, spec.spec_files())
+                    return DeckResult(spec.name, output, slides=slides,
+                                      seconds=time.perf_counter() - start, skipped=True)
+            parent = os.path.dirname(output)
+            if parent:
+                os.makedirs(parent, exist_ok=True)
+            import deck_textfit
+
+            with deck_textfit.collect() as overflows:
+                if self.stream:
+                    with span("stream"):
+                        slides = self._stream(spec, output)
+                else:
+                    from deck_package import save_package
+
+                    prs = self.build(spec)
+                    with span("save"):
+                        save_package(prs, output, self.compress_level)
+                    slides = len(prs.slides)
+            if key is not None:
+                self.cache.record_deck(output, key, slides, spec.digest, spec.spec_files())
+        except Exception as exc:  # one bad spec must not sink the batch
+            return DeckResult(spec.name, output, seconds=time.perf_counter() - start,
+                              error=f"{type(exc).__name__}: {exc}")
+        return DeckResult(spec.name, output, slides=slides,
+                          seconds=time.perf_counter() - start, overflows=tuple(overflows))
+
+    def _stream(self, spec, output):
+        from deck_stream import stream_deck
+
+        builders = self._builders(spec.slides)
+        try:
+            return stream_deck(output, builders, self._template(spec.template), self.cache)
+        except BaseException:
+            if os.path.exists(output):  # never leave a truncated package behind
+                os.remove(output)
+            raise
+
+
+def render_batch(specs, out_dir=None, cache_dir=None, stream=False, compress_level=6):
+    """Render every spec in-process, yielding a ``DeckResult`` per deck."""
+    renderer = DeckRenderer(out_dir, cache_dir, stream, compress_level)
+    for spec in specs:
+        yield renderer.render(spec)
+
+
+# ── Parallel rendering ──────────────────────────────────────────────
+_worker_renderer = None
+
+
+def _init_worker(out_dir, cache_dir, stream, compress_level):
+    global _worker_renderer
+    _trace_worker_init()
+    _worker_renderer = DeckRenderer(out_dir, cache_dir, stream, compress_level)
+
+
+def _render_chunk(specs):
+    return [_worker_renderer.render(spec) for spec in specs]
+
+
+def _chunked(iterable, size):
+    it = iter(iterable)
+    while chunk := list(itertools.islice(it, size)):
+        yield chunk
+
+
+def _render_alone(spec, initargs):
+    """Render one deck in a pool of its own, so a crash can only be its own."""
+    with ProcessPoolExecutor(max_workers=1, initializer=_init_worker, initargs=initargs) as solo:
+        return solo.submit(_render_chunk, [spec]).result()
+
+
+def render_parallel(specs, out_dir=None, workers=None, chunksize=4,
+                    max_decks_per_worker=200, cache_dir=None, stream=False,
+                    compress_level=6):
+    """Render specs across a process pool, yielding results in spec order.
+
+    At most ``2 * workers`` chunks are in flight, so the spec stream is
+    consumed lazily and finished presentations never pile up in the parent.
+    A dead worker breaks the whole pool, failing every chunk in flight on
+    it; the batch carries on in a fresh pool, where those chunks are re-run
+    deck by deck.  A deck that breaks the pool again is re-run in a pool of
+    its own, so only the deck that kills its worker is reported as failed.
+    """
+    if chunksize < 1:
+        raise ValueError(f"chunksize must be at least 1, got {chunksize}")
+    workers = workers or os.cpu_count() or 1
+    max_tasks = max(1, max_decks_per_worker // chunksize) if max_decks_per_worker else None
+    initargs = (out_dir, cache_dir, stream, compress_level)
+
+    def new_pool():
+        return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                   initargs=initargs, max_tasks_per_child=max_tasks)
+
+    def submit(chunk, retry=False):
+        nonlocal pool
+        try:
+            future = pool.submit(_render_chunk, chunk)
+        except BrokenProcessPool:  # a worker died since the last result was taken
+            pool.shutdown(wait=False, cancel_futures=True)
+            pool = new_pool()
+            future = pool.submit(_render_chunk, chunk)
+        return chunk, pool, future, retry
+
+    def failed(chunk, exc):
+        return [DeckResult(spec.name, spec.output,
+                           error=f"worker failed: {type(exc).__name__}: {exc}")
+                for spec in chunk]
+
+    pending = deque()
+    pool = new_pool()
+    try:
+        chunks = _chunked(specs, chunksize)
+        for chunk in itertools.islice(chunks, 2 * workers):
+            pending.append(submit(chunk))
+        while pending:
+            chunk, owner, future, retry = pending.popleft()
+            try:
+                results = future.result()
+            except BrokenProcessPool as exc:
+                if owner is pool:
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    pool = new_pool()
+                if not retry:
+                    # Any chunk in flight may have killed the worker: re-run this one deck by deck.
+                    pending.extendleft(submit([spec], retry=True) for spec in reversed(chunk))
+                    continue
+                try:
+                    results = _render_alone(chunk[0], initargs)
+                except Exception as exc:
+                    results = failed(chunk, exc)
+            except Exception as exc:
+                results = failed(chunk, exc)
+            next_chunk = next(chunks, None)
+            if next_chunk is not None:
+                pending.append(submit(next_chunk))
+            yield from results
+    finally:
+        pool.shutdown()
+
+
+def report(results, stream=sys.stdout):
+    """Print one line per deck plus a summary; returns the failure count."""
+    done = failed = 0
+    total = 0.0
+    for res in results:
+        total += res.seconds
+        if res.skipped:
+            done += 1
+            print(f"⏭️  {res.name}: {res.output} is up to date", file=stream)
+        elif res.ok:
+            done += 1
+            print(f"✅ {res.name}: {res.output} ({res.slides} slides, {res.seconds:.2f}s)",
+                  file=stream)
+            if res.overflows:
+                from deck_textfit import describe
+
+                print(f"⚠️  {res.name}: {len(res.overflows)} text box(es) overflow", file=stream)
+                for overflow in res.overflows:
+                    print(f"      {describe(overflow)}", file=stream)
+        else:
+            failed += 1
+            print(f"❌ {res.name}: {res.error}", file=stream)
+    print(f"   Decks: {done} ok, {failed} failed, {total:.2f}s build time", file=stream)
+    return failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("source", help="JSONL/JSON spec file, directory of specs, or '-' for stdin")
+    parser.add_argument("--out-dir", default=None,
+                        help="directory for relative 'output' paths (default: cwd)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="worker processes; 1 renders in-process, 0 uses every core")
+    parser.add_argument("--chunksize", type=int, default=4,
+                        help="decks handed to a worker at a time (default: 4)")
+    parser.add_argument("--max-decks-per-worker", type=int, default=200,
+                        help="recycle a worker after this many decks (0: never)")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR,
+                        help=f"rebuild cache location (default: {DEFAULT_CACHE_DIR})")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="always rebuild every deck and slide")
+    parser.add_argument("--stream", action="store_true",
+                        help="write slides as they are built (flat memory for huge decks)")
+    parser.add_argument("--compress-level", type=int, default=6, choices=range(10),
+                        metavar="0-9", help="deflate level: 1 fastest, 9 smallest (default: 6)")
+    args = parser.parse_args(argv)
+
+    specs = iter_specs(args.source)
+    cache_dir = None if args.no_cache else args.cache_dir
+    if args.workers == 1:
+        results = render_batch(specs, args.out_dir, cache_dir, args.stream, args.compress_level)
+    else:
+        results = render_parallel(specs, args.out_dir, workers=args.workers or None,
+                                  chunksize=max(1, args.chunksize),
+                                  max_decks_per_worker=args.max_decks_per_worker,
+                                  cache_dir=cache_dir, stream=args.stream,
+                                  compress_level=args.compress_level)
+    failed = report(results)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,256 @@
+"""
+Benchmark suite for deck generation.
+
+Cases:
+  slide:<name>         one slide from each ``slide_*`` builder
+  deck:full            the full nine-slide deck that ``main()`` produces
+  stress:cards_1k      1 000 ``add_card`` calls (10 cards on each of 100 slides)
+  stress:bullets_10k   10 000 bullets (100 frames of 100 bullets)
+  stress:images        200 pictures: 100 distinct generated PNGs plus the
+                       architecture diagram placed 100 times
+
+Every case builds into memory and saves to an in-memory buffer with
+``deck_package.save_package()`` at the settings ``main()`` writes the deck
+with (so ``wall_s`` times the save the deck really gets), and image
+variants go to a temporary directory instead of ``.deck_cache/assets``, so
+no repo files are touched and neither cache is involved.  Each case runs in
+a forked child process, so peak memory is the case's own high-water mark
+rather than whatever earlier cases left behind.
+
+Usage:
+  python deck_bench.py run [-k PATTERN] [--repeat 5] [-o results.json]
+  python deck_bench.py compare baseline.json results.json [--threshold 0.10]
+
+``compare`` exits non-zero when a metric of any case regressed by more than
+the threshold (a fraction; 0.10 = 10 %) or a baseline case is missing from
+the results.
+"""
+
+import argparse
+import fnmatch
+import io
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows: fall back to Python-heap tracking
+    resource = None
+
+import pptx
+from pptx.util import Inches
+
+import generate_ppt as gp
+from deck_package import save_package
+
+METRICS = ("wall_s", "peak_mem_kb", "output_bytes")
+
+
+# ── Cases ───────────────────────────────────────────────────────────
+def _save(prs):
+    buf = io.BytesIO()
+    save_package(prs, buf)  # as generate_ppt.main() saves: default level, STORED_EXTS stored
+    return buf.tell()
+
+
+def _slide_case(builder):
+    def run():
+        prs = gp.new_presentation()
+        builder(prs)
+        return _save(prs)
+    return run
+
+
+def _full_deck():
+    return _save(gp.build_deck(gp.new_presentation()))
+
+
+def _stress_cards():
+    prs = gp.new_presentation()
+    for s in range(100):
+        slide = prs.slides.add_slide(prs.slide_layouts[6])
+        gp.set_slide_bg(slide, gp.BG_DARK)
+        for i in range(10):
+            row, col = divmod(i, 5)
+            gp.add_card(slide, Inches(0.3 + col * 2.6), Inches(0.5 + row * 3.4),
+                        Inches(2.4), Inches(3.2), f"Card {s}.{i}",
+                        ["First point", "Second point", "Third point"])
+    return _save(prs)
+
+
+def _stress_bullets():
+    prs = gp.new_presentation()
+    items = [f"Bullet point number {i}" for i in range(100)]
+    for _ in range(100):
+        slide = prs.slides.add_slide(prs.slide_layouts[6])
+        gp.add_bullet_frame(slide, Inches(0.5), Inches(0.5),
+                            Inches(12), Inches(6.5), items, font_size=8)
+    return _save(prs)
+
+
+def _stress_images():
+    from PIL import Image
+
+    prs = gp.new_presentation()
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i in range(100):
+            path = os.path.join(tmp, f"img{i}.png")
+            Image.new("RGB", (640, 360), (i, 255 - i, (i * 7) % 256)).save(path)
+            paths.append(path)
+        for i, path in enumerate(paths):
+            slide = prs.slides.add_slide(prs.slide_layouts[6])
+            gp.add_picture(slide, path, Inches(0.5), Inches(0.5), width=Inches(4))
+            gp.add_picture(slide, gp.ARCH_IMG, Inches(5), Inches(0.5), width=Inches(8))
+        return _save(prs)
+
+
+def all_cases():
+    cases = {f"slide:{name}": _slide_case(builder)
+             for name, builder in gp.SLIDE_BUILDERS.items()}
+    cases["deck:full"] = _full_deck
+    cases["stress:cards_1k"] = _stress_cards
+    cases["stress:bullets_10k"] = _stress_bullets
+    cases["stress:images"] = _stress_images
+    return cases
+
+
+# ── Measurement ─────────────────────────────────────────────────────
+def _measure(name, repeat, conn):
+    import deck_assets
+
+    assets = tempfile.TemporaryDirectory(prefix="deck_bench_assets_")
+    try:
+        deck_assets.set_cache_dir(assets.name)
+        case = all_cases()[name]
+        if resource is not None:
+            base_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        else:
+            tracemalloc.start()
+        case()  # warm-up (template parse, asset variants); counts toward peak memory
+        times = []
+        size = 0
+        for _ in range(repeat):
+            start = time.perf_counter()
+            size = case()
+            times.append(time.perf_counter() - start)
+        if resource is not None:
+            peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - base_kb
+        else:
+            peak_kb = tracemalloc.get_traced_memory()[1] // 1024
+        conn.send({"wall_s": statistics.median(times), "min_s": min(times),
+                   "peak_mem_kb": max(0, peak_kb), "output_bytes": size})
+    except Exception as exc:
+        conn.send({"error": f"{type(exc).__name__}: {exc}"})
+    finally:
+        conn.close()
+        assets.cleanup()
+
+
+def run_case(name, repeat=5):
+    """Run one case in a fresh child process and return its metrics."""
+    methods = multiprocessing.get_all_start_methods()
+    ctx = multiprocessing.get_context("fork" if "fork" in methods else "spawn")
+    parent, child = ctx.Pipe(duplex=False)
+    proc = ctx.Process(target=_measure, args=(name, repeat, child))
+    proc.start()
+    child.close()
+    result = parent.recv() if parent.poll(None) else {"error": "no result"}
+    proc.join()
+    return result
+
+
+def run(patterns=None, repeat=5, stream=sys.stdout):
+    names = [n for n in all_cases()
+             if not patterns or any(fnmatch.fnmatch(n, p) for p in patterns)]
+    results = {}
+    print(f"{'case':<34}{'median s':>10}{'min s':>10}{'peak MB':>10}{'out KB':>10}", file=stream)
+    for name in names:
+        res = results[name] = run_case(name, repeat)
+        if "error" in res:
+            print(f"{name:<34}  ❌ {res['error']}", file=stream)
+            continue
+        print(f"{name:<34}{res['wall_s']:>10.4f}{res['min_s']:>10.4f}"
+              f"{res['peak_mem_kb'] / 1024:>10.1f}{res['output_bytes'] / 1024:>10.1f}",
+              file=stream)
+    return {
+        "meta": {"python": platform.python_version(), "python_pptx": pptx.__version__,
+                 "platform": platform.platform(), "repeat": repeat,
+                 "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")},
+        "cases": results,
+    }
+
+
+def compare(baseline, current, threshold=0.10, metrics=METRICS, stream=sys.stdout):
+    """Print per-metric deltas; return the list of regressions over ``threshold``.
+
+    A case in ``baseline`` that ``current`` lacks counts as a regression.
+    """
+    regressions = []
+    for name in baseline["cases"]:
+        if name not in current["cases"]:
+            regressions.append((name, "missing", None))
+            print(f"❌ {name}: missing from the results", file=stream)
+    for name, cur in current["cases"].items():
+        base = baseline["cases"].get(name)
+        if base is None or "error" in base:
+            continue
+        if "error" in cur:
+            regressions.append((name, "error", cur["error"]))
+            print(f"❌ {name}: {cur['error']}", file=stream)
+            continue
+        for metric in metrics:
+            old, new = base.get(metric), cur.get(metric)
+            if not old or new is None:
+                continue
+            delta = (new - old) / old
+            flag = "❌" if delta > threshold else "  "
+            print(f"{flag} {name:<32} {metric:<13} {old:>12.4g} → {new:<12.4g} {delta:+7.1%}",
+                  file=stream)
+            if delta > threshold:
+                regressions.append((name, metric, delta))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Deck generation benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_run = sub.add_parser("run", help="run benchmark cases")
+    p_run.add_argument("-k", dest="patterns", action="append",
+                       help="only cases matching this glob (repeatable), e.g. 'slide:*'")
+    p_run.add_argument("--repeat", type=int, default=5)
+    p_run.add_argument("-o", "--output", help="write results JSON here")
+    p_cmp = sub.add_parser("compare", help="compare results against a baseline")
+    p_cmp.add_argument("baseline")
+    p_cmp.add_argument("current")
+    p_cmp.add_argument("--threshold", type=float, default=0.10,
+                       help="allowed regression as a fraction (default: 0.10)")
+    p_cmp.add_argument("--metrics", default=",".join(METRICS),
+                       help=f"comma-separated metrics to check (default: {','.join(METRICS)})")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        results = run(args.patterns, max(1, args.repeat))
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as fh:
+                json.dump(results, fh, indent=2)
+        return 1 if any("error" in r for r in results["cases"].values()) else 0
+
+    with open(args.baseline, encoding="utf-8") as fh:
+        baseline = json.load(fh)
+    with open(args.current, encoding="utf-8") as fh:
+        current = json.load(fh)
+    regressions = compare(baseline, current, args.threshold, args.metrics.split(","))
+    print(f"   {len(regressions)} regression(s) over {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
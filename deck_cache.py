@@ -0,0 +1,353 @@
+"""
+Content-hash rebuild cache for decks and individual slides.
+
+Every slide builder gets a fingerprint covering everything it renders from:
+its own source (the slide's data literals live there), the helpers it calls,
+the module constants it reads (palette colours such as ``ACCENT`` and
+``BG_DARK``, geometry such as ``SLIDE_W``) and the bytes of any asset file a
+constant points at (``ARCH_IMG``).  Dependencies are found by walking the
+names each builder's code object references, so adding a colour or an image
+to a builder needs no extra bookkeeping.  References through a project
+module (``deck_textfit.fit``) are followed like direct ones, and project
+classes (``deck_styles.TextStyle``) are hashed by their source.
+
+* A deck whose fingerprint matches the manifest recorded for its output
+  file, and whose output is still the file we wrote, is skipped entirely.
+* Otherwise each slide is looked up by its fingerprint; hits are restored
+  from the cached slide XML (plus any images it embeds) instead of running
+  the builder, misses are built and stored.
+
+Cache entries live under ``.deck_cache/``.  Once everything stored there
+grows past ``max_bytes`` the least-recently-used files are evicted, whatever
+wrote them; the size is kept as a running total, so the directory is only
+rescanned when that total crosses the limit.
+
+A slide entry holds every slide its builder appended (usually one) and the
+text overflows flagged while they were built; restoring it flags them again,
+so a cached build reports the same overflows as a fresh one.
+"""
+
+import functools
+import hashlib
+import inspect
+import io
+import json
+import os
+import sys
+import types
+import zipfile
+from dataclasses import is_dataclass
+
+import pptx
+from lxml import etree
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.oxml import parse_xml
+
+import deck_manifest
+import deck_textfit
+from deck_manifest import DEFAULT_CACHE_DIR, PROJECT_DIR, file_digest
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+_R_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+# Bump when the entry layout below changes so stale entries are never read.
+_FORMAT = "2"
+
+
+# ── Fingerprints ────────────────────────────────────────────────────
+_func_digests = {}
+
+
+def _code_names(code):
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            names |= _code_names(const)
+    return names
+
+
+def _value_token(value):
+    if isinstance(value, str) and os.path.isfile(value):
+        return f"file:{file_digest(value)}"
+    if isinstance(value, str) and os.path.isabs(value) and os.path.splitext(value)[1]:
+        deck_manifest.note_missing(value)  # an absent asset: its arrival must rebuild
+    if isinstance(value, (str, int, float, bool, tuple, type(None))):
+        return repr(value)
+    if is_dataclass(value) and not isinstance(value, type):  # e.g. named TextStyles
+        return repr(value)
+    return None
+
+
+def _in_project(path):
+    # generated code (dataclass __init__, namedtuple __new__) is "<string>", not a file here
+    return (bool(path) and not path.startswith("<")
+            and os.path.dirname(os.path.abspath(path)) == PROJECT_DIR)
+
+
+def _is_project_function(value):
+    if isinstance(value, functools._lru_cache_wrapper):
+        value = value.__wrapped__
+    if not isinstance(value, types.FunctionType):
+        return False
+    return _in_project(getattr(value.__code__, "co_filename", ""))
+
+
+def _is_project_class(value):
+    module = sys.modules.get(getattr(value, "__module__", None))
+    return isinstance(value, type) and _in_project(getattr(module, "__file__", None))
+
+
+def _is_project_module(value):
+    return isinstance(value, types.ModuleType) and _in_project(getattr(value, "__file__", None))
+
+
+def _token(value):
+    if _is_project_function(value):
+        return function_digest(value)
+    if _is_project_class(value):
+        return class_digest(value)
+    return _value_token(value)
+
+
+def class_digest(cls):
+    """Fingerprint a project class: its source and whatever its methods read."""
+    digest = _func_digests.get(cls)
+    if digest is not None:
+        return digest
+    _func_digests[cls] = "<cycle>"
+    try:
+        source = inspect.getsource(cls)
+    except (OSError, TypeError):  # made at runtime, e.g. a namedtuple
+        source = repr((cls.__qualname__, getattr(cls, "_fields", None)))
+    h = hashlib.sha256(source.encode("utf-8"))
+    for name, value in sorted(vars(cls).items()):
+        value = getattr(value, "__func__", getattr(value, "fget", value))  # static/class methods, properties
+        if _is_project_function(value):
+            h.update(f"\0{name}={function_digest(value)}".encode("utf-8"))
+    digest = _func_digests[cls] = h.hexdigest()
+    return digest
+
+
+def function_digest(func):
+    """Fingerprint ``func`` together with the module-level state it reads.
+
+    Functions and classes defined in this project (``generate_ppt`` and the
+    ``deck_*`` modules) are followed recursively, whether named directly or
+    as attributes of a project module; library callables are covered by the
+    python-pptx version in the deck key.
+    """
+    func = inspect.unwrap(func)  # look through tracing wrappers
+    digest = _func_digests.get(func)
+    if digest is not None:
+        return digest
+    _func_digests[func] = "<cycle>"  # guards mutual recursion
+    h = hashlib.sha256(inspect.getsource(func).encode("utf-8"))
+    h.update(repr(func.__defaults__).encode("utf-8"))
+    names = sorted(_code_names(func.__code__))
+    for name in names:
+        value = func.__globals__.get(name)
+        if _is_project_module(value):
+            # ``module.attr``: attribute names sit in co_names next to the module's
+            for attr in names:
+                token = _token(getattr(value, attr)) if hasattr(value, attr) else None
+                if token is not None:
+                    h.update(f"\0{name}.{attr}={token}".encode("utf-8"))
+            continue
+        token = _token(value)
+        if token is not None:
+            h.update(f"\0{name}={token}".encode("utf-8"))
+    digest = _func_digests[func] = h.hexdigest()
+    return digest
+
+
+def slide_key(builder):
+    """Cache key for one slide; builders that aren't plain functions (such as
+    spec-driven slides) supply their own ``fingerprint()``."""
+    fingerprint = getattr(builder, "fingerprint", None)
+    digest = fingerprint() if fingerprint else function_digest(builder)
+    return hashlib.sha256(
+        f"{_FORMAT}|{pptx.__version__}|{builder.__qualname__}|{digest}".encode("utf-8")
+    ).hexdigest()
+
+
+def deck_key(builders, template=None):
+    h = hashlib.sha256(f"{_FORMAT}|{pptx.__version__}".encode("utf-8"))
+    h.update(f"|template:{file_digest(template) if template else '-'}".encode("utf-8"))
+    for builder in builders:
+        h.update(slide_key(builder).encode("ascii"))
+    return h.hexdigest()
+
+
+def _adopt(slide, element):
+    """Move a cached ``p:sld`` into ``slide``'s own element.  The slide's
+    ``cSld`` and ``spTree`` are kept: ``slide`` and ``slide.shapes`` hold them."""
+    own = slide._element
+    cSld, tree = own.cSld, own.cSld.spTree
+    new_cSld = element.cSld
+    new_tree = new_cSld.spTree
+    tree[:] = list(new_tree)
+    new_cSld.replace(new_tree, tree)
+    cSld[:] = list(new_cSld)
+    cSld.attrib.update(new_cSld.attrib)
+    element.replace(new_cSld, cSld)
+    own[:] = list(element)
+    own.attrib.update(element.attrib)
+
+
+# ── Cache store ─────────────────────────────────────────────────────
+class SlideCache:
+    """On-disk store of slide XML parts and deck manifests with LRU eviction."""
+
+    def __init__(self, root=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._bytes = None  # running total of the cache's size, read on the first store
+        os.makedirs(os.path.join(root, "slides"), exist_ok=True)
+        os.makedirs(os.path.join(root, "decks"), exist_ok=True)
+
+    def _slide_path(self, key):
+        return os.path.join(self.root, "slides", f"{key}.zip")
+
+    @staticmethod
+    def _write_atomic(path, data):
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp, path)
+
+    # Deck manifests ------------------------------------------------
+    def deck_is_current(self, output, key):
+        manifest = deck_manifest.load(self.root, output)
+        return (manifest is not None and manifest.get("key") == key
+                and deck_manifest.output_matches(manifest, output))
+
+    def record_deck(self, output, key, slides=None, spec=None, inputs=()):
+        """Write the manifest for ``output``; ``inputs`` adds files (such as
+        slide specs) that went into ``key`` without passing ``file_digest``."""
+        inputs = deck_manifest.hashed_paths() | {os.path.abspath(p) for p in inputs}
+        deck_manifest.write(self.root, output, key, slides, spec, inputs)
+
+    # Slide entries -------------------------------------------------
+    def restore(self, key, prs):
+        """Append the cached slides of ``key`` to ``prs``; False on a miss."""
+        path = self._slide_path(key)
+        try:
+            with zipfile.ZipFile(path) as zf:
+                meta = json.loads(zf.read("meta.json"))
+                entries = [(slide, zf.read(f"slide{i}.xml"),
+                            {rid: zf.read(f"media/{i}/{rid}") for rid in slide["images"]})
+                           for i, slide in enumerate(meta["slides"])]
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+            self.misses += 1
+            return False
+
+        for slide_meta, xml, images in entries:
+            slide = prs.slides.add_slide(prs.slide_layouts[slide_meta["layout"]])
+            part = slide.part
+            deck_textfit.replay(deck_textfit.Overflow(part.partname.idx, *o)
+                                for o in slide_meta["overflows"])
+            rid_map = {}
+            for rid, blob in images.items():
+                _, rid_map[rid] = part.get_or_add_image_part(io.BytesIO(blob))
+            element = parse_xml(xml)
+            if rid_map:
+                for el in element.iter():
+                    for attr, value in el.attrib.items():
+                        if attr.startswith(f"{{{_R_NS}}}") and value in rid_map:
+                            el.set(attr, rid_map[value])
+            _adopt(slide, element)
+        os.utime(path)  # LRU recency
+        self.hits += 1
+        return True
+
+    def store(self, key, prs, slides, overflows=()):
+        """Cache ``slides`` (those one builder appended) and the overflows
+        flagged building them; slides with relationships we can't replay
+        are skipped."""
+        layouts = list(prs.slide_layouts)
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+            meta = []
+            for i, slide in enumerate(slides):
+                images = {}
+                for rid, rel in slide.part.rels.items():
+                    if rel.reltype == RT.IMAGE and not rel.is_external:
+                        images[rid] = rel.target_part.blob
+                    elif rel.reltype != RT.SLIDE_LAYOUT:
+                        return False
+                idx = slide.part.partname.idx
+                meta.append({
+                    "layout": layouts.index(slide.slide_layout),
+                    "images": sorted(images),
+                    # the slide number is the restore's
+                    "overflows": [list(o[1:]) for o in overflows if o.slide == idx],
+                })
+                zf.writestr(f"slide{i}.xml", etree.tostring(slide.part._element))
+                for rid, blob in images.items():
+                    zf.writestr(f"media/{i}/{rid}", blob)
+            zf.writestr("meta.json", json.dumps({"slides": meta}))
+        data = buf.getvalue()
+        self._write_atomic(self._slide_path(key), data)
+        self._account(len(data))
+        return True
+
+    # Eviction ------------------------------------------------------
+    def _files(self):
+        """(mtime, size, path) of every file under the cache root, oldest first."""
+        files = []
+        for dirpath, _, names in os.walk(self.root):
+            for name in names:
+                if name.endswith(".tmp"):  # being written by someone
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                files.append((st.st_mtime_ns, st.st_size, path))
+        files.sort()
+        return files
+
+    def _account(self, size):
+        """Add ``size`` written bytes to the running total; evict once it passes ``max_bytes``."""
+        if self._bytes is None:
+            self._bytes = sum(size for _, size, _ in self._files())
+        self._bytes += size
+        if self._bytes > self.max_bytes:
+            self.evict()
+
+    def evict(self):
+        """Drop least-recently-used files under the cache root until it is
+        under ``max_bytes``."""
+        files = self._files()
+        total = sum(size for _, size, _ in files)
+        for _, size, path in files:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+        self._bytes = total
+
+
+def build_slide_cached(prs, builder, cache):
+    """Append ``builder``'s slides to ``prs``, from the cache when possible."""
+    key = slide_key(builder)
+    if not cache.restore(key, prs):
+        before = len(prs.slides)
+        with deck_textfit.collect() as overflows:
+            builder(prs)
+        deck_textfit.replay(overflows)
+        added = [prs.slides[i] for i in range(before, len(prs.slides))]
+        cache.store(key, prs, added, overflows)
+
+
+def build_deck_cached(prs, builders, cache):
+    """Like ``generate_ppt.build_deck`` but reusing cached slides where possible."""
+    for builder in builders:
+        build_slide_cached(prs, builder, cache)
+    return prs
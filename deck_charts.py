@@ -0,0 +1,358 @@
+"""
+Native chart and heatmap-table slides fed from columnar NumPy data.
+
+python-pptx's ``CategoryChartData`` turns every data point into Python
+objects twice over: once as a ``<c:pt>`` element of the chart XML and once
+as an ``xlsxwriter`` cell of the embedded workbook.  For a cohort report
+with tens of thousands of points that dominates the build.  Here each
+column stays a NumPy array end to end: values are formatted with one
+``astype(str)`` per column and the point, cell and row markup is assembled
+with vectorised string operations, so the only per-point work is inside
+NumPy and lxml.
+
+* ``add_bar_chart`` / ``add_line_chart`` take ``categories`` (anything
+  ``np.asarray`` accepts) and ``series``, either a mapping of name to column
+  or a 2-D array of shape (series, points) with ``names``.  NaN and
+  infinite values become gaps.  The chart skeleton (axes, grouping, series
+  headers) still comes from python-pptx's own XML writer, so every
+  bar/column/line variant it supports works.
+* ``add_heatmap_table`` writes a native table whose cells are coloured on
+  a ramp between two palette colours.
+* ``chart_slide`` and ``heatmap_slide`` wrap them in a titled slide in the
+  deck's style.
+"""
+
+import io
+import zipfile
+
+import numpy as np
+from lxml import etree
+from pptx.chart.data import CategoryChartData
+from pptx.chart.xmlwriter import ChartXmlWriter
+from pptx.enum.chart import XL_CHART_TYPE, XL_LEGEND_POSITION, XL_MARKER_STYLE
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import nsdecls, qn
+from pptx.util import Inches, Pt
+
+import generate_ppt as gp
+
+SERIES_COLORS = (gp.ACCENT, gp.ACCENT2, gp.GREEN_ACC, gp.ORANGE_ACC, gp.RED_ACCENT, gp.MUTED)
+MAX_TABLE_CELLS = 75  # PowerPoint's limit on table rows and columns
+
+_BAR_TYPES = {
+    (False, False): XL_CHART_TYPE.COLUMN_CLUSTERED,
+    (False, True): XL_CHART_TYPE.COLUMN_STACKED,
+    (True, False): XL_CHART_TYPE.BAR_CLUSTERED,
+    (True, True): XL_CHART_TYPE.BAR_STACKED,
+}
+_HEX = np.array([f"{i:02X}" for i in range(256)])
+_ROWS_PER_BLOCK = 4096  # bounds the temporary string arrays for very long sheets
+
+
+# ── Vectorised formatting ───────────────────────────────────────────
+def _escape(strings):
+    # Replacements go in as arrays: a str would be cast to the input's width
+    # (so "&lt;" becomes "&lt" against a 3-character label).
+    if not strings.size:
+        return strings
+    for char, entity in (("&", "&amp;"), ("<", "&lt;"), (">", "&gt;")):
+        strings = np.char.replace(strings, char, np.asarray(entity))
+    return strings
+
+
+def _cat(*parts):
+    """Element-wise concatenation of string arrays and scalars."""
+    out = parts[0]
+    for part in parts[1:]:
+        out = np.char.add(out, part)
+    return out
+
+
+def _column_letter(n):
+    """Spreadsheet column name for 0-based column ``n`` (0 -> A)."""
+    letters = ""
+    n += 1
+    while n:
+        n, rem = divmod(n - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def _columns(series, names=None):
+    """Normalise ``series`` to (names, list of float64 columns)."""
+    if hasattr(series, "keys"):
+        names = list(series.keys())
+        columns = [np.asarray(series[name], dtype=np.float64) for name in names]
+    else:
+        data = np.asarray(series, dtype=np.float64)
+        if data.ndim == 1:
+            data = data[np.newaxis]
+        columns = list(data)
+        names = list(names) if names is not None else [f"Series {i + 1}" for i in range(len(columns))]
+    if len(names) != len(columns):
+        raise ValueError(f"{len(columns)} series but {len(names)} names")
+    return [str(n) for n in names], columns
+
+
+def _points(values, finite=None):
+    """``<c:pt>`` elements for ``values`` (a string array), skipping masked-out points."""
+    idx = np.arange(len(values))
+    if finite is not None:
+        idx, values = idx[finite], values[finite]
+    return "".join(_cat('<c:pt idx="', idx.astype(str), '"><c:v>', values, "</c:v></c:pt>").tolist())
+
+
+# ── Embedded workbook ───────────────────────────────────────────────
+_XLSX_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+        '</Types>'),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'),
+    "xl/workbook.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Sheet1" sheetId="1" r:id="rId1"/></sheets></workbook>'),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+        '<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>'
+        '</Relationships>'),
+    "xl/styles.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+        '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+        '<fills count="1"><fill><patternFill patternType="none"/></fill></fills>'
+        '<borders count="1"><border/></borders>'
+        '<cellStyleXfs count="1"><xf/></cellStyleXfs>'
+        '<cellXfs count="1"><xf xfId="0"/></cellXfs></styleSheet>'),
+}
+
+
+def _sheet_xml(categories, names, columns):
+    """Sheet1 with categories in column A and one column per series."""
+    out = ['<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+           '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+           '<sheetData><row r="1">']
+    for j, name in enumerate(names, 1):
+        out.append(f'<c r="{_column_letter(j)}1" t="inlineStr"><is><t>'
+                   f'{_escape(np.array([name]))[0]}</t></is></c>')
+    out.append("</row>")
+    letters = [_column_letter(j) for j in range(len(columns) + 1)]
+    for start in range(0, len(categories), _ROWS_PER_BLOCK):
+        stop = start + _ROWS_PER_BLOCK
+        rows = np.arange(start + 2, start + 2 + len(categories[start:stop])).astype(str)
+        cells = _cat('<c r="A', rows, '" t="inlineStr"><is><t>', categories[start:stop], "</t></is></c>")
+        for letter, column in zip(letters[1:], columns):
+            values = column[start:stop]
+            cell = _cat('<c r="', letter, rows, '"><v>', values.astype(str), "</v></c>")
+            cells = _cat(cells, np.where(np.isfinite(values), cell, ""))
+        out.extend(_cat('<row r="', rows, '">', cells, "</row>").tolist())
+    out.append("</sheetData></worksheet>")
+    return "".join(out)
+
+
+def _xlsx_blob(categories, names, columns):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, xml in _XLSX_PARTS.items():
+            zf.writestr(zipfile.ZipInfo(name), xml)
+        zf.writestr(zipfile.ZipInfo("xl/worksheets/sheet1.xml"),
+                    _sheet_xml(categories, names, columns), zipfile.ZIP_DEFLATED)
+    return buf.getvalue()
+
+
+# ── Chart data ──────────────────────────────────────────────────────
+class ArrayChartData:
+    """Chart data held as NumPy columns, for ``slide.shapes.add_chart``.
+
+    Provides the two things python-pptx asks chart data for: the chart XML
+    for a chart type and the embedded workbook blob.
+    """
+
+    def __init__(self, categories, series, names=None, number_format="General"):
+        self.categories = _escape(np.asarray(categories).astype(str))
+        self.names, self.columns = _columns(series, names)
+        for name, column in zip(self.names, self.columns):
+            if column.shape != self.categories.shape:
+                raise ValueError(f"series {name!r} has {column.shape[0]} values "
+                                 f"for {self.categories.shape[0]} categories")
+        self.number_format = number_format
+
+    def _skeleton(self, chart_type):
+        """python-pptx's XML for this chart type with one placeholder point per series."""
+        data = CategoryChartData()
+        data.categories = ["-"]
+        for name in self.names:
+            data.add_series(name, (0,))
+        return etree.fromstring(ChartXmlWriter(chart_type, data).xml.encode("utf-8"))
+
+    def xml_bytes(self, chart_type):
+        n = len(self.categories)
+        root = self._skeleton(chart_type)
+        cat_xml = (f'<c:cat {nsdecls("c")}><c:strRef><c:f>Sheet1!$A$2:$A${n + 1}</c:f>'
+                   f'<c:strCache><c:ptCount val="{n}"/>{_points(self.categories)}'
+                   f'</c:strCache></c:strRef></c:cat>')
+        for j, (ser, column) in enumerate(zip(root.iter(qn("c:ser")), self.columns), 1):
+            letter = _column_letter(j)
+            finite = np.isfinite(column)
+            val_xml = (f'<c:val {nsdecls("c")}><c:numRef><c:f>Sheet1!${letter}$2:${letter}${n + 1}</c:f>'
+                       f'<c:numCache><c:formatCode>{self.number_format}</c:formatCode>'
+                       f'<c:ptCount val="{n}"/>{_points(column.astype(str), finite)}'
+                       f'</c:numCache></c:numRef></c:val>')
+            ser.replace(ser.find(qn("c:cat")), parse_xml(cat_xml))
+            ser.replace(ser.find(qn("c:val")), parse_xml(val_xml))
+        return etree.tostring(root, xml_declaration=True, encoding="UTF-8", standalone=True)
+
+    @property
+    def xlsx_blob(self):
+        return _xlsx_blob(self.categories, self.names, self.columns)
+
+
+# ── Shapes ──────────────────────────────────────────────────────────
+def _style_chart(chart, colors, line=False):
+    chart.font.size = Pt(11)
+    chart.font.name = "Segoe UI"
+    chart.font.color.rgb = gp.LIGHT_GRAY
+    chart.has_legend = len(chart.plots[0].series) > 1
+    if chart.has_legend:
+        chart.legend.position = XL_LEGEND_POSITION.BOTTOM
+        chart.legend.include_in_layout = False
+    value_axis = chart.value_axis
+    value_axis.major_gridlines.format.line.color.rgb = gp.RGBColor(0x2A, 0x2D, 0x40)
+    value_axis.format.line.fill.background()
+    chart.category_axis.format.line.color.rgb = gp.MUTED
+    for i, series in enumerate(chart.plots[0].series):
+        color = colors[i % len(colors)]
+        if line:
+            series.smooth = False
+            series.format.line.color.rgb = color
+            series.format.line.width = Pt(2)
+            series.marker.style = XL_MARKER_STYLE.NONE
+        else:
+            series.format.fill.solid()
+            series.format.fill.fore_color.rgb = color
+
+
+def add_bar_chart(slide, left, top, width, height, categories, series, names=None,
+                  stacked=False, horizontal=False, colors=SERIES_COLORS,
+                  number_format="General"):
+    """Add a column chart (``horizontal`` for bars), clustered or ``stacked``."""
+    data = ArrayChartData(categories, series, names, number_format)
+    frame = slide.shapes.add_chart(_BAR_TYPES[bool(horizontal), bool(stacked)],
+                                   left, top, width, height, data)
+    chart = frame.chart
+    chart.plots[0].gap_width = 60
+    _style_chart(chart, colors)
+    return frame
+
+
+def add_line_chart(slide, left, top, width, height, categories, series, names=None,
+                   colors=SERIES_COLORS, number_format="General"):
+    data = ArrayChartData(categories, series, names, number_format)
+    frame = slide.shapes.add_chart(XL_CHART_TYPE.LINE, left, top, width, height, data)
+    _style_chart(frame.chart, colors, line=True)
+    return frame
+
+
+def _ramp(values, low, high):
+    """Hex colours interpolated from ``low`` to ``high`` over the range of ``values``."""
+    finite = np.isfinite(values)
+    lo, hi = (values[finite].min(), values[finite].max()) if finite.any() else (0.0, 1.0)
+    t = np.clip((values - lo) / ((hi - lo) or 1.0), 0, 1)
+    t = np.where(finite, t, 0)
+    channels = [np.rint(a + (b - a) * t).astype(np.uint8) for a, b in zip(low, high)]
+    return _cat(_HEX[channels[0]], _HEX[channels[1]], _HEX[channels[2]])
+
+
+def _tc(text, fill, bold=False):
+    b = ' b="1"' if bold else ""
+    return _cat('<a:tc><a:txBody><a:bodyPr/><a:lstStyle/><a:p><a:pPr algn="ctr"/><a:r>'
+                f'<a:rPr lang="en-US" sz="1000"{b} dirty="0"><a:solidFill><a:srgbClr val="FFFFFF"/>'
+                '</a:solidFill><a:latin typeface="Segoe UI"/></a:rPr><a:t>', text,
+                '</a:t></a:r></a:p></a:txBody><a:tcPr anchor="ctr"><a:solidFill><a:srgbClr val="',
+                fill, '"/></a:solidFill></a:tcPr></a:tc>')
+
+
+def add_heatmap_table(slide, left, top, width, height, values, row_labels, col_labels,
+                      low=gp.RGBColor(0x1A, 0x1D, 0x2E), high=gp.ACCENT, fmt="%.0f"):
+    """Add a table of ``values`` (rows x columns) with cells shaded from ``low`` to ``high``.
+
+    ``fmt`` is a printf-style format for the cell text; NaN cells are left blank.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if values.ndim != 2:
+        raise ValueError("heatmap values must be a 2-D array")
+    rows, cols = values.shape
+    if len(row_labels) != rows or len(col_labels) != cols:
+        raise ValueError(f"{rows}x{cols} values need {rows} row and {cols} column labels")
+    if rows + 1 > MAX_TABLE_CELLS or cols + 1 > MAX_TABLE_CELLS:
+        raise ValueError(f"tables are limited to {MAX_TABLE_CELLS} rows and columns")
+
+    header_fill = str(gp.BG_DARK)
+    text = np.where(np.isfinite(values), np.char.mod(fmt, values), "")
+    body = _tc(text, _ramp(values, low, high))
+    row_head = _tc(_escape(np.asarray(row_labels).astype(str)), header_fill, bold=True)
+    col_head = _tc(_escape(np.asarray(col_labels).astype(str)), header_fill, bold=True)
+    row_h = int(height) // (rows + 1)
+    col_w = int(width) // (cols + 1)
+    row_open = f'<a:tr h="{row_h}">'
+    grid = f'<a:gridCol w="{col_w}"/>' * (cols + 1)
+    lines = [row_open, _tc("", header_fill).item(), *col_head.tolist(), "</a:tr>"]
+    for i in range(rows):
+        lines.append(row_open + row_head[i] + "".join(body[i].tolist()) + "</a:tr>")
+    tbl = parse_xml(f'<a:tbl {nsdecls("a")}><a:tblPr firstRow="1" firstCol="1"/>'
+                    f'<a:tblGrid>{grid}</a:tblGrid>{"".join(lines)}</a:tbl>')
+
+    frame = slide.shapes.add_table(1, 1, left, top, width, height)
+    data = frame._element.graphic.graphicData
+    data.replace(data.find(qn("a:tbl")), tbl)
+    return frame
+
+
+# ── Slide builders ──────────────────────────────────────────────────
+def _titled_slide(prs, title, color):
+    slide = prs.slides.add_slide(prs.slide_layouts[6])
+    gp.set_slide_bg(slide, gp.BG_DARK)
+    gp.add_text_box(slide, Inches(0.8), Inches(0.4), Inches(11), Inches(0.6),
+                    title, font_size=36, bold=True, color=color)
+    gp.add_accent_line(slide, Inches(0.8), Inches(1.05), Inches(2.5), color)
+    return slide
+
+
+def chart_slide(prs, title, categories, series, kind="bar", names=None,
+                color=gp.ACCENT2, **options):
+    """Append a titled slide holding one chart.
+
+    ``kind`` is ``"bar"``, ``"stacked"`` or ``"line"``; ``options`` go to
+    ``add_bar_chart``/``add_line_chart``.
+    """
+    slide = _titled_slide(prs, title, color)
+    geom = (Inches(0.8), Inches(1.4), Inches(11.7), Inches(5.7))
+    if kind == "line":
+        add_line_chart(slide, *geom, categories, series, names, **options)
+    elif kind in ("bar", "stacked"):
+        add_bar_chart(slide, *geom, categories, series, names,
+                      stacked=kind == "stacked", **options)
+    else:
+        raise ValueError(f"Unknown chart kind {kind!r}")
+    return slide
+
+
+def heatmap_slide(prs, title, values, row_labels, col_labels, color=gp.ACCENT2, **options):
+    """Append a titled slide holding a heatmap table (e.g. concept mastery per student)."""
+    slide = _titled_slide(prs, title, color)
+    add_heatmap_table(slide, Inches(0.8), Inches(1.4), Inches(11.7), Inches(5.7),
+                      values, row_labels, col_labels, **options)
+    return slide
@@ -0,0 +1,250 @@
+"""
+Fast-starting command line for deck generation.
+
+    python deck_cli.py build [SOURCE ...] [--workers N] [--stream] [--dry-run]
+    python deck_cli.py validate [SOURCE ...]
+    python deck_cli.py import-times
+
+SOURCE is anything ``deck_batch`` accepts (a JSONL/JSON spec file, a
+directory of specs or ``-``); with none, ``build`` targets the default
+``Deep_Analysis_Deck.pptx``.
+
+Only the standard library is imported at startup.  ``build`` first checks
+every deck against its manifest (see ``deck_manifest``), which needs nothing
+but ``stat`` calls and, for inputs whose mtime moved, a re-hash; if every
+deck is current it exits there without importing python-pptx.  Otherwise it
+imports the deck machinery once, reports how long that took, and rebuilds
+the stale decks.  ``validate`` and ``build --dry-run`` check deck specs,
+builder names, templates, slide-spec files and picture paths without
+loading python-pptx at all.  ``import-times`` breaks down the cost of
+``import generate_ppt`` by top-level package using ``-X importtime``.
+"""
+
+import argparse
+import ast
+import json
+import os
+import subprocess
+import sys
+import time
+
+import deck_manifest
+from deck_batch import DeckRenderer, DeckSpec, iter_specs, render_batch, render_parallel, report
+from deck_manifest import DEFAULT_CACHE_DIR, PROJECT_DIR
+
+DEFAULT_OUTPUT = os.path.join(PROJECT_DIR, "Deep_Analysis_Deck.pptx")
+_SPEC_FILES = (".json", ".yaml", ".yml")
+
+
+def _load_specs(sources):
+    if not sources:
+        return [DeckSpec(name="Deep_Analysis_Deck", output=DEFAULT_OUTPUT)]
+    specs = []
+    for source in sources:
+        specs.extend(iter_specs(source))
+    return specs
+
+
+# ── Validation ──────────────────────────────────────────────────────
+def builder_names():
+    """Keys of ``SLIDE_BUILDERS``, read from generate_ppt.py's source."""
+    with open(os.path.join(PROJECT_DIR, "generate_ppt.py"), encoding="utf-8") as fh:
+        tree = ast.parse(fh.read())
+    for node in tree.body:
+        if (isinstance(node, ast.Assign) and isinstance(node.value, ast.Dict)
+                and any(getattr(t, "id", None) == "SLIDE_BUILDERS" for t in node.targets)):
+            return {k.value for k in node.value.keys if isinstance(k, ast.Constant)}
+    return set()
+
+
+def _read_slide_spec(path):
+    with open(path, encoding="utf-8") as fh:
+        text = fh.read()
+    if path.endswith((".yaml", ".yml")):
+        try:
+            import yaml
+        except ImportError:
+            raise ValueError("PyYAML is required for YAML slide specs") from None
+        return yaml.safe_load(text)
+    return json.loads(text)
+
+
+def _check_slide_spec(spec, where):
+    if not isinstance(spec, dict) or not isinstance(spec.get("elements"), list):
+        return [f"{where}: a slide spec needs an 'elements' list"]
+    problems = []
+    for i, el in enumerate(spec["elements"]):
+        if not isinstance(el, dict) or "type" not in el:
+            problems.append(f"{where}: element {i} needs a 'type'")
+        elif el["type"] == "picture" and not os.path.isfile(str(el.get("path"))):
+            problems.append(f"{where}: picture not found: {el.get('path')}")
+    return problems
+
+
+def check_spec(spec, builders):
+    """Return a list of problems with ``spec``; empty when it looks buildable."""
+    if spec.error:
+        return [f"{spec.name}: {spec.error}"]
+    problems = []
+    where = spec.name
+    if spec.template and not os.path.isfile(spec.template):
+        problems.append(f"{where}: template not found: {spec.template}")
+    for entry in spec.slides or ():
+        if isinstance(entry, dict):
+            problems.extend(_check_slide_spec(entry, f"{where}: inline slide"))
+        elif not isinstance(entry, str):
+            problems.append(f"{where}: bad slide entry {entry!r}")
+        elif entry.endswith(_SPEC_FILES):
+            try:
+                slide_spec = _read_slide_spec(entry)
+            except (OSError, ValueError) as exc:
+                problems.append(f"{where}: {entry}: {exc}")
+            else:
+                problems.extend(_check_slide_spec(slide_spec, f"{where}: {entry}"))
+        elif entry not in builders:
+            problems.append(f"{where}: unknown slide {entry!r}")
+    return problems
+
+
+def validate(specs, stream=sys.stdout):
+    builders = builder_names()
+    failed = 0
+    for spec in specs:
+        problems = check_spec(spec, builders)
+        failed += bool(problems)
+        for problem in problems:
+            print(f"❌ {problem}", file=stream)
+    print(f"   Specs: {len(specs) - failed} ok, {failed} invalid", file=stream)
+    return failed
+
+
+# ── Build ───────────────────────────────────────────────────────────
+def stale_specs(specs, out_dir, cache_dir):
+    """Split ``specs`` into (stale, current) by their manifests."""
+    if not cache_dir:
+        return list(specs), []
+    paths = DeckRenderer(out_dir)
+    stale, current = [], []
+    for spec in specs:
+        if spec.error:
+            stale.append(spec)  # reported as a failure by the build
+            continue
+        fresh = deck_manifest.is_fresh(cache_dir, paths.output_path(spec), spec.digest)
+        (current if fresh is not None else stale).append(spec)
+    return stale, current
+
+
+def build(args):
+    start = time.perf_counter()
+    try:
+        specs = _load_specs(args.sources)
+    except (OSError, ValueError) as exc:
+        print(f"❌ {exc}")
+        return 1
+    cache_dir = None if args.no_cache else args.cache_dir
+    stale, current = stale_specs(specs, args.out_dir, cache_dir)
+    checked = time.perf_counter() - start
+
+    if args.dry_run:
+        failed = validate(stale)
+        for spec in current:
+            print(f"⏭️  {spec.name}: up to date")
+        paths = DeckRenderer(args.out_dir)
+        for spec in stale:
+            print(f"🔨 {spec.name}: would build {paths.output_path(spec)}")
+        return 1 if failed else 0
+    if not stale:
+        print(f"✅ {len(current)} deck(s) up to date ({checked * 1e3:.1f} ms)")
+        return 0
+
+    t0 = time.perf_counter()
+    import generate_ppt  # noqa: F401  (python-pptx and the deck modules)
+    import deck_cache  # noqa: F401
+    print(f"   Imported deck modules in {time.perf_counter() - t0:.2f}s", file=sys.stderr)
+
+    if args.workers == 1:
+        results = render_batch(stale, args.out_dir, cache_dir, args.stream, args.compress_level)
+    else:
+        results = render_parallel(stale, args.out_dir, workers=args.workers or None,
+                                  chunksize=max(1, args.chunksize),
+                                  cache_dir=cache_dir, stream=args.stream,
+                                  compress_level=args.compress_level)
+    failed = report(results)
+    if current:
+        print(f"   {len(current)} more deck(s) already up to date")
+    return 1 if failed else 0
+
+
+# ── Import timing ───────────────────────────────────────────────────
+def import_times(module="generate_ppt", top=15, stream=sys.stdout):
+    """Run ``import module`` under ``-X importtime`` and total it per package."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=PROJECT_DIR, capture_output=True, text=True)
+    if proc.returncode:
+        print(proc.stderr, file=sys.stderr)
+        return proc.returncode
+    totals = {}
+    total = 0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        fields = line[len("import time:"):].split("|")
+        try:
+            self_us = int(fields[0])
+        except ValueError:  # header row
+            continue
+        package = fields[2].strip().split(".")[0]
+        totals[package] = totals.get(package, 0) + self_us
+        total += self_us
+    print(f"{'package':<28}{'ms':>10}{'share':>9}", file=stream)
+    for package, us in sorted(totals.items(), key=lambda kv: -kv[1])[:top]:
+        print(f"{package:<28}{us / 1e3:>10.1f}{us / total:>9.1%}", file=stream)
+    print(f"{'total':<28}{total / 1e3:>10.1f}", file=stream)
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_build = sub.add_parser("build", help="build decks that are out of date")
+    p_build.add_argument("sources", nargs="*",
+                         help="deck spec files/directories ('-' for stdin); default: the main deck")
+    p_build.add_argument("--out-dir", default=None,
+                         help="directory for relative 'output' paths (default: cwd)")
+    p_build.add_argument("--workers", type=int, default=1,
+                         help="worker processes; 1 renders in-process, 0 uses every core")
+    p_build.add_argument("--chunksize", type=int, default=4,
+                         help="decks handed to a worker at a time (default: 4)")
+    p_build.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR,
+                         help=f"rebuild cache location (default: {DEFAULT_CACHE_DIR})")
+    p_build.add_argument("--no-cache", action="store_true",
+                         help="always rebuild every deck and slide")
+    p_build.add_argument("--stream", action="store_true",
+                         help="write slides as they are built (flat memory for huge decks)")
+    p_build.add_argument("--compress-level", type=int, default=6, choices=range(10),
+                         metavar="0-9", help="deflate level: 1 fastest, 9 smallest (default: 6)")
+    p_build.add_argument("--dry-run", action="store_true",
+                         help="validate and list what would be built, without building")
+
+    p_val = sub.add_parser("validate", help="check deck specs and their files without building")
+    p_val.add_argument("sources", nargs="*")
+
+    p_imp = sub.add_parser("import-times", help="break down 'import generate_ppt' by package")
+    p_imp.add_argument("--top", type=int, default=15)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        return build(args)
+    if args.command == "validate":
+        try:
+            specs = _load_specs(args.sources)
+        except (OSError, ValueError) as exc:
+            print(f"❌ {exc}")
+            return 1
+        return 1 if validate(specs) else 0
+    return import_times(top=args.top)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,484 @@
+"""
+Async bulk loader for per-student deck inputs from the backend API.
+
+    python deck_fetch.py build BASE_URL STUDENT [STUDENT ...] [--month 2026-09] [--token T]
+    python deck_fetch.py bench [--students 200] [--latency 0.02]
+
+A per-student report needs each student's dashboard overview and monthly
+report, plus metadata for every problem they worked on, which most students
+share.  Fetched one after another that is hundreds of round trips.
+``ApiClient`` is a small HTTP/1.1 client on asyncio streams (standard
+library only, like ``deck_service``):
+
+* connections are kept alive and reused from a pool, capped at
+  ``max_connections``, which also bounds how many requests are in flight;
+* concurrent GETs for the same path are coalesced onto one request;
+* GET results are kept in a TTL cache (``ttl`` seconds, ``cache_size``
+  entries), so problem metadata is fetched once per run, not per student.
+
+``stream_students`` yields each student's record as soon as it is loaded,
+with at most ``concurrency`` students in flight, and ``build_student_decks``
+renders each one into its own SWOT deck on a worker thread while later
+students are still downloading; once ``render_backlog`` decks are waiting
+for the thread, fetching pauses until one is done.
+
+``StubApi`` serves canned responses for those endpoints with a fixed
+latency; ``bench`` runs it and compares the pooled loader with plain
+sequential requests.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import ssl
+import sys
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import aclosing
+from urllib.parse import quote, urlencode, urlsplit
+
+STUDENT_ENDPOINTS = {
+    "overview": "/dashboard/overview",
+    "monthly": "/dashboard/monthly-report",
+}
+PROBLEM_ENDPOINT = "/problems/{slug}"
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# ── HTTP ────────────────────────────────────────────────────────────
+async def _read_response(reader):
+    """(status, headers, body, keep_alive) for one response on ``reader``."""
+    line = await reader.readline()
+    if not line:
+        raise ConnectionResetError("connection closed by server")
+    version, status, _ = (line.decode("latin-1").rstrip("\r\n") + "  ").split(" ", 2)
+    headers = {}
+    while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+        key, _, value = line.decode("latin-1").partition(":")
+        headers[key.strip().lower()] = value.strip()
+    keep = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        body = bytearray()
+        while size := int((await reader.readline()).split(b";")[0], 16):
+            body += await reader.readexactly(size)
+            await reader.readexactly(2)
+        while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+            pass  # trailers
+    elif "content-length" in headers:
+        body = await reader.readexactly(int(headers["content-length"]))
+    else:
+        body, keep = await reader.read(), False
+    return int(status), headers, bytes(body), keep
+
+
+def _error_message(status, body):
+    """The server's ``message`` if the body is JSON with one (as ``apiFetch`` reads it)."""
+    text = body.decode("utf-8", "replace")
+    try:
+        message = json.loads(text).get("message")
+    except (ValueError, AttributeError):
+        message = None
+    return message or text or f"API request failed: {status}"
+
+
+class ApiClient:
+    """Pooled keep-alive JSON client with request coalescing and a TTL cache."""
+
+    def __init__(self, base_url, token=None, max_connections=8, ttl=300.0,
+                 cache_size=4096, timeout=30.0):
+        url = urlsplit(base_url)
+        if url.scheme not in ("http", "https"):
+            raise ValueError(f"unsupported URL: {base_url}")
+        self.host = url.hostname
+        default_port = 443 if url.scheme == "https" else 80
+        self.port = url.port or default_port
+        host = f"[{self.host}]" if ":" in self.host else self.host  # IPv6 literal
+        self.authority = host if self.port == default_port else f"{host}:{self.port}"
+        self.prefix = url.path.rstrip("/")
+        self.ssl = ssl.create_default_context() if url.scheme == "https" else None
+        self.token = token
+        self.ttl = ttl
+        self.cache_size = cache_size
+        self.timeout = timeout
+        self._slots = asyncio.Semaphore(max_connections)
+        self._idle = []  # (reader, writer) kept alive for reuse
+        self._cache = {}  # path -> (expires, value)
+        self._inflight = {}  # path -> task
+        self.stats = dict.fromkeys(("requests", "connections", "cache_hits", "coalesced"), 0)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        idle, self._idle = self._idle, []
+        for _, writer in idle:
+            writer.close()
+        for _, writer in idle:
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+    async def _connect(self):
+        self.stats["connections"] += 1
+        return await asyncio.open_connection(self.host, self.port, ssl=self.ssl)
+
+    def _head(self, method, path, body):
+        lines = [f"{method} {self.prefix}{path} HTTP/1.1", f"Host: {self.authority}",
+                 "Accept: application/json", "Connection: keep-alive"]
+        if self.token:
+            lines.append(f"Authorization: Bearer {self.token}")
+        if body is not None:
+            lines += ["Content-Type: application/json", f"Content-Length: {len(body)}"]
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+    async def request(self, method, path, data=None):
+        """Send one request on a pooled connection and return the decoded JSON."""
+        body = None if data is None else json.dumps(data).encode("utf-8")
+        payload = self._head(method, path, body) + (body or b"")
+        async with self._slots:
+            while True:
+                reused = bool(self._idle)
+                reader, writer = self._idle.pop() if reused else await self._connect()
+                try:
+                    writer.write(payload)
+                    await writer.drain()
+                    status, _, raw, keep = await asyncio.wait_for(_read_response(reader), self.timeout)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    writer.close()
+                    if reused and method == "GET":
+                        continue  # the server dropped an idle connection; retry on another
+                    raise
+                except BaseException:
+                    writer.close()
+                    raise
+                self.stats["requests"] += 1
+                if keep:
+                    self._idle.append((reader, writer))
+                else:
+                    writer.close()
+                break
+        if not 200 <= status < 300:
+            raise ApiError(status, _error_message(status, raw))
+        return json.loads(raw) if raw else None
+
+    async def get(self, path, cache=True):
+        """GET ``path``; cached for ``ttl`` seconds and shared between concurrent callers.
+
+        Cached values are shared; copy one before changing it.
+        """
+        if cache:
+            hit = self._cache.get(path)
+            if hit is not None and hit[0] > time.monotonic():
+                self.stats["cache_hits"] += 1
+                return hit[1]
+        task = self._inflight.get(path)
+        if task is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(task)
+        task = self._inflight[path] = asyncio.ensure_future(self.request("GET", path))
+        try:
+            value = await asyncio.shield(task)
+        finally:
+            self._inflight.pop(path, None)
+        if cache and self.ttl > 0:
+            if len(self._cache) >= self.cache_size:
+                del self._cache[next(iter(self._cache))]  # oldest entry
+            self._cache[path] = (time.monotonic() + self.ttl, value)
+        return value
+
+    async def post(self, path, data):
+        return await self.request("POST", path, data)
+
+
+# ── Student records ─────────────────────────────────────────────────
+async def load_student(client, student, month=None):
+    """Overview, monthly report and problem metadata for one student."""
+    query = {"student": student, **({"month": month} if month else {})}
+    overview, monthly = await asyncio.gather(
+        *(client.get(f"{path}?{urlencode(query)}") for path in STUDENT_ENDPOINTS.values()))
+    slugs = sorted({p["slug"] for p in overview.get("problems", ())
+                    if p.get("slug") and p.get("status") != "not_started"})
+    problems = await asyncio.gather(
+        *(client.get(PROBLEM_ENDPOINT.format(slug=quote(slug, safe=""))) for slug in slugs))
+    return {"student": student, "overview": overview, "monthly": monthly, "problems": problems}
+
+
+async def stream_students(client, students, month=None, concurrency=16):
+    """Yield ``load_student`` records in completion order, ``concurrency`` at a time.
+
+    A student that fails to load yields ``{"student": ..., "error": message}``.
+    """
+    async def load(student):
+        try:
+            return await load_student(client, student, month)
+        except Exception as exc:  # including responses of an unexpected shape
+            return {"student": student, "error": f"{type(exc).__name__}: {exc}"}
+
+    students = iter(students)
+    pending = set()
+    for student in students:
+        pending.add(asyncio.ensure_future(load(student)))
+        if len(pending) >= concurrency:
+            break
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                student = next(students, None)
+                if student is not None:
+                    pending.add(asyncio.ensure_future(load(student)))
+                yield task.result()
+    finally:  # the consumer stopped early: don't leave loads running
+        for task in pending:
+            task.cancel()
+
+
+def report_from_api(record):
+    """``deck_reports.swot_slide`` input from a ``load_student`` record."""
+    monthly = record["monthly"]
+    totals = monthly.get("totals", {})
+    solved = {p["slug"] for p in record["overview"].get("problems", ()) if p.get("status") == "solved"}
+    concepts = sorted({c for p in record["problems"] if p.get("slug") in solved
+                       for c in p.get("concepts", ())})
+    subtitle = (f"{totals.get('attempts', 0)} attempts · "
+                f"{totals.get('sessionsAnalyzed', 0)} sessions analysed · "
+                f"{len(solved)} solved" + (f" · {', '.join(concepts[:4])}" if concepts else ""))
+    return {"student": record["student"], "month": monthly.get("month", ""),
+            "totals": totals,
+            "swot": {key: list(monthly.get("swot", {}).get(key, ()))
+                     for key in ("strengths", "weaknesses", "opportunities", "threats")}}, subtitle
+
+
+def _render_student(record, out_dir, compress_level):
+    import generate_ppt as gp
+    from deck_package import save_package
+    from deck_reports import swot_slide
+
+    prs = gp.new_presentation()
+    report, subtitle = report_from_api(record)
+    swot_slide(prs, report, subtitle=subtitle)
+    name = re.sub(r"[^\w.-]+", "_", str(record["student"])) or "student"
+    path = os.path.join(out_dir, f"{name}_report.pptx")
+    save_package(prs, path, compress_level)
+    return path
+
+
+async def build_student_decks(client, students, out_dir, month=None, concurrency=16,
+                              compress_level=6, stream=sys.stdout, render_backlog=8):
+    """Render one SWOT deck per student as their data arrives; returns the failure count.
+
+    Decks are built on one worker thread (python-pptx objects are not shared
+    between threads) while the event loop keeps fetching, with at most
+    ``render_backlog`` records waiting for it.  Each deck is reported as it
+    is saved.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    loop = asyncio.get_running_loop()
+    slots = asyncio.Semaphore(render_backlog)
+    failed = 0
+
+    async def render(pool, record):
+        nonlocal failed
+        try:
+            path = await loop.run_in_executor(pool, _render_student, record, out_dir, compress_level)
+        except Exception as exc:
+            failed += 1
+            print(f"❌ {record['student']}: {type(exc).__name__}: {exc}", file=stream)
+        else:
+            print(f"✅ {record['student']}: {path}", file=stream)
+        finally:
+            slots.release()
+
+    with ThreadPoolExecutor(1) as pool:
+        renders = set()
+        try:
+            async with aclosing(stream_students(client, students, month, concurrency)) as records:
+                async for record in records:
+                    if "error" in record:
+                        failed += 1
+                        print(f"❌ {record['student']}: {record['error']}", file=stream)
+                        continue
+                    await slots.acquire()
+                    task = asyncio.ensure_future(render(pool, record))
+                    renders.add(task)
+                    task.add_done_callback(renders.discard)
+        finally:
+            await asyncio.gather(*renders, return_exceptions=True)
+    return failed
+
+
+# ── Stub server ─────────────────────────────────────────────────────
+class StubApi:
+    """Local stand-in for the backend: canned JSON per student and problem, after ``latency`` seconds."""
+
+    def __init__(self, latency=0.02, problems=30, per_student=6):
+        self.latency = latency
+        self.problems = [f"problem-{i}" for i in range(problems)]
+        self.per_student = per_student
+        self.stats = {"requests": 0, "connections": 0}
+        self.port = None
+        self._server = None
+
+    def _route(self, path, query):
+        student = (query.get("student") or ["anon"])[0]
+        seed = sum(map(ord, student))
+        if path == STUDENT_ENDPOINTS["overview"]:
+            picks = [self.problems[(seed + 7 * i) % len(self.problems)] for i in range(self.per_student)]
+            return 200, {"kpis": {"problemsSolved": seed % 5, "attemptsLogged": seed % 40},
+                         "problems": [{"slug": slug, "status": ("solved", "attempted")[i % 2]}
+                                      for i, slug in enumerate(picks)]}
+        if path == STUDENT_ENDPOINTS["monthly"]:
+            return 200, {"month": (query.get("month") or ["2026-09"])[0],
+                         "totals": {"attempts": seed % 60, "sessionsAnalyzed": seed % 9},
+                         "swot": {"strengths": ["arrays"], "weaknesses": ["graphs"],
+                                  "opportunities": ["dp"], "threats": ["timeouts"]}}
+        if path.startswith("/problems/") and path[10:] in self.problems:
+            i = self.problems.index(path[10:])
+            return 200, {"slug": path[10:], "title": f"Problem {i}",
+                         "concepts": ["arrays", "hashing", "graphs", "dp"][i % 4:i % 4 + 2]}
+        return 404, {"message": f"no route for {path}"}
+
+    async def _client(self, reader, writer):
+        from urllib.parse import parse_qs
+
+        from deck_service import _REASONS, _read_request
+
+        self.stats["connections"] += 1
+        try:
+            while (request := await _read_request(reader)) is not None:
+                self.stats["requests"] += 1
+                method, target, headers, _ = request
+                url = urlsplit(target)
+                await asyncio.sleep(self.latency)
+                status, data = self._route(url.path, parse_qs(url.query))
+                payload = json.dumps(data).encode("utf-8")
+                keep = headers.get("connection", "").lower() != "close"
+                writer.write((f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                              f"Content-Type: application/json\r\nContent-Length: {len(payload)}\r\n"
+                              f"Connection: {'keep-alive' if keep else 'close'}\r\n\r\n").encode("latin-1")
+                             + payload)
+                await writer.drain()
+                if not keep:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host="127.0.0.1", port=0):
+        self._server = await asyncio.start_server(self._client, host, port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return f"http://{host}:{self.port}"
+
+    async def close(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+
+# ── Benchmark ───────────────────────────────────────────────────────
+def _sequential(base_url, students, month):
+    """The one-request-at-a-time baseline, with urllib and no reuse."""
+    def get(path):
+        with urllib.request.urlopen(base_url + path) as resp:
+            return json.load(resp)
+
+    for student in students:
+        query = urlencode({"student": student, "month": month})
+        overview = get(f"{STUDENT_ENDPOINTS['overview']}?{query}")
+        get(f"{STUDENT_ENDPOINTS['monthly']}?{query}")
+        for p in overview["problems"]:
+            get(PROBLEM_ENDPOINT.format(slug=p["slug"]))
+
+
+def bench(students=200, latency=0.02, connections=8, concurrency=16, month="2026-09"):
+    names = [f"s{i:04d}" for i in range(students)]
+    ready = threading.Event()
+    state = {}
+
+    def run_stub():
+        async def main():
+            stub = StubApi(latency)
+            state["url"], state["stub"], state["loop"] = await stub.start(), stub, asyncio.get_running_loop()
+            state["stop"] = asyncio.Event()
+            ready.set()
+            await state["stop"].wait()
+            await stub.close()
+        asyncio.run(main())
+
+    thread = threading.Thread(target=run_stub, daemon=True)
+    thread.start()
+    ready.wait()
+    stub, url = state["stub"], state["url"]
+
+    t0 = time.perf_counter()
+    _sequential(url, names[:max(1, students // 10)], month)
+    seq = (time.perf_counter() - t0) * 10  # extrapolated from a tenth of the cohort
+    seq_requests = stub.stats["requests"] * 10
+
+    async def pooled():
+        async with ApiClient(url, max_connections=connections) as client:
+            count = 0
+            async for _ in stream_students(client, names, month, concurrency):
+                count += 1
+            return count, client.stats
+
+    stub.stats.update(requests=0, connections=0)
+    t0 = time.perf_counter()
+    count, stats = asyncio.run(pooled())
+    pool = time.perf_counter() - t0
+    state["loop"].call_soon_threadsafe(state["stop"].set)
+    thread.join()
+
+    print(f"sequential (est.)  {seq:7.2f}s  {seq_requests} requests")
+    print(f"pooled async       {pool:7.2f}s  {stub.stats['requests']} requests over "
+          f"{stub.stats['connections']} connections, {stats['coalesced']} coalesced, "
+          f"{stats['cache_hits']} cache hits, {count} students")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_build = sub.add_parser("build", help="fetch student data and build one SWOT deck each")
+    p_build.add_argument("base_url", help="API base URL, e.g. https://api.example.com/api")
+    p_build.add_argument("students", nargs="+")
+    p_build.add_argument("--month", default=None, help="YYYY-MM (default: the API's current month)")
+    p_build.add_argument("--token", default=os.environ.get("DEEP_ANALYSIS_TOKEN"),
+                         help="bearer token (default: $DEEP_ANALYSIS_TOKEN)")
+    p_build.add_argument("--out-dir", default="student_reports")
+    p_build.add_argument("--connections", type=int, default=8)
+    p_build.add_argument("--concurrency", type=int, default=16)
+    p_build.add_argument("--compress-level", type=int, default=6, choices=range(10), metavar="0-9")
+    p_bench = sub.add_parser("bench", help="pooled loader vs sequential requests on a stub API")
+    p_bench.add_argument("--students", type=int, default=200)
+    p_bench.add_argument("--latency", type=float, default=0.02)
+    p_bench.add_argument("--connections", type=int, default=8)
+    p_bench.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args(argv)
+
+    if args.command == "bench":
+        bench(args.students, args.latency, args.connections, args.concurrency)
+        return 0
+
+    async def run():
+        async with ApiClient(args.base_url, token=args.token,
+                             max_connections=args.connections) as client:
+            return await build_student_decks(client, args.students, args.out_dir, args.month,
+                                             args.concurrency, args.compress_level)
+    return 1 if asyncio.run(run()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
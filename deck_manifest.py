@@ -0,0 +1,144 @@
+"""
+Deck manifests: the record of what each output deck was built from.
+
+Kept free of python-pptx (standard library only) so the CLI can decide that
+a deck is up to date, and exit, without importing the deck machinery.
+
+A manifest is stored per output path under ``<cache>/decks/`` and holds the
+deck's full content key (see ``deck_cache.deck_key``), the size and mtime of
+the output we wrote, a digest of the deck spec, the python-pptx version and
+the state of every input file that went into the key: the project modules
+that were loaded and every asset, template or slide-spec file that was
+hashed.  ``is_fresh()`` only has to stat those files, and re-hashes one only
+when its size or mtime moved.  Inputs that were looked for but absent (an
+optional image such as ``ARCH_IMG``) are listed too, so creating one makes
+the deck stale.
+"""
+
+import hashlib
+import json
+import os
+import sys
+from functools import lru_cache
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CACHE_DIR = os.path.join(PROJECT_DIR, ".deck_cache")
+
+_file_digests = {}
+_missing = set()  # inputs looked for but absent in this process
+
+
+def file_digest(path):
+    """SHA-256 of a file's bytes, memoised on (path, size, mtime)."""
+    st = os.stat(path)
+    key = (path, st.st_size, st.st_mtime_ns)
+    digest = _file_digests.get(key)
+    if digest is None:
+        h = hashlib.sha256()
+        with open(path, "rb") as fh:
+            for block in iter(lambda: fh.read(1 << 20), b""):
+                h.update(block)
+        digest = _file_digests[key] = h.hexdigest()
+    return digest
+
+
+def note_missing(path):
+    """Remember that the input file ``path`` does not exist (yet)."""
+    _missing.add(os.path.abspath(path))
+
+
+def hashed_paths():
+    """Every path ``file_digest`` has hashed, or ``note_missing`` noted, in this process."""
+    return {os.path.abspath(path) for path, _, _ in _file_digests} | _missing
+
+
+@lru_cache(maxsize=1)
+def pptx_version():
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        return version("python-pptx")
+    except PackageNotFoundError:
+        return None
+
+
+def spec_digest(slides=None, template=None):
+    """Digest of the parts of a deck spec that shape its content."""
+    return hashlib.sha256(
+        json.dumps([slides, template], sort_keys=True).encode("utf-8")
+    ).hexdigest()
+
+
+def project_modules():
+    """Source files of the project modules loaded in this process."""
+    paths = set()
+    for module in list(sys.modules.values()):
+        path = getattr(module, "__file__", None)
+        if path and path.endswith(".py") and os.path.dirname(os.path.abspath(path)) == PROJECT_DIR:
+            paths.add(os.path.abspath(path))
+    return paths
+
+
+def manifest_path(root, output):
+    name = hashlib.sha256(os.path.abspath(output).encode("utf-8")).hexdigest()
+    return os.path.join(root, "decks", f"{name}.json")
+
+
+def load(root, output):
+    try:
+        with open(manifest_path(root, output), encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+
+def output_matches(manifest, output):
+    try:
+        st = os.stat(output)
+    except OSError:
+        return False
+    return manifest.get("size") == st.st_size and manifest.get("mtime_ns") == st.st_mtime_ns
+
+
+def write(root, output, key, slides=None, spec=None, inputs=()):
+    """Record that ``output`` was built with content ``key`` from ``inputs``."""
+    st = os.stat(output)
+    files = {}
+    missing = []
+    for path in sorted(set(inputs) | project_modules()):
+        try:
+            fst = os.stat(path)
+            files[path] = [fst.st_size, fst.st_mtime_ns, file_digest(path)]
+        except OSError:
+            missing.append(path)
+    manifest = {"key": key, "size": st.st_size, "mtime_ns": st.st_mtime_ns,
+                "slides": slides, "spec": spec, "pptx": pptx_version(), "inputs": files,
+                "missing": missing}
+    path = manifest_path(root, output)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh)
+    os.replace(tmp, path)
+
+
+def is_fresh(root, output, spec):
+    """Return the manifest if ``output`` is provably current, else None.
+
+    Needs no python-pptx import: it compares the spec digest, the installed
+    python-pptx version and the recorded state of every input file.
+    """
+    manifest = load(root, output)
+    if (manifest is None or not manifest.get("inputs") or manifest.get("spec") != spec
+            or manifest.get("pptx") != pptx_version() or not output_matches(manifest, output)):
+        return None
+    for path, (size, mtime_ns, digest) in manifest["inputs"].items():
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        if (st.st_size, st.st_mtime_ns) != (size, mtime_ns) and file_digest(path) != digest:
+            return None
+    if any(os.path.exists(path) for path in manifest.get("missing", ())):
+        return None
+    return manifest
@@ -0,0 +1,233 @@
+"""
+Prototype slides: build a layout once, then stamp out copies with new text.
+
+A deck that repeats one layout for hundreds of students or problems does not
+need to run the shape helpers for every slide.  A ``Prototype`` runs a
+builder once, with ``slot("name")`` placeholders wherever content goes, and
+keeps the resulting slide tree.  ``stamp()`` appends a slide, deep-copies
+the tree into it and fills the slots, so each copy costs one XML copy and a
+text replacement instead of full construction:
+
+    proto = advantage_grid_prototype(cards=2)
+    for student in students:
+        proto.stamp(prs, {"title": f"{student.name}: strengths",
+                          "subtitle": student.summary,
+                          "card0.title": "Recursion", "card0.body": student.recursion_notes,
+                          "card1.title": "Graphs", "card1.body": student.graph_notes},
+                    colors={"card0.title": gp.GREEN_ACC})
+
+A slot is a paragraph whose whole text is ``{{name}}``.  Filling it with a
+string sets that paragraph's text (newlines become line breaks); filling it
+with a list repeats the paragraph once per item, which is how bullet lists
+of any length fit one slot.  ``colors`` recolours the text box a slot sits
+in.  Pictures are carried over with the prototype; shape ids and names are
+those of the prototype, so a stamped slide matches one built directly.
+
+Filled text boxes go through ``deck_textfit`` like the ones the helpers
+build: each is measured in its own box at its own size and font, flagged
+when it overflows, and shrunk when ``generate_ppt.TEXT_FIT`` says so.
+"""
+
+import copy
+import io
+import re
+
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.oxml.ns import qn
+from pptx.util import Inches
+
+import deck_textfit
+import generate_ppt as gp
+
+_SLOT = re.compile(r"\{\{([^{}]+)\}\}")
+_R_EMBED = qn("r:embed")
+
+
+def slot(name):
+    """Placeholder text for slot ``name``."""
+    return f"{{{{{name}}}}}"
+
+
+def _path(root, el):
+    """Child-index path from ``root`` down to ``el``."""
+    path = []
+    while el is not root:
+        parent = el.getparent()
+        path.append(parent.index(el))
+        el = parent
+    return tuple(reversed(path))
+
+
+def _follow(root, path):
+    for i in path:
+        root = root[i]
+    return root
+
+
+def _fit_body(slide, body, mode):
+    """Measure a filled text body in its box, as ``generate_ppt._fit_text``
+    does for one the helpers build."""
+    ext = body.getparent().find(f"{qn('p:spPr')}/{qn('a:xfrm')}/{qn('a:ext')}")
+    lvl = body.find(f"{qn('a:lstStyle')}/{qn('a:lvl1pPr')}")
+    rpr = lvl.find(qn("a:defRPr")) if lvl is not None else None
+    if ext is None or rpr is None or rpr.get("sz") is None:
+        return
+    height, size = int(ext.get("cy")), int(rpr.get("sz")) / 100
+    latin = rpr.find(qn("a:latin"))
+    spacing = lvl.find(f"{qn('a:spcAft')}/{qn('a:spcPts')}")
+    paragraphs = tuple(p.text for p in body.findall(qn("a:p")))
+    result = deck_textfit.fit(paragraphs, int(ext.get("cx")), height, size,
+                              latin.get("typeface") if latin is not None else "Segoe UI",
+                              rpr.get("b") in ("1", "true"),
+                              int(spacing.get("val")) / 100 if spacing is not None else 0,
+                              min_size=None if mode == "shrink" else size)
+    if not result.fits:
+        deck_textfit.flag(slide, paragraphs, result, height)
+    if result.size != size:
+        rpr.set("sz", str(round(result.size * 100)))
+
+
+def _set_text(p, text):
+    runs = p.findall(qn("a:r"))
+    if len(runs) == 1 and text and "\n" not in text and "\v" not in text:
+        runs[0].find(qn("a:t")).text = text  # the common case: swap the run's text
+        return
+    p.remove_all("a:r", "a:br", "a:fld")
+    p.append_text(text)
+
+
+class Prototype:
+    """A slide layout built once and cloned per use."""
+
+    def __init__(self, builder, name=None):
+        self.name = name or getattr(builder, "__name__", "prototype")
+        prs = gp.new_presentation()
+        with deck_textfit.collect():  # the placeholders' own overflows mean nothing
+            builder(prs)
+        slide = prs.slides[-1]
+        self.layout = list(prs.slide_layouts).index(slide.slide_layout)
+        self._images = {}
+        for rid, rel in slide.part.rels.items():
+            if rel.reltype == RT.IMAGE and not rel.is_external:
+                self._images[rid] = rel.target_part.blob
+            elif rel.reltype != RT.SLIDE_LAYOUT:
+                raise ValueError(f"{self.name}: prototypes can't carry {rel.reltype} relationships")
+        self._cSld = slide._element.cSld
+        self._embeds = [_path(self._cSld, el) for el in self._cSld.iter()
+                        if el.get(_R_EMBED) in self._images]
+        self.slots = {}
+        for p in self._cSld.iter(qn("a:p")):
+            match = _SLOT.fullmatch("".join(t.text or "" for t in p.iter(qn("a:t"))))
+            if match:
+                if match.group(1) in self.slots:
+                    raise ValueError(f"{self.name}: slot {match.group(1)!r} used twice")
+                self.slots[match.group(1)] = _path(self._cSld, p)
+
+    def stamp(self, prs, values=None, colors=None, **kwargs):
+        """Append a copy of the prototype to ``prs`` with its slots filled.
+
+        Every slot needs a value (a string, or a list of strings for one
+        paragraph each); ``colors`` maps slot names to an ``RGBColor`` for
+        the text box holding that slot.
+        """
+        values = {**(values or {}), **kwargs}
+        unknown = (set(values) | set(colors or ())) - set(self.slots)
+        missing = set(self.slots) - set(values)
+        if unknown or missing:
+            detail = [f"unknown {', '.join(sorted(unknown))}" if unknown else "",
+                      f"missing {', '.join(sorted(missing))}" if missing else ""]
+            raise ValueError(f"{self.name}: slot(s) {'; '.join(filter(None, detail))}")
+
+        slide = prs.slides.add_slide(prs.slide_layouts[self.layout])
+        cSld = copy.deepcopy(self._cSld)
+        if self._images:
+            rid_map = {rid: slide.part.get_or_add_image_part(io.BytesIO(blob))[1]
+                       for rid, blob in self._images.items()}
+            for path in self._embeds:
+                el = _follow(cSld, path)
+                el.set(_R_EMBED, rid_map[el.get(_R_EMBED)])
+
+        # Resolve every slot before filling any: list slots insert paragraphs.
+        targets = {name: _follow(cSld, path) for name, path in self.slots.items()}
+        bodies = []
+        for p in targets.values():
+            if p.getparent() not in bodies:
+                bodies.append(p.getparent())
+        for name, color in (colors or {}).items():
+            body = targets[name].getparent()
+            for clr in body.iter(qn("a:srgbClr")):
+                clr.set("val", str(color))
+        for name, p in targets.items():
+            value = values[name]
+            if isinstance(value, str):
+                _set_text(p, value)
+                continue
+            for text in reversed(value):
+                clone = copy.deepcopy(p)
+                _set_text(clone, text)
+                p.addnext(clone)
+            if value or len(p.getparent().findall(qn("a:p"))) > 1:
+                p.getparent().remove(p)
+            else:
+                _set_text(p, "")  # a text body needs one paragraph
+        if gp.TEXT_FIT != "off":
+            for body in bodies:
+                _fit_body(slide, body, gp.TEXT_FIT)
+
+        # Move the copy into the slide's own cSld: slide.shapes keeps its spTree.
+        own = slide._element.cSld
+        tree = own.spTree
+        for child in list(own):
+            if child is not tree:
+                own.remove(child)
+        del tree[:]
+        own.attrib.update(cSld.attrib)
+        for child in list(cSld):
+            if child.tag == tree.tag:
+                own.append(tree)
+                tree.extend(list(child))
+            else:
+                own.append(child)
+        return slide
+
+
+# ── Prototypes of the repeated layouts in generate_ppt ──────────────
+def advantage_grid_prototype(cards=4, columns=2):
+    """Heading, subtitle and a grid of cards, as in ``slide_competitive_advantage``.
+
+    Slots: ``title``, ``subtitle`` and ``card<i>.title`` / ``card<i>.body``
+    (a list of lines) for each card.
+    """
+    def build(prs):
+        slide = prs.slides.add_slide(prs.slide_layouts[6])
+        gp.set_slide_bg(slide, gp.BG_DARK)
+        gp.add_text_box(slide, Inches(0.8), Inches(0.4), Inches(11), Inches(0.6),
+                        slot("title"), font_size=36, bold=True, color=gp.ORANGE_ACC)
+        gp.add_accent_line(slide, Inches(0.8), Inches(1.05), Inches(2.5), gp.ORANGE_ACC)
+        gp.add_text_box(slide, Inches(0.8), Inches(1.3), Inches(11.5), Inches(0.6),
+                        slot("subtitle"), font_size=22, color=gp.WHITE)
+        gp.add_card_grid(slide, Inches(0.8), Inches(2.2),
+                         [(slot(f"card{i}.title"), slot(f"card{i}.body"), gp.ACCENT2)
+                          for i in range(cards)],
+                         Inches(5.7), Inches(1.35), columns=columns)
+    return Prototype(build, "advantage_grid")
+
+
+def step_flow_prototype(steps=7):
+    """Heading, a row of step cards and a notes box, as in ``slide_how_it_works``.
+
+    Slots: ``title``, ``notes`` and ``step<i>.title`` / ``step<i>.body``.
+    """
+    def build(prs):
+        slide = prs.slides.add_slide(prs.slide_layouts[6])
+        gp.set_slide_bg(slide, gp.BG_DARK)
+        gp.add_text_box(slide, Inches(0.8), Inches(0.4), Inches(11), Inches(0.6),
+                        slot("title"), font_size=36, bold=True, color=gp.ACCENT)
+        gp.add_accent_line(slide, Inches(0.8), Inches(1.05), Inches(2.5), gp.ACCENT)
+        gp.add_step_flow(slide, Inches(0.5), Inches(1.6),
+                         [(slot(f"step{i}.title"), slot(f"step{i}.body"), gp.ACCENT)
+                          for i in range(steps)],
+                         Inches(1.55), Inches(2.4))
+        gp.add_text_box(slide, Inches(0.8), Inches(4.5), Inches(11.5), Inches(2.5),
+                        slot("notes"), font_size=13, color=gp.MUTED)
+    return Prototype(build, "step_flow")
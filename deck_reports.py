@@ -0,0 +1,454 @@
+"""
+Columnar attempt store and vectorised monthly SWOT / mastery aggregation.
+
+    python deck_reports.py ingest STORE EXPORT [EXPORT ...]
+    python deck_reports.py build STORE 2026-09 [--students ID ...] [--out Monthly_Reports.pptx]
+
+The monthly SWOT reports and concept confidence scores aggregate every
+attempt in a period, which for a cohort is millions of rows.  Exports are
+therefore ingested once into an ``AttemptStore``: a directory of flat,
+fixed-width column files (one row per attempt and concept) plus a
+``meta.json`` holding the row count and the student, concept and
+error-category vocabularies.  Columns are opened with ``np.memmap``, so a
+store larger than RAM is read a chunk at a time by the OS, and ingesting
+more exports appends to it.
+
+Exports are CSV or JSON Lines with these fields (extra fields are ignored):
+
+    student     student id
+    concept     concept name; several may be joined with ';'
+    timestamp   epoch seconds or ISO 8601 (UTC)
+    seconds     time spent (optional, default 0)
+    passed      tests passed (optional; for plain attempts, 1 if accepted)
+    total       tests run (optional, default 1)
+    error       error category such as ``off_by_one`` (optional)
+
+Test-result exports are the same rows without ``seconds`` or ``error``.
+
+``aggregate()`` makes one pass over the store for a month and the month
+before it, a chunk at a time, accumulating every statistic with
+``np.bincount`` on (student, concept) and (student, error) keys.  The
+result, ``Aggregates``, holds dense students x concepts matrices for the
+whole cohort (so its size is set by the vocabularies, not the row count),
+and ``monthly_report()``, ``swot_slide()``, ``mastery_slide()`` and
+``trend_slide()`` read from it directly.
+"""
+
+import argparse
+import csv
+import functools
+import json
+import os
+import sys
+
+import numpy as np
+
+COLUMNS = {
+    "student": np.int32,
+    "concept": np.int32,
+    "primary": np.uint8,  # 1 on the first concept row of each attempt
+    "ts": np.int64,
+    "seconds": np.float32,
+    "passed": np.uint16,
+    "total": np.uint16,
+    "error": np.int16,
+}
+CODED = ("student", "concept", "error")  # columns stored as vocabulary codes
+NO_ERROR = -1
+CHUNK_ROWS = 1 << 20
+CONCEPT_SEP = ";"
+
+STRONG, WEAK = 0.75, 0.5  # confidence thresholds for strengths / weaknesses
+SHIFT = 0.05  # confidence change that counts as improved / weakened
+MIN_ATTEMPTS = 3  # attempts on a concept before it can be a strength or weakness
+
+
+# ── Store ───────────────────────────────────────────────────────────
+def _epoch(values):
+    """Epoch seconds from numeric or ISO 8601 strings."""
+    arr = np.asarray(values)
+    try:
+        return arr.astype(np.float64).astype(np.int64)
+    except ValueError:
+        arr = np.char.rstrip(arr.astype(str), "Z")
+        return arr.astype("datetime64[s]").astype(np.int64)
+
+
+def _numbers(values, default, dtype):
+    arr = np.asarray(values, dtype=object)
+    arr[(arr == "") | (arr == None)] = default  # noqa: E711  (element-wise)
+    return arr.astype(np.float64).astype(dtype)
+
+
+def iter_export(path, chunk_rows=CHUNK_ROWS):
+    """Yield chunks of an export as dicts of field -> list of raw values."""
+    with open(path, encoding="utf-8", newline="") as fh:
+        if path.endswith((".jsonl", ".ndjson")):
+            rows = (json.loads(line) for line in fh if line.strip())
+        else:
+            rows = csv.DictReader(fh)
+        chunk = {}
+        count = 0
+        for row in rows:
+            for field in ("student", "concept", "timestamp", "seconds", "passed", "total", "error"):
+                chunk.setdefault(field, []).append(row.get(field))
+            count += 1
+            if count == chunk_rows:
+                yield chunk
+                chunk, count = {}, 0
+        if count:
+            yield chunk
+
+
+class AttemptStore:
+    """Append-only columnar store of attempt rows, read through ``np.memmap``."""
+
+    def __init__(self, root):
+        self.root = root
+        try:
+            with open(self._path("meta.json"), encoding="utf-8") as fh:
+                meta = json.load(fh)
+        except FileNotFoundError:
+            meta = {"rows": 0, "vocab": {name: [] for name in CODED}}
+        self.rows = meta["rows"]
+        self.vocab = meta["vocab"]
+        self._codes = {name: {v: i for i, v in enumerate(words)}
+                       for name, words in self.vocab.items()}
+
+    def _path(self, name):
+        return os.path.join(self.root, name)
+
+    def __len__(self):
+        return self.rows
+
+    def column(self, name):
+        """Column ``name`` as a read-only memory map (an empty array for an empty store)."""
+        dtype = COLUMNS[name]
+        if not self.rows:
+            return np.empty(0, dtype)
+        return np.memmap(self._path(f"{name}.bin"), dtype, mode="r", shape=(self.rows,))
+
+    def _encode(self, name, values):
+        """Vocabulary codes for ``values``; one dict lookup per distinct value, not per row."""
+        uniq, inverse = np.unique(np.asarray(values, dtype=str), return_inverse=True)
+        codes = self._codes[name]
+        for word in uniq.tolist():
+            if not word and name != "error":  # only errors have an empty value (NO_ERROR)
+                raise ValueError(f"{name} must not be empty "
+                                 f"({int(np.count_nonzero(uniq[inverse] == ''))} row(s))")
+            if word and word not in codes:
+                codes[word] = len(self.vocab[name])
+                self.vocab[name].append(word)
+        lookup = np.array([codes.get(word, NO_ERROR) for word in uniq.tolist()], COLUMNS[name])
+        return lookup[inverse.reshape(-1)]
+
+    def append(self, chunk):
+        """Append one export chunk (see ``iter_export``); returns the rows added."""
+        n = len(chunk["student"])
+        concepts = [[c.strip() for c in str(raw or "").split(CONCEPT_SEP) if c.strip()] or ["unknown"]
+                    for raw in chunk["concept"]]
+        counts = np.fromiter(map(len, concepts), np.int64, n)
+        repeat = functools.partial(np.repeat, repeats=counts)
+        first = np.zeros(int(counts.sum()), np.uint8)
+        first[np.cumsum(counts) - counts] = 1
+
+        none = [None] * n
+        columns = {
+            "student": self._encode("student", repeat(np.asarray(chunk["student"], dtype=str))),
+            "concept": self._encode("concept", [c for cs in concepts for c in cs]),
+            "primary": first,
+            "ts": repeat(_epoch(chunk["timestamp"])),
+            "seconds": repeat(_numbers(chunk.get("seconds") or none, 0, np.float32)),
+            "passed": repeat(_numbers(chunk.get("passed") or none, 0, np.uint16)),
+            "total": repeat(_numbers(chunk.get("total") or none, 1, np.uint16)),
+            "error": self._encode("error", repeat(np.asarray(
+                [e or "" for e in chunk.get("error") or none], dtype=str))),
+        }
+        os.makedirs(self.root, exist_ok=True)
+        for name, values in columns.items():
+            with open(self._path(f"{name}.bin"), "ab") as fh:
+                # Drop any tail left by an append that died before updating meta.json.
+                fh.truncate(self.rows * np.dtype(COLUMNS[name]).itemsize)
+                values.astype(COLUMNS[name], copy=False).tofile(fh)
+        self.rows += len(first)
+        tmp = self._path("meta.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump({"rows": self.rows, "vocab": self.vocab}, fh)
+        os.replace(tmp, self._path("meta.json"))
+        return len(first)
+
+    def ingest(self, path, chunk_rows=CHUNK_ROWS):
+        """Append every row of the export at ``path``; returns the rows added."""
+        return sum(self.append(chunk) for chunk in iter_export(path, chunk_rows))
+
+
+# ── Aggregation ─────────────────────────────────────────────────────
+def month_bounds(month):
+    """(start, end) epoch seconds of ``month`` ("2026-09")."""
+    m = np.datetime64(month, "M")
+    return tuple(int(d.astype("datetime64[s]").astype(np.int64)) for d in (m, m + 1))
+
+
+class Aggregates:
+    """Per-student, per-concept statistics for one month and the month before.
+
+    Matrices are indexed ``[student, concept]`` (or ``[student, error]``)
+    by vocabulary code; ``students``, ``concepts`` and ``errors`` name them.
+    """
+
+    def __init__(self, store, month, cur, prev, errors_by_student, errors_by_concept):
+        self.month = month
+        self.students = list(store.vocab["student"])
+        self.concepts = list(store.vocab["concept"])
+        self.errors = list(store.vocab["error"])
+        self.attempts, self.concept_attempts, self.passed, self.total, self.seconds = cur
+        self.prev_passed, self.prev_total = prev
+        self.errors_by_student = errors_by_student
+        self.errors_by_concept = errors_by_concept
+
+    @property
+    def pass_rate(self):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.total > 0, self.passed / self.total, np.nan)
+
+    @property
+    def confidence(self):
+        """Smoothed pass rate (Laplace), NaN for concepts not practised this month."""
+        return np.where(self.total > 0, (self.passed + 1) / (self.total + 2), np.nan)
+
+    @property
+    def prev_confidence(self):
+        return np.where(self.prev_total > 0, (self.prev_passed + 1) / (self.prev_total + 2), np.nan)
+
+    @property
+    def delta(self):
+        """Confidence change since last month; NaN unless practised in both."""
+        return self.confidence - self.prev_confidence
+
+    def student_index(self, student):
+        return _index(self.students, student, "student")
+
+    def concept_index(self, concept):
+        return _index(self.concepts, concept, "concept")
+
+
+def _index(names, value, kind):
+    """Vocabulary code of ``value`` (codes pass through)."""
+    if isinstance(value, (int, np.integer)):
+        if not 0 <= value < len(names):
+            raise ValueError(f"{kind} code {value} out of range (0-{len(names) - 1})")
+        return int(value)
+    try:
+        return names.index(value)
+    except ValueError:
+        raise ValueError(f"unknown {kind} {value!r}: no attempts in this store") from None
+
+
+def aggregate(store, month, chunk_rows=CHUNK_ROWS):
+    """Aggregate ``store`` for ``month`` in one chunked pass over its columns."""
+    start, end = month_bounds(month)
+    prev_start = month_bounds(str(np.datetime64(month, "M") - 1))[0]
+    n_s, n_c, n_e = (max(1, len(store.vocab[name])) for name in CODED)
+    size = n_s * n_c
+    cur = np.zeros((5, size))  # attempts, concept attempts, passed, total, seconds
+    prev = np.zeros((2, size))  # passed, total
+    err_s = np.zeros(n_s * n_e)
+    err_c = np.zeros(n_c * n_e)
+
+    cols = {name: store.column(name) for name in COLUMNS}
+    for lo in range(0, len(store), chunk_rows):
+        part = slice(lo, lo + chunk_rows)
+        ts = np.asarray(cols["ts"][part])
+        if ts.max() < prev_start or ts.min() >= end:
+            continue  # exports are mostly in time order, so whole chunks drop out
+        student = cols["student"][part].astype(np.int64)
+        concept = cols["concept"][part]
+        key = student * n_c + concept
+        passed = cols["passed"][part]
+        total = cols["total"][part]
+
+        m = (ts >= start) & (ts < end)
+        k = key[m]
+        cur[0] += np.bincount(k, weights=cols["primary"][part][m], minlength=size)
+        cur[1] += np.bincount(k, minlength=size)
+        cur[2] += np.bincount(k, weights=passed[m], minlength=size)
+        cur[3] += np.bincount(k, weights=total[m], minlength=size)
+        cur[4] += np.bincount(k, weights=cols["seconds"][part][m], minlength=size)
+
+        p = (ts >= prev_start) & (ts < start)
+        prev[0] += np.bincount(key[p], weights=passed[p], minlength=size)
+        prev[1] += np.bincount(key[p], weights=total[p], minlength=size)
+
+        error = cols["error"][part]
+        e = m & (error != NO_ERROR) & (cols["primary"][part] == 1)
+        err_s += np.bincount(student[e] * n_e + error[e], minlength=n_s * n_e)
+        err_c += np.bincount(concept[e].astype(np.int64) * n_e + error[e], minlength=n_c * n_e)
+
+    return Aggregates(store, month, cur.reshape(5, n_s, n_c), prev.reshape(2, n_s, n_c),
+                      err_s.reshape(n_s, n_e), err_c.reshape(n_c, n_e))
+
+
+# ── Reports ─────────────────────────────────────────────────────────
+def _label(concept):
+    return concept.replace("_", " ").title()
+
+
+def monthly_report(agg, student, top=5):
+    """Monthly SWOT report for one student, in the shape the dashboard shows."""
+    s = agg.student_index(student)
+    tried = agg.concept_attempts[s]
+    practised = np.flatnonzero(tried)
+    conf, delta = agg.confidence[s], agg.delta[s]
+
+    by_use = practised[np.argsort(-tried[practised], kind="stable")]
+    shifts = practised[np.argsort(-np.abs(np.nan_to_num(delta[practised])), kind="stable")]
+    status = np.select([delta > SHIFT, delta < -SHIFT], ["improved", "weakened"], "stable")
+    confident = tried >= MIN_ATTEMPTS
+    strengths = np.flatnonzero(confident & (conf >= STRONG))
+    weaknesses = np.flatnonzero(confident & (conf < WEAK))
+    errors = agg.errors_by_student[s]
+    common = [agg.errors[i] for i in np.argsort(-errors, kind="stable")[:3] if errors[i]]
+
+    names = agg.concepts
+    return {
+        "student": agg.students[s],
+        "month": agg.month,
+        "totals": {"attempts": int(agg.attempts[s].sum()),
+                   "concepts": len(practised),
+                   "minutes": round(float(agg.seconds[s].sum()) / 60, 1),
+                   "pass_rate": round(float(agg.passed[s].sum() / max(1, agg.total[s].sum())), 3)},
+        "topic_shifts": [{"concept": names[c], "confidence": round(float(conf[c]), 3),
+                          "delta": None if np.isnan(delta[c]) else round(float(delta[c]), 3),
+                          "status": str(status[c]), "attempts": int(tried[c])}
+                         for c in shifts[:top]],
+        "most_practiced": [{"concept": names[c], "attempts": int(tried[c])} for c in by_use[:top]],
+        "least_practiced": [{"concept": names[c], "attempts": int(tried[c])}
+                            for c in by_use[::-1][:top]],
+        "swot": {
+            "strengths": [names[c] for c in strengths[np.argsort(-conf[strengths])][:top]],
+            "weaknesses": [names[c] for c in weaknesses[np.argsort(conf[weaknesses])][:top]],
+            "opportunities": [names[c] for c in practised[delta[practised] > SHIFT][:top]],
+            "threats": ([names[c] for c in practised[delta[practised] < -SHIFT][:top]]
+                        + [f"error: {e}" for e in common]),
+        },
+    }
+
+
+# ── Slides ──────────────────────────────────────────────────────────
+@functools.lru_cache(maxsize=None)
+def _swot_prototype():
+    import deck_prototype
+
+    return deck_prototype.advantage_grid_prototype(cards=4)
+
+
+def swot_slide(prs, report, subtitle=None):
+    """Append a SWOT slide for ``monthly_report()`` output.
+
+    ``subtitle`` replaces the line of totals under the heading.
+    """
+    import generate_ppt as gp
+
+    swot = report["swot"]
+    totals = report["totals"]
+    quadrants = (("Strengths", "strengths", gp.GREEN_ACC), ("Weaknesses", "weaknesses", gp.RED_ACCENT),
+                 ("Opportunities", "opportunities", gp.ACCENT2), ("Threats", "threats", gp.ORANGE_ACC))
+    values = {"title": f"{report['student']}: {report['month']} SWOT",
+              "subtitle": subtitle or (f"{totals['attempts']} attempts · {totals['concepts']} concepts · "
+                                       f"{totals['minutes']:g} min · {totals['pass_rate']:.0%} tests passed")}
+    colors = {}
+    for i, (title, key, color) in enumerate(quadrants):
+        values[f"card{i}.title"] = title
+        values[f"card{i}.body"] = [_label(c) for c in swot[key]] or ["—"]
+        colors[f"card{i}.title"] = color
+    return _swot_prototype().stamp(prs, values, colors=colors)
+
+
+def _top(weights, limit):
+    return np.sort(np.argsort(-weights, kind="stable")[:limit])
+
+
+def mastery_slide(prs, agg, students=None, concepts=None, max_students=20, max_concepts=12):
+    """Heatmap of confidence (%) for the most active students and concepts."""
+    import deck_charts
+
+    activity = agg.concept_attempts
+    rows = ([agg.student_index(s) for s in students] if students is not None
+            else _top(activity.sum(axis=1), max_students))
+    cols = ([agg.concept_index(c) for c in concepts] if concepts is not None
+            else _top(activity.sum(axis=0), max_concepts))
+    values = agg.confidence[np.ix_(rows, cols)] * 100
+    return deck_charts.heatmap_slide(prs, f"Concept Mastery — {agg.month}", values,
+                                     [agg.students[s] for s in rows],
+                                     [_label(agg.concepts[c]) for c in cols])
+
+
+def trend_slide(prs, agg, max_concepts=20):
+    """Cohort pass rate per concept this month against last month."""
+    import deck_charts
+
+    cols = _top(agg.concept_attempts.sum(axis=0), max_concepts)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        now = agg.passed.sum(axis=0)[cols] / agg.total.sum(axis=0)[cols] * 100
+        before = agg.prev_passed.sum(axis=0)[cols] / agg.prev_total.sum(axis=0)[cols] * 100
+    return deck_charts.chart_slide(prs, f"Pass Rate by Concept — {agg.month}",
+                                   [_label(agg.concepts[c]) for c in cols],
+                                   {"Last month": before, "This month": now},
+                                   number_format='0"%"')
+
+
+def build_reports(store, month, students=None, output="Monthly_Reports.pptx"):
+    """Build a deck of cohort slides plus one SWOT slide per student."""
+    import generate_ppt as gp
+    from deck_package import save_package
+
+    agg = aggregate(store, month)
+    prs = gp.new_presentation()
+    mastery_slide(prs, agg)
+    trend_slide(prs, agg)
+    for student in students or agg.students:
+        if agg.concept_attempts[agg.student_index(student)].any():
+            swot_slide(prs, monthly_report(agg, student))
+    save_package(prs, output)
+    return len(prs.slides)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_in = sub.add_parser("ingest", help="append attempt/test-result exports to a store")
+    p_in.add_argument("store")
+    p_in.add_argument("exports", nargs="+")
+    p_build = sub.add_parser("build", help="build the monthly report deck")
+    p_build.add_argument("store")
+    p_build.add_argument("month", help="YYYY-MM")
+    p_build.add_argument("--students", nargs="*", default=None)
+    p_build.add_argument("--out", default="Monthly_Reports.pptx")
+    args = parser.parse_args(argv)
+
+    store = AttemptStore(args.store)
+    if args.command == "ingest":
+        for path in args.exports:
+            try:
+                rows = store.ingest(path)
+            except ValueError as exc:
+                print(f"❌ {path}: {exc}")
+                return 1
+            print(f"✅ {path}: {rows:,} rows")
+        print(f"   Store: {len(store):,} rows, {len(store.vocab['student'])} students, "
+              f"{len(store.vocab['concept'])} concepts")
+        return 0
+    if not len(store):
+        print(f"❌ {args.store}: empty store")
+        return 1
+    try:
+        slides = build_reports(store, args.month, args.students, args.out)
+    except ValueError as exc:
+        print(f"❌ {exc}")
+        return 1
+    print(f"✅ {args.out}: {slides} slides")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,478 @@
+"""
+Long-running local HTTP service that renders decks from pre-warmed workers.
+
+    python deck_service.py serve [--port 8765] [--workers 4] [--queue-size 32]
+    python deck_service.py bench [--requests 40] [--concurrency 8]
+
+Each worker process imports python-pptx and the deck modules once, reads the
+configured templates into memory and builds the full deck once to warm the
+style fragments, layout plans and image variants, so a request pays only for
+building and saving its own slides.  Requests wait in a bounded asyncio
+queue; when it is full the service answers ``503`` with ``Retry-After``
+instead of piling up work, and a request still unfinished after its timeout
+gets ``504``.  Background jobs are not waited on by a request, so they run
+under their own, longer ``--job-timeout``.
+
+Endpoints (deck specs are the JSON objects ``deck_batch`` reads; ``name`` and
+``output`` are optional here):
+
+    POST /decks          render and return the .pptx; decks of ``--job-slides``
+                         slides or more, or any deck with ``?async=1``, get a
+                         ``202`` with a job id instead
+    GET  /jobs/<id>      job status as JSON
+    GET  /jobs/<id>/deck the finished .pptx
+    GET  /stats          queue depth, worker count and p50/p99 latency
+
+A timeout stops the service waiting on a deck, not the worker building it,
+which finishes and discards the result; until it does, its dispatcher takes
+no new job, so timed-out decks still count against the pool's capacity.  A
+worker that dies breaks the pool: the jobs on it fail and a fresh pool takes
+the next ones.
+"""
+
+import argparse
+import asyncio
+import collections
+import io
+import itertools
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from urllib.parse import parse_qs, urlsplit
+
+from deck_batch import DeckRenderer, DeckSpec
+from deck_cli import builder_names, check_spec
+from deck_manifest import DEFAULT_CACHE_DIR, PROJECT_DIR
+
+PPTX_TYPE = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
+_REASONS = {200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found",
+            405: "Method Not Allowed", 409: "Conflict", 413: "Payload Too Large",
+            500: "Internal Server Error", 503: "Service Unavailable", 504: "Gateway Timeout"}
+MAX_BODY = 1 << 20
+
+
+class QueueFull(Exception):
+    pass
+
+
+# ── Workers ─────────────────────────────────────────────────────────
+_worker_renderer = None
+
+
+def _init_worker(cache_dir, templates):
+    global _worker_renderer
+    _worker_renderer = DeckRenderer(cache_dir=cache_dir)
+    for path in templates:
+        _worker_renderer._template(path)
+    _worker_renderer.build(DeckSpec("warmup", "warmup.pptx")).save(io.BytesIO())
+
+
+def _ready():
+    return os.getpid()
+
+
+def _render(spec, output=None):
+    """Build ``spec``; return ``(pptx bytes, slides)``, or ``(None, slides)``
+    after saving to ``output``."""
+    from deck_package import package_bytes, save_package
+
+    prs = _worker_renderer.build(spec)
+    if output is not None:
+        save_package(prs, output)  # atomic: a job's deck is never seen half-written
+        return None, len(prs.slides)
+    return package_bytes(prs), len(prs.slides)
+
+
+# ── Service ─────────────────────────────────────────────────────────
+class Job:
+    def __init__(self, spec, timeout, output=None):
+        self.id = uuid.uuid4().hex[:16]
+        self.spec = spec
+        self.output = output
+        self.timeout = timeout
+        self.created = time.monotonic()
+        self.deadline = self.created + timeout
+        self.state = "queued"
+        self.slides = 0
+        self.error = None
+        self.done = asyncio.get_running_loop().create_future()
+        # Background jobs are polled and timed-out requests stop waiting, so
+        # mark the outcome as retrieved to keep asyncio from warning about it.
+        self.done.add_done_callback(lambda f: f.cancelled() or f.exception())
+
+    def status(self):
+        status = {"id": self.id, "name": self.spec.name, "state": self.state}
+        if self.state == "done":
+            status["slides"] = self.slides
+        if self.error:
+            status["error"] = self.error
+        return status
+
+
+class DeckService:
+    """Bounded queue in front of a pool of warm rendering processes."""
+
+    def __init__(self, workers=None, queue_size=32, timeout=60.0, job_slides=40,
+                 job_dir=None, cache_dir=DEFAULT_CACHE_DIR, templates=(), max_jobs=1000,
+                 job_timeout=600.0):
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.job_timeout = job_timeout
+        self.job_slides = job_slides
+        self.job_dir = job_dir or tempfile.mkdtemp(prefix="deck_jobs_")
+        self.cache_dir = cache_dir
+        self.templates = tuple(templates)
+        self.max_jobs = max_jobs
+        self.jobs = collections.OrderedDict()
+        self.latencies = collections.deque(maxlen=1000)
+        self.counts = collections.Counter()
+        self._builders = builder_names()
+        self._pool = None
+        self._queue = None
+        self._dispatchers = []
+        self._overrunning = 0  # timed-out decks still being built
+
+    def _new_pool(self):
+        return ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                   initargs=(self.cache_dir, self.templates))
+
+    def _replace_pool(self, broken):
+        """Swap in a fresh pool, unless another dispatcher already replaced ``broken``."""
+        if self._pool is broken:
+            self.counts["pool_restarts"] += 1
+            broken.shutdown(wait=False, cancel_futures=True)
+            self._pool = self._new_pool()
+
+    def _run(self, job):
+        loop = asyncio.get_running_loop()
+        pool = self._pool
+        try:
+            return pool, loop.run_in_executor(pool, _render, job.spec, job.output)
+        except BrokenProcessPool:  # broke while no job of ours was watching it
+            self._replace_pool(pool)
+            pool = self._pool
+            return pool, loop.run_in_executor(pool, _render, job.spec, job.output)
+
+    async def start(self):
+        self._queue = asyncio.Queue(self.queue_size)
+        self._pool = self._new_pool()
+        loop = asyncio.get_running_loop()
+        # Submitting one call per worker at once makes the pool start (and warm) all of them.
+        await asyncio.gather(*(loop.run_in_executor(self._pool, _ready)
+                               for _ in range(self.workers)))
+        self._dispatchers = [asyncio.create_task(self._dispatch())
+                             for _ in range(self.workers)]
+
+    async def close(self):
+        for task in self._dispatchers:
+            task.cancel()
+        await asyncio.gather(*self._dispatchers, return_exceptions=True)
+        self._pool.shutdown(cancel_futures=True)
+
+    def parse_spec(self, data):
+        if isinstance(data, dict) and not data.get("name") and not data.get("output"):
+            data = dict(data, name="deck")
+        spec = DeckSpec.from_dict(data)
+        problems = check_spec(spec, self._builders)
+        if problems:
+            raise ValueError("; ".join(problems))
+        return spec
+
+    def submit(self, spec, background=False):
+        """Queue ``spec``; raises ``QueueFull`` when the queue is at capacity."""
+        slides = len(spec.slides) if spec.slides else len(self._builders)
+        background = background or slides >= self.job_slides
+        job = Job(spec, self.job_timeout if background else self.timeout)
+        if background:
+            job.output = os.path.join(self.job_dir, f"{job.id}.pptx")
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.counts["rejected"] += 1
+            raise QueueFull from None
+        self.jobs[job.id] = job
+        while len(self.jobs) > self.max_jobs:
+            _, old = self.jobs.popitem(last=False)
+            if old.output and os.path.exists(old.output):
+                os.remove(old.output)
+        return job
+
+    async def _dispatch(self):
+        while True:
+            job = await self._queue.get()
+            pool = future = None
+            try:
+                remaining = job.deadline - time.monotonic()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError
+                job.state = "running"
+                pool, future = self._run(job)
+                blob, job.slides = await asyncio.wait_for(asyncio.shield(future), remaining)
+                job.state = "done"
+                self.counts["done"] += 1
+                job.done.set_result(blob)
+            except asyncio.TimeoutError:
+                job.state, job.error = "failed", f"timed out after {job.timeout:g}s"
+                self.counts["timeout"] += 1
+                job.done.set_exception(TimeoutError(job.error))
+                if future is not None:  # the worker is still on it: keep its slot taken
+                    self._overrunning += 1
+                    try:
+                        await asyncio.wait([future])
+                    finally:
+                        self._overrunning -= 1
+                    if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+                        self._replace_pool(pool)
+            except Exception as exc:
+                if isinstance(exc, BrokenProcessPool):
+                    self._replace_pool(pool)
+                job.state, job.error = "failed", f"{type(exc).__name__}: {exc}"
+                self.counts["failed"] += 1
+                job.done.set_exception(RuntimeError(job.error))
+            finally:
+                self._queue.task_done()
+
+    def stats(self):
+        lat = sorted(self.latencies)
+        pct = (lambda q: round(lat[min(len(lat) - 1, int(q * len(lat)))] * 1e3, 1)) if lat else None
+        return {"workers": self.workers, "queued": self._queue.qsize(),
+                "overrunning": self._overrunning,
+                "queue_size": self.queue_size, "jobs": len(self.jobs),
+                "p50_ms": pct and pct(0.50), "p99_ms": pct and pct(0.99),
+                **self.counts}
+
+    # ── HTTP ────────────────────────────────────────────────────────
+    async def handle(self, method, path, query, body):
+        """Return ``(status, content type, body bytes, extra headers)``."""
+        parts = [p for p in path.split("/") if p]
+        if parts == ["decks"]:
+            if method != "POST":
+                return _json(405, {"error": "use POST"})
+            try:
+                spec = self.parse_spec(json.loads(body or b"{}"))
+            except ValueError as exc:
+                return _json(400, {"error": str(exc)})
+            background = query.get("async", ["0"])[0] not in ("0", "", "false")
+            start = time.monotonic()
+            try:
+                job = self.submit(spec, background)
+            except QueueFull:
+                return _json(503, {"error": "queue full"}, {"Retry-After": "1"})
+            if job.output is not None:
+                return _json(202, job.status(), {"Location": f"/jobs/{job.id}"})
+            try:
+                blob = await asyncio.wait_for(asyncio.shield(job.done), job.timeout)
+            except (asyncio.TimeoutError, TimeoutError):
+                return _json(504, job.status() | {"error": job.error or "timed out"})
+            except RuntimeError:
+                return _json(500, job.status())
+            finally:
+                self.jobs.pop(job.id, None)  # sync results are not kept
+            self.latencies.append(time.monotonic() - start)
+            return 200, PPTX_TYPE, blob, {
+                "Content-Disposition": f'attachment; filename="{spec.name}.pptx"'}
+        if parts[:1] == ["jobs"] and len(parts) in (2, 3) and method == "GET":
+            job = self.jobs.get(parts[1])
+            if job is None:
+                return _json(404, {"error": "no such job"})
+            if len(parts) == 2:
+                return _json(200, job.status())
+            if parts[2] != "deck":
+                return _json(404, {"error": "not found"})
+            if job.state != "done":
+                return _json(409, job.status())
+            with open(job.output, "rb") as fh:
+                return 200, PPTX_TYPE, fh.read(), {
+                    "Content-Disposition": f'attachment; filename="{job.spec.name}.pptx"'}
+        if parts == ["stats"] and method == "GET":
+            return _json(200, self.stats())
+        return _json(404, {"error": "not found"})
+
+    async def serve_client(self, reader, writer):
+        try:
+            while True:
+                request = await _read_request(reader)
+                if request is None:
+                    break
+                method, target, headers, body = request
+                url = urlsplit(target)
+                if body is None:
+                    status, ctype, payload, extra = _json(400, {"error": "malformed request"})
+                elif body is False:
+                    status, ctype, payload, extra = _json(413, {"error": "body too large"})
+                else:
+                    try:
+                        status, ctype, payload, extra = await self.handle(
+                            method, url.path, parse_qs(url.query), body)
+                    except Exception as exc:  # never drop the connection silently
+                        status, ctype, payload, extra = _json(500, {"error": str(exc)})
+                keep = headers.get("connection", "").lower() != "close" and body not in (None, False)
+                head = [f"HTTP/1.1 {status} {_REASONS.get(status, '')}",
+                        f"Content-Type: {ctype}", f"Content-Length: {len(payload)}",
+                        f"Connection: {'keep-alive' if keep else 'close'}"]
+                head += [f"{k}: {v}" for k, v in extra.items()]
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + payload)
+                await writer.drain()
+                if not keep:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+def _json(status, data, headers=None):
+    return status, "application/json", json.dumps(data).encode("utf-8"), headers or {}
+
+
+async def _read_request(reader):
+    line = await reader.readline()
+    if not line.strip():
+        return None
+    try:
+        method, target, _ = line.decode("latin-1").split(" ", 2)
+    except ValueError:  # answered with 400; the connection is closed after it
+        return "", "", {"connection": "close"}, None
+    headers = {}
+    while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+        key, _, value = line.decode("latin-1").partition(":")
+        headers[key.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length") or 0)
+    except ValueError:
+        length = -1
+    if length < 0:  # the body can't be found: answered with 400 and closed like a bad line
+        return method, target, {**headers, "connection": "close"}, None
+    if length > MAX_BODY:
+        return method, target, headers, False
+    body = await reader.readexactly(length) if length else b""
+    return method, target, headers, body
+
+
+async def serve(host="127.0.0.1", port=8765, ready=None, **options):
+    service = DeckService(**options)
+    await service.start()
+    server = await asyncio.start_server(service.serve_client, host, port)
+    print(f"✅ Deck service on http://{host}:{port} ({service.workers} warm workers)", flush=True)
+    if ready is not None:
+        ready.set()
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.close()
+
+
+# ── Benchmark ───────────────────────────────────────────────────────
+def _percentiles(samples):
+    samples = sorted(samples)
+    return (statistics.median(samples),
+            samples[min(len(samples) - 1, int(0.99 * len(samples)))])
+
+
+def bench(requests=40, concurrency=8, workers=None, port=8766, cold=4):
+    """Compare per-request latency of the service against a fresh process per deck."""
+    spec = json.dumps({"name": "bench", "slides": ["title", "problem_statement", "closing"]}).encode("utf-8")
+    with tempfile.TemporaryDirectory() as tmp:
+        cold_times = []
+        script = ("import json, sys, deck_batch; "
+                  "r = deck_batch.DeckRenderer(); "
+                  "r.build(deck_batch.DeckSpec.from_dict(json.loads(sys.argv[1]))).save(sys.argv[2])")
+        for i in range(cold):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, "-c", script, spec.decode("utf-8"),
+                            os.path.join(tmp, f"cold{i}.pptx")], cwd=PROJECT_DIR, check=True)
+            cold_times.append(time.perf_counter() - start)
+
+        ready = threading.Event()
+        loop = asyncio.new_event_loop()
+        server = threading.Thread(target=loop.run_until_complete, daemon=True, args=(
+            serve(port=port, ready=ready, workers=workers, queue_size=requests,
+                  cache_dir=None, job_dir=tmp),))
+        server.start()
+        ready.wait()
+        url = f"http://127.0.0.1:{port}/decks"
+        warm_times = []
+        lock = threading.Lock()
+        counter = itertools.count()
+
+        def client():
+            while next(counter) < requests:
+                start = time.perf_counter()
+                req = urllib.request.Request(url, data=spec, method="POST")
+                try:
+                    with urllib.request.urlopen(req) as resp:
+                        resp.read()
+                except urllib.error.HTTPError as exc:
+                    print(f"❌ HTTP {exc.code}", file=sys.stderr)
+                    continue
+                with lock:
+                    warm_times.append(time.perf_counter() - start)
+
+        threads = [threading.Thread(target=client) for _ in range(concurrency)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    for label, times in (("cold (new process)", cold_times), ("warm service", warm_times)):
+        p50, p99 = _percentiles(times)
+        print(f"{label:<20} n={len(times):<4} p50 {p50 * 1e3:8.1f} ms   p99 {p99 * 1e3:8.1f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_serve = sub.add_parser("serve", help="run the service")
+    p_serve.add_argument("--host", default="127.0.0.1")
+    p_serve.add_argument("--port", type=int, default=8765)
+    p_serve.add_argument("--workers", type=int, default=None,
+                         help="warm worker processes (default: one per core)")
+    p_serve.add_argument("--queue-size", type=int, default=32,
+                         help="requests waiting beyond this get 503 (default: 32)")
+    p_serve.add_argument("--timeout", type=float, default=60.0,
+                         help="seconds before a request gets 504 (default: 60)")
+    p_serve.add_argument("--job-timeout", type=float, default=600.0,
+                         help="seconds a background job may take (default: 600)")
+    p_serve.add_argument("--job-slides", type=int, default=40,
+                         help="decks with this many slides become background jobs")
+    p_serve.add_argument("--job-dir", default=None, help="where background job decks are kept")
+    p_serve.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR,
+                         help=f"slide cache location (default: {DEFAULT_CACHE_DIR})")
+    p_serve.add_argument("--no-cache", action="store_true")
+    p_serve.add_argument("--template", action="append", default=[],
+                         help="template to preload in every worker (repeatable)")
+    p_bench = sub.add_parser("bench", help="compare warm-service latency with the cold path")
+    p_bench.add_argument("--requests", type=int, default=40)
+    p_bench.add_argument("--concurrency", type=int, default=8)
+    p_bench.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    if args.command == "bench":
+        bench(args.requests, args.concurrency, args.workers)
+        return 0
+    try:
+        asyncio.run(serve(args.host, args.port, workers=args.workers,
+                          queue_size=args.queue_size, timeout=args.timeout,
+                          job_timeout=args.job_timeout,
+                          job_slides=args.job_slides, job_dir=args.job_dir,
+                          cache_dir=None if args.no_cache else args.cache_dir,
+                          templates=args.template))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
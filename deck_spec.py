@@ -0,0 +1,335 @@
+"""
+Declarative slide specs compiled to cached layout plans.
+
+A slide spec (JSON, or YAML when PyYAML is installed) describes a slide as a
+background plus a list of elements, with geometry in inches and colours given
+as palette names from ``generate_ppt`` (``ACCENT``, ``RED_ACCENT`` …) or hex
+strings (``"25151A"``):
+
+    background: BG_DARK
+    elements:
+      - {type: heading, text: The Problem, color: RED_ACCENT}
+      - {type: text, box: [0.8, 1.3, 11.5, 0.8], text: "...", size: 22}
+      - type: card_grid
+        origin: [0.8, 2.5]
+        cell: [2.75, 2.0]
+        gap: 0.2
+        columns: 4
+        card_color: "25151A"
+        title_color: RED_ACCENT
+        items:
+          - {title: "Syntax vs. Logic?", body: ["...", "..."]}
+
+Element types: ``heading``, ``text``, ``bullets``, ``accent_line``,
+``picture``, ``card_grid``, ``chip_row`` and ``step_flow``; the defaults
+mirror the hand-written builders in ``generate_ppt``.  A ``fit`` key on the
+spec or on an element (``shrink``, ``flag`` or ``off``) overrides
+``generate_ppt.TEXT_FIT`` for its text.  A relative picture ``path`` in a spec file
+is read from the file's own directory.
+
+Compilation splits a spec into its *layout* (everything but the text) and
+its *content*.  The layout is compiled once into a flat plan of EMU
+positions, sizes and resolved styles, and the plan is memoised on the
+layout alone, so content variants of the same slide (one per student, per
+problem …) reuse it and only fill in text slots.
+"""
+
+import functools
+import hashlib
+import json
+import os
+from collections import namedtuple
+
+from pptx.dml.color import RGBColor
+from pptx.enum.text import PP_ALIGN
+from pptx.util import Inches
+
+import generate_ppt as gp
+
+try:
+    import yaml
+except ImportError:  # YAML specs are optional; JSON always works
+    yaml = None
+
+# Keys holding slide content rather than layout.
+_CONTENT_KEYS = ("text", "title", "body")
+_ALIGN = {"left": PP_ALIGN.LEFT, "center": PP_ALIGN.CENTER, "right": PP_ALIGN.RIGHT}
+_CARD_COLOR = "1A1D2E"
+
+# A plan step: ``kind`` selects the helper, ``geom`` is EMU (left, top, width,
+# height), ``style`` holds resolved keyword arguments and ``slot`` is the path
+# of the text to fill in from the spec (or None).
+Op = namedtuple("Op", "kind geom style slot")
+LayoutPlan = namedtuple("LayoutPlan", "background ops")
+
+
+class SpecError(ValueError):
+    pass
+
+
+# ── Loading ─────────────────────────────────────────────────────────
+def load_spec(path):
+    with open(path, encoding="utf-8") as fh:
+        text = fh.read()
+    if path.endswith((".yaml", ".yml")):
+        if yaml is None:
+            raise SpecError(f"{path}: PyYAML is required for YAML slide specs")
+        spec = yaml.safe_load(text)
+    else:
+        spec = json.loads(text)
+    if not isinstance(spec, dict) or not isinstance(spec.get("elements"), list):
+        raise SpecError(f"{path}: a slide spec needs an 'elements' list")
+    base = os.path.dirname(os.path.abspath(path))
+    for el in spec["elements"]:  # pictures sit next to the spec, not in the cwd
+        if (isinstance(el, dict) and el.get("type") == "picture"
+                and isinstance(el.get("path"), str)):
+            el["path"] = os.path.join(base, el["path"])
+    return spec
+
+
+# ── Compilation ─────────────────────────────────────────────────────
+def color(value):
+    if isinstance(value, RGBColor):
+        return value
+    palette = getattr(gp, str(value), None)
+    if isinstance(palette, RGBColor):
+        return palette
+    try:
+        return RGBColor.from_string(str(value).lstrip("#").upper())
+    except ValueError:
+        raise SpecError(f"Unknown colour {value!r}") from None
+
+
+def _pair(value, name):
+    if isinstance(value, (int, float)):
+        return value, value
+    if isinstance(value, (list, tuple)) and len(value) == 2:
+        return value[0], value[1]
+    raise SpecError(f"'{name}' must be a number or a [x, y] pair")
+
+
+def _box(el):
+    box = el.get("box")
+    if not isinstance(box, (list, tuple)) or len(box) != 4:
+        raise SpecError(f"{el.get('type')}: 'box' must be [left, top, width, height]")
+    return tuple(Inches(v) for v in box)
+
+
+def _align(i, el):
+    try:
+        return _ALIGN[el.get("align", "left")]
+    except (KeyError, TypeError):
+        raise SpecError(f"{el.get('type')} (element {i}): 'align' must be left, center "
+                        f"or right, got {el.get('align')!r}") from None
+
+
+def layout_signature(spec):
+    """Canonical JSON of ``spec`` with every text field blanked out."""
+    def strip(el):
+        out = {k: v for k, v in el.items() if k not in _CONTENT_KEYS and k != "items"}
+        if "items" in el:
+            out["items"] = [strip(it) if isinstance(it, dict) else None for it in el["items"]]
+        return out
+
+    layout = {"background": spec.get("background", "BG_DARK"), "fit": spec.get("fit"),
+              "elements": [strip(el) for el in spec["elements"]]}
+    return json.dumps(layout, sort_keys=True, separators=(",", ":"))
+
+
+def _compile_element(i, el, ops, fit=None):
+    kind = el.get("type")
+    slot = ("elements", i)
+    fit = el.get("fit", fit)
+    if kind == "heading":
+        left, top = el.get("left", 0.8), el.get("top", 0.4)
+        col = color(el.get("color", "ACCENT"))
+        ops.append(Op("text", (Inches(left), Inches(top), Inches(11), Inches(0.6)),
+                      dict(font_size=el.get("size", 36), bold=True, color=col, fit=fit),
+                      slot + ("text",)))
+        ops.append(Op("line", (Inches(left), Inches(el.get("line_top", top + 0.65)),
+                               Inches(el.get("line_width", 2.5)), None),
+                      dict(color=col), None))
+    elif kind == "text":
+        ops.append(Op("text", _box(el),
+                      dict(font_size=el.get("size", 18), bold=el.get("bold", False),
+                           color=color(el.get("color", "WHITE")),
+                           alignment=_align(i, el), fit=fit),
+                      slot + ("text",)))
+    elif kind == "bullets":
+        ops.append(Op("bullets", _box(el),
+                      dict(font_size=el.get("size", 16),
+                           color=color(el.get("color", "LIGHT_GRAY")), fit=fit),
+                      slot + ("items",)))
+    elif kind == "accent_line":
+        left, top = _pair(el.get("origin", 0), "origin")
+        ops.append(Op("line", (Inches(left), Inches(top),
+                               Inches(el["width"]) if "width" in el else gp.SLIDE_W, None),
+                      dict(color=color(el.get("color", "ACCENT"))), None))
+    elif kind == "picture":
+        box = el.get("box", ())
+        geom = tuple(Inches(v) for v in box) + (None,) * (4 - len(box))
+        if not el.get("path"):
+            raise SpecError(f"picture (element {i}): needs a 'path'")
+        ops.append(Op("picture", geom, dict(path=el["path"]), None))
+    elif kind in ("card_grid", "chip_row", "step_flow"):
+        _compile_grid(kind, slot, el, ops, fit)
+    else:
+        raise SpecError(f"Unknown element type {kind!r}")
+
+
+def _compile_grid(kind, slot, el, ops, fit):
+    items = el.get("items") or []
+    x0, y0 = _pair(el.get("origin", (0.8, 2.2)), "origin")
+    cw, ch = _pair(el.get("cell", (2.75, 2.0)), "cell")
+    gx, gy = _pair(el.get("gap", 0.2), "gap")
+    columns = el.get("columns", len(items)) if kind == "card_grid" else len(items)
+    columns = max(1, columns)
+    w, h = Inches(cw), Inches(ch)
+    cells = []
+    for n in range(len(items)):
+        row, col = divmod(n, columns)
+        cells.append((Inches(x0 + col * (cw + gx)), Inches(y0 + row * (ch + gy))))
+
+    if kind == "card_grid":
+        card = color(el.get("card_color", _CARD_COLOR))
+        for n, (x, y) in enumerate(cells):
+            item = items[n] if isinstance(items[n], dict) else {}
+            title_col = color(item.get("title_color", el.get("title_color", "ACCENT2")))
+            ops.append(Op("card", (x, y, w, h),
+                          dict(card_color=card, title_color=title_col, fit=fit),
+                          slot + ("items", n)))
+    elif kind == "chip_row":
+        fill = color(el.get("fill", _CARD_COLOR))
+        style = dict(font_size=el.get("size", 14), color=color(el.get("color", "ACCENT")),
+                     alignment=PP_ALIGN.CENTER, fit=fit)
+        for n, (x, y) in enumerate(cells):
+            ops.append(Op("rect", (x, y, w, h), dict(fill_color=fill), None))
+            ops.append(Op("text", (x, y + Inches(0.03), w, h - Inches(0.05)), style,
+                          slot + ("items", n)))
+    else:  # step_flow
+        fill = color(el.get("card_color", _CARD_COLOR))
+        connector = color(el.get("connector_color", "444466"))
+        body_style = dict(font_size=el.get("body_size", 12), color=color("LIGHT_GRAY"),
+                          alignment=PP_ALIGN.CENTER, fit=fit)
+        for n, (x, y) in enumerate(cells):
+            item = items[n] if isinstance(items[n], dict) else {}
+            ops.append(Op("rect", (x, y, w, h), dict(fill_color=fill), None))
+            ops.append(Op("text", (x, y + Inches(0.2), w, Inches(0.45)),
+                          dict(font_size=el.get("title_size", 15), bold=True,
+                               color=color(item.get("color", "ACCENT")),
+                               alignment=PP_ALIGN.CENTER, fit=fit),
+                          slot + ("items", n, "title")))
+            ops.append(Op("text", (x + Inches(0.1), y + Inches(0.75),
+                                   w - Inches(0.2), h - Inches(0.9)),
+                          body_style, slot + ("items", n, "body")))
+        for x, y in cells[1:]:
+            ops.append(Op("rect", (x - Inches(gx / 2 + 0.045), y + Inches(1.0),
+                                   Inches(0.09), Inches(0.35)),
+                          dict(fill_color=connector), None))
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_signature(signature):
+    layout = json.loads(signature)
+    ops = []
+    for i, el in enumerate(layout["elements"]):
+        _compile_element(i, el, ops, layout.get("fit"))
+    return LayoutPlan(color(layout["background"]), tuple(ops))
+
+
+def compile_spec(spec):
+    """Return the (memoised) ``LayoutPlan`` for ``spec``'s layout."""
+    return _compile_signature(layout_signature(spec))
+
+
+# ── Rendering ───────────────────────────────────────────────────────
+def _slot(spec, path):
+    value = spec
+    for key in path:
+        value = value[key]
+    return value
+
+
+def _lines(value):
+    if isinstance(value, str):
+        return value.split("\n")
+    return list(value)
+
+
+def render_spec(prs, spec, plan=None):
+    """Append a slide for ``spec`` to ``prs`` by replaying its layout plan."""
+    plan = plan or compile_spec(spec)
+    slide = prs.slides.add_slide(prs.slide_layouts[6])
+    gp.set_slide_bg(slide, plan.background)
+    for op in plan.ops:
+        left, top, width, height = op.geom
+        if op.kind == "text":
+            gp.add_text_box(slide, left, top, width, height,
+                            str(_slot(spec, op.slot)), **op.style)
+        elif op.kind == "bullets":
+            gp.add_bullet_frame(slide, left, top, width, height,
+                                _lines(_slot(spec, op.slot)), **op.style)
+        elif op.kind == "card":
+            item = _slot(spec, op.slot)
+            gp.add_card(slide, left, top, width, height, item.get("title", ""),
+                        _lines(item.get("body", ())), **op.style)
+        elif op.kind == "rect":
+            gp.add_shape_rect(slide, left, top, width, height, op.style["fill_color"])
+        elif op.kind == "line":
+            gp.add_accent_line(slide, left, top, width, op.style["color"])
+        elif op.kind == "picture":
+            if os.path.exists(op.style["path"]):
+                gp.add_picture(slide, op.style["path"], left, top, width, height)
+    return slide
+
+
+class SpecSlide:
+    """A slide builder backed by a spec, usable wherever builders are."""
+
+    # Helpers a compiled plan may call; their code is part of the cache key.
+    HELPERS = ("set_slide_bg", "add_text_box", "add_bullet_frame", "add_card",
+               "add_shape_rect", "add_accent_line", "add_picture")
+
+    def __init__(self, spec, name=None):
+        self.spec = spec
+        self.__qualname__ = name or "spec_slide"
+
+    @classmethod
+    def from_file(cls, path):
+        return cls(load_spec(path), name=os.path.splitext(os.path.basename(path))[0])
+
+    def __call__(self, prs):
+        return render_spec(prs, self.spec)
+
+    def fingerprint(self):
+        from deck_cache import file_digest, function_digest
+
+        h = hashlib.sha256(json.dumps(self.spec, sort_keys=True).encode("utf-8"))
+        h.update(_fingerprint_source().encode("ascii"))
+        for op in compile_spec(self.spec).ops:
+            if op.kind == "picture" and os.path.isfile(op.style["path"]):
+                h.update(file_digest(op.style["path"]).encode("ascii"))
+        for name in self.HELPERS:
+            h.update(function_digest(getattr(gp, name)).encode("ascii"))
+        return h.hexdigest()
+
+
+@functools.lru_cache(maxsize=1)
+def _fingerprint_source():
+    """Digest of this module plus the palette, so compiler changes invalidate."""
+    h = hashlib.sha256()
+    with open(__file__, "rb") as fh:
+        h.update(fh.read())
+    for name, value in sorted(vars(gp).items()):
+        if isinstance(value, RGBColor):
+            h.update(f"{name}={value}".encode("ascii"))
+    return h.hexdigest()
+
+
+def resolve_slide(entry):
+    """Resolve a deck-spec slide entry: builder name, spec file or inline spec."""
+    if isinstance(entry, dict):
+        return SpecSlide(entry)
+    if entry.endswith((".json", ".yaml", ".yml")):
+        return SpecSlide.from_file(entry)
+    return gp.resolve_slides((entry,))[0]
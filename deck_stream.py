@@ -0,0 +1,204 @@
+"""
+Streaming .pptx writer for decks with thousands of slides.
+
+``prs.save()`` serialises a package that has been held in memory in full, so
+peak memory grows with slide count.  ``StreamingDeckWriter`` instead writes
+each slide part (its XML, its ``.rels`` and any new media) into the zip as
+soon as its builder returns, then swaps the presentation's relationship to
+that slide for a blob-less placeholder part so the slide's XML tree can be
+freed.  Only the slide list in ``presentation.xml`` and one placeholder per
+slide are kept until ``close()``, which writes the template parts, the
+presentation part and ``[Content_Types].xml``.
+
+Images are deduplicated across the whole deck by SHA-1, as python-pptx does
+in memory, and each distinct image is written once under ``ppt/media/``.
+Other parts a slide owns (charts and their embedded workbooks, notes) are
+written with it, under names no later part can take: python-pptx numbers
+new charts from the parts it can still reach, so the next slide's chart
+would otherwise be ``chart1.xml`` again.
+
+Builders must only add to slides they append themselves (any number, though
+usually one); slides already streamed out can no longer be read back through
+``prs.slides``.
+"""
+
+import zipfile
+
+from pptx.opc.constants import RELATIONSHIP_TARGET_MODE as RTM
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.opc.oxml import CT_Relationships, serialize_part_xml
+from pptx.opc.package import Part, _Relationship
+from pptx.opc.packuri import PACKAGE_URI, PackURI
+from pptx.opc.serialized import _ContentTypesItem
+
+import generate_ppt as gp
+from deck_cache import build_slide_cached
+from deck_package import STORED_EXTS
+
+
+class _StreamedPart(Part):
+    """Stands in for a part whose bytes are already in the zip."""
+
+    def __init__(self, partname, content_type, package):
+        super().__init__(partname, content_type, package, blob=b"")
+
+
+class StreamingDeckWriter:
+    """Write slides to ``pkg_file`` one at a time.
+
+    Use as a context manager, or call ``close()`` to finish the package::
+
+        with StreamingDeckWriter("appendix.pptx") as writer:
+            for builder in builders:
+                writer.add(builder)
+    """
+
+    def __init__(self, pkg_file, template=None, cache=None,
+                 compression=zipfile.ZIP_DEFLATED):
+        self.prs = gp.new_presentation(template)
+        self.cache = cache
+        self._package = self.prs.part.package
+        self._zip = zipfile.ZipFile(pkg_file, "w", compression=compression,
+                                    strict_timestamps=False)
+        self._streamed = set()
+        self._media = {}  # sha1 -> PackURI of the written image
+        self._written = []  # stand-ins for streamed media and slide-owned parts
+        self._taken = {part.partname for part in self._package.iter_parts()}
+        self._next_index = {}  # partname stem -> next number to try
+        self._shared = (None, None)  # (non-slide rel count, parts) of the last _shared_parts()
+        self._next_media = 1
+        self.slides = len(self.prs.slides)
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._zip.close()
+
+    def add(self, builder):
+        """Run ``builder(prs)`` and stream the slides it appended (usually one)."""
+        before = len(self.prs.slides)
+        if self.cache is not None:
+            build_slide_cached(self.prs, builder, self.cache)
+        else:
+            builder(self.prs)
+        for i in range(before, len(self.prs.slides)):
+            self._flush(self.prs.slides[i])
+
+    def _media_partname(self, image_part):
+        partname = self._media.get(image_part.sha1)
+        if partname is None:
+            while True:
+                partname = PackURI(f"/ppt/media/image{self._next_media}.{image_part.partname.ext}")
+                self._next_media += 1
+                if partname not in self._taken:
+                    break
+            self._taken.add(partname)
+            stored = partname.ext.lower() in STORED_EXTS  # already compressed
+            self._zip.writestr(partname.membername, image_part.blob,
+                               zipfile.ZIP_STORED if stored else None)
+            self._media[image_part.sha1] = partname
+            self._written.append(
+                _StreamedPart(partname, image_part.content_type, self._package))
+        return partname
+
+    def _claim(self, partname):
+        """``partname``, or the next free name numbered like it."""
+        if partname in self._taken:
+            ext = partname.ext
+            stem = partname[:-len(ext) - 1].rstrip("0123456789")
+            n = self._next_index.get(stem, 1)
+            while PackURI(f"{stem}{n}.{ext}") in self._taken:
+                n += 1
+            self._next_index[stem] = n + 1
+            partname = PackURI(f"{stem}{n}.{ext}")
+        self._taken.add(partname)
+        return partname
+
+    def _shared_parts(self):
+        """Parts reachable without going through a slide (masters, layouts, the
+        notes master …); ``close()`` writes those.  Recomputed only when a
+        part is related to the presentation, e.g. on the first notes slide."""
+        key = len(self.prs.part.rels) - len(self.prs.slides)
+        if self._shared[0] == key:
+            return self._shared[1]
+        shared = {self.prs.part}
+        todo = [rel.target_part for rel in self.prs.part.rels.values()
+                if not rel.is_external and rel.reltype != RT.SLIDE]
+        while todo:
+            part = todo.pop()
+            if part not in shared:
+                shared.add(part)
+                todo.extend(rel.target_part for rel in part.rels.values() if not rel.is_external)
+        self._shared = (key, shared)
+        return shared
+
+    def _write_part(self, part, partname, names, shared):
+        """Write ``part`` as ``partname`` with its rels, then the parts it owns."""
+        names[part] = partname
+        rels = CT_Relationships.new()
+        for rId in sorted(part.rels, key=lambda r: (len(r), r)):
+            rel = part.rels[rId]
+            if rel.is_external:
+                rels.add_rel(rId, rel.reltype, rel.target_ref, True)
+                continue
+            target = rel.target_part
+            if target in names:
+                target_name = names[target]
+            elif target in shared:
+                target_name = target.partname
+            elif rel.reltype == RT.IMAGE:
+                target_name = self._media_partname(target)
+            else:  # owned by this slide: a chart, its workbook, notes …
+                target_name = self._claim(target.partname)
+                self._write_part(target, target_name, names, shared)
+                self._written.append(
+                    _StreamedPart(target_name, target.content_type, self._package))
+            rels.add_rel(rId, rel.reltype, target_name.relative_ref(partname.baseURI), False)
+        self._zip.writestr(partname.membername, part.blob)
+        if len(rels):
+            self._zip.writestr(partname.rels_uri.membername, rels.xml_file_bytes)
+
+    def _flush(self, slide):
+        part = slide.part
+        self._write_part(part, part.partname, {}, self._shared_parts())
+
+        # Point the presentation at a placeholder so the slide tree can be freed.
+        prs_part = self.prs.part
+        for rId, rel in list(prs_part.rels.items()):
+            if not rel.is_external and rel.target_part is part:
+                stub = _StreamedPart(part.partname, part.content_type, self._package)
+                self._streamed.add(stub)
+                prs_part.rels._rels[rId] = _Relationship(
+                    prs_part.partname.baseURI, rId, RT.SLIDE, RTM.INTERNAL, stub)
+                break
+        self.slides += 1
+
+    def close(self):
+        """Write the remaining package parts and finish the zip."""
+        if self._closed:
+            return
+        parts = list(self._package.iter_parts())
+        content_types = _ContentTypesItem.xml_for(parts + self._written)
+        self._zip.writestr("[Content_Types].xml", serialize_part_xml(content_types))
+        self._zip.writestr(PACKAGE_URI.rels_uri.membername, self._package._rels.xml)
+        for part in parts:
+            if part in self._streamed:
+                continue
+            self._zip.writestr(part.partname.membername, part.blob)
+            if part._rels:
+                self._zip.writestr(part.partname.rels_uri.membername, part.rels.xml)
+        self._zip.close()
+        self._closed = True
+
+
+def stream_deck(pkg_file, builders, template=None, cache=None):
+    """Build ``builders`` into ``pkg_file`` with bounded memory; returns slide count."""
+    with StreamingDeckWriter(pkg_file, template, cache) as writer:
+        for builder in builders:
+            writer.add(builder)
+    return writer.slides
@@ -0,0 +1,154 @@
+"""
+Shared text and shape styles applied as prebuilt XML fragments.
+
+python-pptx styles text one property at a time: every paragraph of every
+text box gets its own ``a:pPr``/``a:defRPr``/``a:solidFill``/``a:latin``
+chain, and every rectangle goes through the autoshape factory before its
+fill, line and corner adjustment are patched in.  Here a style is defined
+once and compiled to an XML fragment:
+
+* ``TextStyle`` becomes the text box's ``a:lstStyle`` (level-1 paragraph
+  defaults), so paragraphs carry no formatting of their own and a ten-item
+  bullet frame holds one copy of its style instead of ten.
+* ``ShapeStyle`` becomes a complete ``p:sp`` template (geometry, fill, line)
+  that is deep-copied and positioned.
+
+Fragments are memoised per style, so equal styles built from helper keyword
+arguments share one compiled fragment for the whole run.  Styles are plain
+frozen dataclasses and can be declared once by name in ``generate_ppt``.
+"""
+
+import copy
+import functools
+import weakref
+from dataclasses import dataclass
+
+from pptx.dml.color import RGBColor
+from pptx.enum.text import PP_ALIGN
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import nsdecls, qn
+
+_ALIGN_ATTR = {PP_ALIGN.LEFT: "l", PP_ALIGN.CENTER: "ctr", PP_ALIGN.RIGHT: "r",
+               PP_ALIGN.JUSTIFY: "just"}
+
+
+@dataclass(frozen=True)
+class TextStyle:
+    size: float = 18
+    color: RGBColor = RGBColor(0xFF, 0xFF, 0xFF)
+    bold: bool = None
+    font: str = "Segoe UI"
+    align: PP_ALIGN = None
+    space_after: float = None  # points
+
+
+@dataclass(frozen=True)
+class ShapeStyle:
+    fill: RGBColor
+    geometry: str = "roundRect"
+    corner: float = 0.05  # rounded-corner adjustment, ignored for "rect"
+
+
+@functools.lru_cache(maxsize=None)
+def text_fragment(style):
+    """Compile ``style`` to an ``a:lstStyle`` element (shared; copy before use)."""
+    algn = f' algn="{_ALIGN_ATTR[style.align]}"' if style.align is not None else ""
+    spc = (f'<a:spcAft><a:spcPts val="{int(style.space_after * 100)}"/></a:spcAft>'
+           if style.space_after is not None else "")
+    bold = f' b="{int(bool(style.bold))}"' if style.bold is not None else ""
+    return parse_xml(
+        f'<a:lstStyle {nsdecls("a")}><a:lvl1pPr{algn}>{spc}'
+        f'<a:defRPr sz="{int(style.size * 100)}"{bold}>'
+        f'<a:solidFill><a:srgbClr val="{style.color}"/></a:solidFill>'
+        f'<a:latin typeface="{style.font}"/>'
+        f'</a:defRPr></a:lvl1pPr></a:lstStyle>'
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _textbox_template(style):
+    sp = parse_xml(
+        f'<p:sp {nsdecls("a", "p")}>'
+        f'<p:nvSpPr><p:cNvPr id="0" name=""/><p:cNvSpPr txBox="1"/><p:nvPr/></p:nvSpPr>'
+        f'<p:spPr><a:xfrm><a:off x="0" y="0"/><a:ext cx="0" cy="0"/></a:xfrm>'
+        f'<a:prstGeom prst="rect"><a:avLst/></a:prstGeom><a:noFill/></p:spPr>'
+        f'<p:txBody><a:bodyPr wrap="square"><a:spAutoFit/></a:bodyPr><a:lstStyle/><a:p/>'
+        f'</p:txBody></p:sp>'
+    )
+    body = sp.find(qn("p:txBody"))
+    body.replace(body.find(qn("a:lstStyle")), copy.deepcopy(text_fragment(style)))
+    return sp
+
+
+@functools.lru_cache(maxsize=None)
+def shape_fragment(style):
+    """Compile ``style`` to a ``p:sp`` template (shared; copy before use)."""
+    av = (f'<a:gd name="adj" fmla="val {int(round(style.corner * 100000))}"/>'
+          if style.geometry == "roundRect" else "")
+    return parse_xml(
+        f'<p:sp {nsdecls("a", "p")}>'
+        f'<p:nvSpPr><p:cNvPr id="0" name=""/><p:cNvSpPr/><p:nvPr/></p:nvSpPr>'
+        f'<p:spPr><a:xfrm><a:off x="0" y="0"/><a:ext cx="0" cy="0"/></a:xfrm>'
+        f'<a:prstGeom prst="{style.geometry}"><a:avLst>{av}</a:avLst></a:prstGeom>'
+        f'<a:solidFill><a:srgbClr val="{style.fill}"/></a:solidFill>'
+        f'<a:ln><a:noFill/></a:ln></p:spPr>'
+        f'<p:style><a:lnRef idx="1"><a:schemeClr val="accent1"/></a:lnRef>'
+        f'<a:fillRef idx="3"><a:schemeClr val="accent1"/></a:fillRef>'
+        f'<a:effectRef idx="2"><a:schemeClr val="accent1"/></a:effectRef>'
+        f'<a:fontRef idx="minor"><a:schemeClr val="lt1"/></a:fontRef></p:style>'
+        f'<p:txBody><a:bodyPr rtlCol="0" anchor="ctr"/><a:lstStyle/>'
+        f'<a:p><a:pPr algn="ctr"/></a:p></p:txBody></p:sp>'
+    )
+
+
+_SHAPE_NAMES = {"roundRect": "Rounded Rectangle", "rect": "Rectangle"}
+_next_ids = weakref.WeakKeyDictionary()  # spTree -> (next shape id, child count then)
+
+
+def _next_shape_id(tree):
+    """Next free shape id in ``tree``, scanning the tree only when someone else changed it."""
+    cached = _next_ids.get(tree)
+    if cached is not None and cached[1] == len(tree):
+        return cached[0]
+    return tree.max_shape_id + 1
+
+
+def _place(slide, template, name, left, top, width, height):
+    shapes = slide.shapes
+    tree = shapes._spTree
+    shape_id = _next_shape_id(tree)
+    sp = copy.deepcopy(template)
+    c_nv_pr = sp[0][0]
+    c_nv_pr.set("id", str(shape_id))
+    c_nv_pr.set("name", f"{name} {shape_id - 1}")
+    xfrm = sp[1][0]
+    xfrm[0].set("x", str(int(left)))
+    xfrm[0].set("y", str(int(top)))
+    xfrm[1].set("cx", str(int(width)))
+    xfrm[1].set("cy", str(int(height)))
+    tree.insert_element_before(sp, "p:extLst")
+    _next_ids[tree] = (shape_id + 1, len(tree))
+    return sp, shapes
+
+
+def add_styled_text(slide, left, top, width, height, paragraphs, style):
+    """Add a text box with one paragraph per item of ``paragraphs``.
+
+    Line feeds inside an item become line breaks, as with python-pptx's
+    ``paragraph.text``.
+    """
+    sp, shapes = _place(slide, _textbox_template(style), "TextBox",
+                        left, top, width, height)
+    body = sp[2]
+    p = body[2]
+    for i, text in enumerate(paragraphs):
+        if i:
+            p = body.add_p()
+        p.append_text(text)
+    return shapes._shape_factory(sp)
+
+
+def add_styled_shape(slide, left, top, width, height, style):
+    sp, shapes = _place(slide, shape_fragment(style), _SHAPE_NAMES.get(style.geometry, "Shape"),
+                        left, top, width, height)
+    return shapes._shape_factory(sp)
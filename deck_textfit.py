@@ -0,0 +1,197 @@
+"""
+Text measurement and auto-fit for text boxes.
+
+Text boxes are placed at fixed point sizes in fixed boxes, and generated
+content can run past them.  This module measures text from font metrics,
+word-wraps it the way PowerPoint does for a ``wrap="square"`` box, and
+reports whether it fits; ``fit()`` steps the size down until it does.  The
+helpers in ``generate_ppt`` run every box through it (see ``TEXT_FIT``) and
+``flag()`` the ones that overflow, so ``report()`` can list them at the end
+of a build instead of someone opening each deck to look.  Flags go to the
+list of the innermost ``collect()`` block, which is per build (and per
+thread), so concurrent or back-to-back builds never see each other's.
+
+The deck's text boxes grow to fit their text (``spAutoFit``), so a box
+overflows when its lines need more height than the box was given; the
+small top and bottom insets are allowed to spill.
+
+Metrics come from a built-in table of advance widths (Helvetica's, a close
+stand-in for the sans-serif fonts the deck uses), so measurements do not
+depend on which fonts the build machine has and a deck always builds the
+same way.  ``register_font()`` switches a family to the real TrueType
+metrics of a font file, read through Pillow.
+
+Widths are memoised per (font, bold, string) in em units and scaled to the
+point size, so repeated labels (chips, step titles, card headings) are
+measured once per run whatever their size; word widths are memoised the
+same way for wrapping.
+"""
+
+import contextlib
+import contextvars
+import functools
+import unicodedata
+from collections import namedtuple
+
+from pptx.util import Emu, Pt
+
+# Helvetica advance widths (1/1000 em) for ' ' .. '~'.
+_WIDTHS = (
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+)
+_DEFAULT_WIDTH = 556
+_BOLD_FACTOR = 1.07
+LINE_SPACING = 1.2  # line height as a multiple of the font size
+INSET_X = 7.2  # PowerPoint's default left/right text inset (0.1") in points
+
+Fit = namedtuple("Fit", "size lines height fits")
+Overflow = namedtuple("Overflow", "slide text size needed height")
+
+_fonts = {}  # family -> (regular path, bold path)
+_collector = contextvars.ContextVar("deck_textfit_overflows", default=None)
+
+
+def register_font(family, path, bold_path=None):
+    """Measure ``family`` with the TrueType file at ``path`` (needs Pillow)."""
+    _fonts[family] = (path, bold_path or path)
+    _em_width.cache_clear()
+
+
+@functools.lru_cache(maxsize=None)
+def _truetype(path):
+    from PIL import ImageFont
+
+    return ImageFont.truetype(path, 1000)
+
+
+def _char_width(ch):
+    code = ord(ch)
+    if 32 <= code <= 126:
+        return _WIDTHS[code - 32]
+    if unicodedata.east_asian_width(ch) in "WF":
+        return 1000
+    if unicodedata.combining(ch):
+        return 0
+    return _DEFAULT_WIDTH
+
+
+@functools.lru_cache(maxsize=65536)
+def _em_width(font, bold, text):
+    """Advance width of ``text`` in em (1.0 = the font size)."""
+    paths = _fonts.get(font)
+    if paths is not None:
+        return _truetype(paths[bool(bold)]).getlength(text) / 1000
+    width = sum(_char_width(ch) for ch in text) / 1000
+    return width * _BOLD_FACTOR if bold else width
+
+
+def text_width(text, size, font="Segoe UI", bold=False):
+    """Width of one line of ``text`` in points."""
+    return _em_width(font, bool(bold), text) * size
+
+
+def wrap(text, width, size, font="Segoe UI", bold=False):
+    """Break ``text`` into lines no wider than ``width`` points.
+
+    Line feeds always break.  A word wider than the line is split between
+    characters, as PowerPoint does; the returned lines never exceed ``width``
+    except for a single character that is wider on its own.
+    """
+    limit = width / size  # work in em so the memoised widths are size-free
+    space = _em_width(font, bold, " ")
+    lines = []
+    for raw in text.replace("\v", "\n").split("\n"):
+        line, used = [], 0.0
+        for word in raw.split(" "):
+            w = _em_width(font, bold, word)
+            extra = w + (space if line else 0.0)
+            if used + extra <= limit or not line and w <= limit:
+                line.append(word)
+                used += extra
+                continue
+            if line:
+                lines.append(" ".join(line))
+            while w > limit and len(word) > 1:  # split an over-long word
+                cut = len(word) - 1
+                while cut > 1 and _em_width(font, bold, word[:cut]) > limit:
+                    cut -= 1
+                lines.append(word[:cut])
+                word = word[cut:]
+                w = _em_width(font, bold, word)
+            line, used = [word], w
+        lines.append(" ".join(line))
+    return lines
+
+
+def measure(paragraphs, width, height, size, font="Segoe UI", bold=False, space_after=0):
+    """Lay out ``paragraphs`` in a ``width`` x ``height`` box (EMU) at ``size`` pt."""
+    inner_w = Emu(width).pt - 2 * INSET_X
+    lines = []
+    for p in paragraphs:
+        lines.extend(wrap(p, inner_w, size, font, bold))
+    needed = len(lines) * size * LINE_SPACING + space_after * max(0, len(paragraphs) - 1)
+    return Fit(size, tuple(lines), Pt(needed), Pt(needed) <= height)
+
+
+@functools.lru_cache(maxsize=4096)
+def fit(paragraphs, width, height, size, font="Segoe UI", bold=False, space_after=0,
+        min_size=None, step=0.5):
+    """Largest size from ``size`` down to ``min_size`` at which the text fits.
+
+    Returns the ``Fit`` at that size, or at ``min_size`` with ``fits`` False
+    when even that overflows.  ``paragraphs`` must be a tuple: results are
+    memoised, so a label repeated across slides is fitted once.
+    """
+    min_size = min_size if min_size is not None else max(8, size * 0.7)
+    result = measure(paragraphs, width, height, size, font, bold, space_after)
+    while not result.fits and result.size - step >= min_size:
+        result = measure(paragraphs, width, height, result.size - step, font, bold, space_after)
+    return result
+
+
+@contextlib.contextmanager
+def collect():
+    """Gather the overflows flagged inside the block into a new list.
+
+        with deck_textfit.collect() as overflows:
+            build_deck(prs, builders)
+    """
+    overflows = []
+    token = _collector.set(overflows)
+    try:
+        yield overflows
+    finally:
+        _collector.reset(token)
+
+
+def replay(records):
+    """Add already-flagged ``Overflow`` records (e.g. a cached slide's) to the current block."""
+    overflows = _collector.get()
+    if overflows is not None:
+        overflows.extend(records)
+
+
+def flag(slide, paragraphs, result, height):
+    """Record that text on ``slide`` overflows its box; dropped outside ``collect()``."""
+    text = " / ".join(paragraphs)
+    record = Overflow(slide.part.partname.idx, text[:60], result.size,
+                      round(Emu(result.height).pt), round(Emu(height).pt))
+    replay((record,))
+    return record
+
+
+def describe(o):
+    return f"slide {o.slide}: {o.text!r} needs {o.needed}pt at {o.size:g}pt, box is {o.height}pt"
+
+
+def report(overflows):
+    """Lines describing the ``overflows`` a ``collect()`` block gathered."""
+    lines = [f"⚠️  {describe(o)}" for o in overflows]
+    if lines:
+        lines.insert(0, f"⚠️  {len(overflows)} text box(es) overflow:")
+    return lines
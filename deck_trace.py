@@ -0,0 +1,167 @@
+"""
+Opt-in instrumentation for deck builds.
+
+Set ``DECK_TRACE`` to turn it on:
+
+    DECK_TRACE=stats        python generate_ppt.py   # flat table on stderr
+    DECK_TRACE=trace.json   python generate_ppt.py   # Chrome trace (chrome://tracing, Perfetto)
+
+When enabled, ``instrument()`` wraps the ``slide_*`` builders and the shape
+helpers (``add_shape_rect``, ``add_text_box``, ``add_bullet_frame``,
+``add_card``, ``add_card_grid``, ``add_step_flow``, ``add_accent_line``,
+``add_picture``, ``set_slide_bg``) in the module namespace it is given,
+counting calls, wall time, shapes added and XML elements created.  ``span()`` times coarser phases such as ``prs.save``.
+Counts are inclusive: the shapes ``add_card`` makes through ``add_text_box``
+show up under both.
+
+When ``DECK_TRACE`` is unset nothing is wrapped and ``span()`` hands back a
+shared no-op context manager, so the instrumented code paths are the plain
+functions.  Worker processes write ``trace.<pid>.json`` next to the main file.
+"""
+
+import atexit
+import contextlib
+import functools
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+
+ENV_VAR = "DECK_TRACE"
+HELPERS = ("set_slide_bg", "add_shape_rect", "add_text_box", "add_bullet_frame",
+           "add_card", "add_card_grid", "add_step_flow", "add_accent_line", "add_picture")
+
+_NULL_SPAN = contextlib.nullcontext()
+
+
+class Tracer:
+    def __init__(self, target):
+        self.target = target
+        self.events = []
+        self.stats = {}  # name -> [calls, seconds, shapes, xml elements]
+        self._origin = time.perf_counter_ns()
+
+    def record(self, name, cat, start_ns, end_ns, shapes=0, elements=0):
+        row = self.stats.setdefault(name, [0, 0.0, 0, 0])
+        row[0] += 1
+        row[1] += (end_ns - start_ns) / 1e9
+        row[2] += shapes
+        row[3] += elements
+        self.events.append({
+            "name": name, "cat": cat, "ph": "X", "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "ts": (start_ns - self._origin) / 1000, "dur": (end_ns - start_ns) / 1000,
+            "args": {"shapes": shapes, "xml_elements": elements},
+        })
+
+    @contextlib.contextmanager
+    def span(self, name, cat="phase"):
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.record(name, cat, start, time.perf_counter_ns())
+
+    def wrap_helper(self, func):
+        name = func.__name__
+
+        @functools.wraps(func)
+        def wrapper(slide, *args, **kwargs):
+            tree = slide.shapes._spTree
+            before = len(tree)
+            start = time.perf_counter_ns()
+            result = func(slide, *args, **kwargs)
+            end = time.perf_counter_ns()
+            added = tree[before:]
+            self.record(name, "helper", start, end, len(added),
+                        sum(1 for el in added for _ in el.iter()))
+            return result
+        return wrapper
+
+    def wrap_builder(self, func):
+        name = func.__name__
+
+        @functools.wraps(func)
+        def wrapper(prs, *args, **kwargs):
+            start = time.perf_counter_ns()
+            result = func(prs, *args, **kwargs)
+            end = time.perf_counter_ns()
+            element = prs.slides[-1]._element
+            tree = prs.slides[-1].shapes._spTree
+            self.record(name, "builder", start, end, len(tree) - 2,
+                        sum(1 for _ in element.iter()))
+            return result
+        return wrapper
+
+    # ── Export ──────────────────────────────────────────────────────
+    def table(self):
+        lines = [f"{'name':<28}{'calls':>8}{'total ms':>11}{'mean µs':>11}"
+                 f"{'shapes':>9}{'xml elems':>11}"]
+        for name, (calls, secs, shapes, elements) in sorted(
+                self.stats.items(), key=lambda kv: -kv[1][1]):
+            lines.append(f"{name:<28}{calls:>8}{secs * 1e3:>11.2f}{secs / calls * 1e6:>11.1f}"
+                         f"{shapes:>9}{elements:>11}")
+        return "\n".join(lines)
+
+    def flush(self):
+        if not self.stats:
+            return
+        if self.target.endswith(".json"):
+            path = self.target
+            if multiprocessing.current_process().name != "MainProcess":
+                root, ext = os.path.splitext(path)
+                path = f"{root}.{os.getpid()}{ext}"
+            with open(path, "w", encoding="utf-8") as fh:
+                json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, fh)
+        else:
+            print(self.table(), file=sys.stderr)
+
+
+_tracer = None
+_target = os.environ.get(ENV_VAR, "").strip()
+if _target and _target != "0":
+    _tracer = Tracer(_target)
+    atexit.register(_tracer.flush)
+
+
+def enabled():
+    return _tracer is not None
+
+
+def span(name, cat="phase"):
+    """Context manager timing one phase; a shared no-op when tracing is off."""
+    if _tracer is None:
+        return _NULL_SPAN
+    return _tracer.span(name, cat)
+
+
+def worker_init():
+    """Start a fresh trace in a pool worker and flush it when the worker exits.
+
+    Pool workers leave through ``os._exit``, which skips ``atexit`` hooks.
+    """
+    if _tracer is None:
+        return
+    from multiprocessing.util import Finalize
+
+    _tracer.events.clear()
+    _tracer.stats.clear()
+    Finalize(_tracer, _tracer.flush, exitpriority=10)
+
+
+def instrument(namespace):
+    """Wrap builders and helpers in ``namespace`` (a module's ``globals()``).
+
+    Does nothing unless ``DECK_TRACE`` is set.
+    """
+    if _tracer is None:
+        return
+    for name, value in list(namespace.items()):
+        if not callable(value) or getattr(value, "__wrapped__", None):
+            continue
+        if name.startswith("slide_"):
+            namespace[name] = _tracer.wrap_builder(value)
+        elif name in HELPERS:
+            namespace[name] = _tracer.wrap_helper(value)
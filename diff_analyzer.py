@@ -0,0 +1,326 @@
+"""
+Line-level diffs across a session's attempt history, computed once per step.
+
+    history = AttemptHistory()
+    for attempt in attempts:
+        history.add(attempt.code)          # diffs against the previous snapshot
+    history.diff(0, len(history) - 1)      # opcodes first -> last, composed
+    history.rows(2, 5)                     # side-by-side rows for the workspace
+    history.hotspots()                     # most-edited lines of the latest code
+
+Lines are interned to integer ids as each snapshot arrives, so every
+comparison after that is between small ints rather than strings.  Diffs use
+Myers' O(ND) algorithm after trimming the common prefix and suffix, which
+for consecutive attempts (a few lines changed) is close to linear in the
+snapshot length; unlike the workspace's one-line lookahead it finds a
+shortest edit script, so larger edits stay aligned.
+
+Each consecutive diff is computed when its snapshot is added and kept, along
+with a line map (for each line of the new snapshot, its line in the old one
+or -1).  A diff between any two attempts composes those maps to find the
+lines carried through unchanged, then runs Myers only on the gaps between
+them, so a session of hundreds of snapshots never diffs more than each
+consecutive pair in full; the last ``COMPOSED_CACHE`` composed diffs are
+kept.  Myers' trace keeps only the band of diagonals each step can reach,
+as compact int arrays.  Edit hotspots (how often each line of the latest
+snapshot has been changed) are updated from the same opcodes as a
+by-product.
+
+Opcodes are ``(tag, i1, i2, j1, j2)`` tuples with difflib's tags
+(``equal``, ``replace``, ``delete``, ``insert``).  ``compute_diff`` and
+``summarize_changes`` are the one-off helpers for a single pair of sources.
+"""
+
+from array import array
+from collections import OrderedDict
+
+import numpy as np
+
+CONTEXT = 3
+COMPOSED_CACHE = 256  # composed (non-consecutive) diffs kept per history
+
+
+# ── Myers diff ──────────────────────────────────────────────────────
+def _matches(a, b):
+    """Matched (i, j) index pairs of a shortest edit script from ``a`` to ``b``."""
+    n, m = len(a), len(b)
+    if not n or not m:
+        return []
+    off = n + m + 1  # v[k + off]: furthest x reached on diagonal k
+    v = [0] * (2 * off + 1)
+    trace = []
+    for d in range(n + m + 1):
+        # Step d reads diagonals -d-1 .. d+1 of the previous step, every other
+        # one; keep just that band (d + 2 ints) for the backtrack.
+        trace.append(array("i", v[off - d - 1:off + d + 2:2]))
+        for k in range(-d, d + 1, 2):
+            if k == -d or k != d and v[off + k - 1] < v[off + k + 1]:
+                x = v[off + k + 1]
+            else:
+                x = v[off + k - 1] + 1
+            y = x - k
+            while x < n and y < m and a[x] == b[y]:
+                x += 1
+                y += 1
+            v[off + k] = x
+            if x >= n and y >= m:
+                return _backtrack(trace, n, m)
+    return []
+
+
+def _backtrack(trace, x, y):
+    pairs = []
+    for d in range(len(trace) - 1, -1, -1):
+        band = trace[d]  # band[(k + d + 1) // 2] is diagonal k
+        k = x - y
+        lo, hi = band[(k + d) // 2], band[(k + d + 2) // 2]  # diagonals k - 1, k + 1
+        prev_k = k + 1 if k == -d or k != d and lo < hi else k - 1
+        prev_x = hi if prev_k == k + 1 else lo
+        prev_y = prev_x - prev_k
+        while x > prev_x and y > prev_y:
+            x -= 1
+            y -= 1
+            pairs.append((x, y))
+        x, y = prev_x, prev_y
+    pairs.reverse()
+    return pairs
+
+
+def _match_range(a, b, i1, i2, j1, j2):
+    """Matched pairs between ``a[i1:i2]`` and ``b[j1:j2]``, prefix and suffix trimmed first."""
+    pairs = []
+    while i1 < i2 and j1 < j2 and a[i1] == b[j1]:
+        pairs.append((i1, j1))
+        i1 += 1
+        j1 += 1
+    tail = []
+    while i1 < i2 and j1 < j2 and a[i2 - 1] == b[j2 - 1]:
+        i2 -= 1
+        j2 -= 1
+        tail.append((i2, j2))
+    pairs.extend((i1 + i, j1 + j) for i, j in _matches(a[i1:i2], b[j1:j2]))
+    pairs.extend(reversed(tail))
+    return pairs
+
+
+def _opcodes(pairs, n, m):
+    """difflib-style opcodes from increasing matched pairs."""
+    ops = []
+    i = j = 0
+    for pi, pj in pairs + [(n, m)]:
+        if pi > i and pj > j:
+            ops.append(("replace", i, pi, j, pj))
+        elif pi > i:
+            ops.append(("delete", i, pi, j, j))
+        elif pj > j:
+            ops.append(("insert", i, i, j, pj))
+        if pi < n and pj < m:
+            if ops and ops[-1][0] == "equal" and ops[-1][2] == pi:
+                ops[-1] = ("equal", ops[-1][1], pi + 1, ops[-1][3], pj + 1)
+            else:
+                ops.append(("equal", pi, pi + 1, pj, pj + 1))
+        i, j = pi + 1, pj + 1
+    return ops
+
+
+def _line_map(ops, m):
+    """For each of the ``m`` new lines, its old line index or -1."""
+    mapping = np.full(m, -1, np.int32)
+    for tag, i1, i2, j1, j2 in ops:
+        if tag == "equal":
+            mapping[j1:j2] = np.arange(i1, i2, dtype=np.int32)
+    return mapping
+
+
+# ── History ─────────────────────────────────────────────────────────
+class AttemptHistory:
+    """The snapshots of one session, with their consecutive diffs and edit hotspots."""
+
+    def __init__(self, snapshots=()):
+        self._ids = {}  # line text -> id
+        self.lines = []  # per snapshot: list of line strings
+        self._hashed = []  # per snapshot: list of line ids
+        self.steps = []  # steps[k]: opcodes from snapshot k to k + 1
+        self._maps = []  # _maps[k]: line map from snapshot k + 1 back to k
+        self.heat = np.zeros(0, np.int32)  # edits per line of the latest snapshot
+        self._composed = OrderedDict()  # (i, j) -> opcodes, least recently used first
+        for code in snapshots:
+            self.add(code)
+
+    def __len__(self):
+        return len(self.lines)
+
+    def add(self, code):
+        """Append a snapshot; diffs it against the previous one and updates hotspots."""
+        lines = code.split("\n")
+        ids = self._ids
+        hashed = [ids.setdefault(line, len(ids)) for line in lines]
+        if self._hashed:
+            prev = self._hashed[-1]
+            ops = _opcodes(_match_range(prev, hashed, 0, len(prev), 0, len(hashed)),
+                           len(prev), len(hashed))
+            self.steps.append(ops)
+            self._maps.append(_line_map(ops, len(hashed)))
+            self.heat = self._carry_heat(ops, len(hashed))
+        else:
+            self.heat = np.zeros(len(lines), np.int32)
+        self.lines.append(lines)
+        self._hashed.append(hashed)
+        return len(self.lines) - 1
+
+    def _carry_heat(self, ops, m):
+        heat = np.zeros(m, np.int32)
+        for tag, i1, i2, j1, j2 in ops:
+            if tag == "equal":
+                heat[j1:j2] = self.heat[i1:i2]
+                continue
+            paired = min(i2 - i1, j2 - j1)
+            heat[j1:j1 + paired] = self.heat[i1:i1 + paired] + 1
+            heat[j1 + paired:j2] = 1
+            if i2 - i1 > paired and m:  # lines deleted here count against the next line
+                heat[min(j2, m - 1)] += 1
+        return heat
+
+    def _check(self, i):
+        if not 0 <= i < len(self.lines):
+            raise IndexError(f"snapshot {i} out of range (0-{len(self.lines) - 1})")
+
+    def diff(self, i, j):
+        """Opcodes turning snapshot ``i`` into snapshot ``j`` (``i`` <= ``j``)."""
+        self._check(i)
+        self._check(j)
+        if i > j:
+            raise ValueError("diff(i, j) needs i <= j")
+        if i == j:
+            n = len(self.lines[i])
+            return [("equal", 0, n, 0, n)] if n else []
+        if j == i + 1:
+            return self.steps[i]
+        ops = self._composed.get((i, j))
+        if ops is not None:
+            self._composed.move_to_end((i, j))
+        else:
+            mapping = self._maps[j - 1]
+            for k in range(j - 2, i - 1, -1):
+                mapping = np.where(mapping >= 0, self._maps[k][np.maximum(mapping, 0)], -1)
+            a, b = self._hashed[i], self._hashed[j]
+            pairs = []
+            pi = pj = 0
+            for y in np.flatnonzero(mapping >= 0).tolist() + [len(b)]:
+                x = int(mapping[y]) if y < len(b) else len(a)
+                pairs.extend(_match_range(a, b, pi, x, pj, y))  # lines re-added in between
+                if y < len(b):
+                    pairs.append((x, y))
+                pi, pj = x + 1, y + 1
+            ops = self._composed[i, j] = _opcodes(pairs, len(a), len(b))
+            if len(self._composed) > COMPOSED_CACHE:
+                self._composed.popitem(last=False)
+        return ops
+
+    def rows(self, i, j):
+        """Side-by-side rows (as the workspace's ``buildDiffRows`` returns) for ``i`` -> ``j``."""
+        return diff_rows(self.lines[i], self.lines[j], self.diff(i, j))
+
+    def stats(self, i, j=None):
+        """Added / removed / changed line counts from ``i`` to ``j`` (default: the next snapshot)."""
+        return change_counts(self.diff(i, i + 1 if j is None else j))
+
+    def hotspots(self, top=5):
+        """(line number, edits, text) for the most-edited lines of the latest snapshot."""
+        if not len(self.heat):
+            return []
+        order = np.argsort(-self.heat, kind="stable")[:top]
+        latest = self.lines[-1]
+        return [(int(k) + 1, int(self.heat[k]), latest[k]) for k in order if self.heat[k]]
+
+
+# ── One-off helpers ─────────────────────────────────────────────────
+def diff_lines(a, b):
+    """Opcodes between two lists of lines."""
+    ids = {}
+    ha = [ids.setdefault(line, len(ids)) for line in a]
+    hb = [ids.setdefault(line, len(ids)) for line in b]
+    return _opcodes(_match_range(ha, hb, 0, len(ha), 0, len(hb)), len(ha), len(hb))
+
+
+def diff_rows(a, b, ops):
+    rows = []
+    for tag, i1, i2, j1, j2 in ops:
+        if tag == "equal":
+            rows.extend({"left_number": i + 1, "right_number": j + 1, "left_text": a[i],
+                         "right_text": b[j], "kind": "same"}
+                        for i, j in zip(range(i1, i2), range(j1, j2)))
+            continue
+        for k in range(max(i2 - i1, j2 - j1)):
+            i, j = i1 + k, j1 + k
+            left, right = i < i2, j < j2
+            rows.append({"left_number": i + 1 if left else None,
+                         "right_number": j + 1 if right else None,
+                         "left_text": a[i] if left else "", "right_text": b[j] if right else "",
+                         "kind": "changed" if left and right else "removed" if left else "added"})
+    return rows
+
+
+def change_counts(ops):
+    counts = {"added": 0, "removed": 0, "changed": 0}
+    for tag, i1, i2, j1, j2 in ops:
+        if tag == "equal":
+            continue
+        paired = min(i2 - i1, j2 - j1)
+        counts["changed"] += paired
+        counts["removed"] += i2 - i1 - paired
+        counts["added"] += j2 - j1 - paired
+    return counts
+
+
+def _grouped(ops, n=CONTEXT):
+    """Opcodes split into hunks with ``n`` lines of context (as difflib groups them)."""
+    if not ops:
+        return
+    ops = list(ops)
+    if ops[0][0] == "equal":
+        _, i1, i2, j1, j2 = ops[0]
+        ops[0] = ("equal", max(i1, i2 - n), i2, max(j1, j2 - n), j2)
+    if ops[-1][0] == "equal":
+        _, i1, i2, j1, j2 = ops[-1]
+        ops[-1] = ("equal", i1, min(i2, i1 + n), j1, min(j2, j1 + n))
+    group = []
+    for tag, i1, i2, j1, j2 in ops:
+        if tag == "equal" and i2 - i1 > 2 * n:
+            group.append((tag, i1, i1 + n, j1, j1 + n))
+            yield group
+            group = []
+            i1, j1 = i2 - n, j2 - n
+        group.append((tag, i1, i2, j1, j2))
+    if group and not (len(group) == 1 and group[0][0] == "equal"):
+        yield group
+
+
+def _span(start, stop):
+    return f"{start + 1 if stop > start else start},{stop - start}"
+
+
+def compute_diff(code1, code2, n=CONTEXT):
+    """Unified-diff lines (without file headers) from ``code1`` to ``code2``."""
+    a, b = code1.split("\n"), code2.split("\n")
+    out = []
+    for group in _grouped(diff_lines(a, b), n):
+        i1, i2, j1, j2 = group[0][1], group[-1][2], group[0][3], group[-1][4]
+        out.append(f"@@ -{_span(i1, i2)} +{_span(j1, j2)} @@")
+        for tag, i1, i2, j1, j2 in group:
+            if tag == "equal":
+                out.extend(" " + line for line in a[i1:i2])
+                continue
+            out.extend("-" + line for line in a[i1:i2])
+            out.extend("+" + line for line in b[j1:j2])
+    return out
+
+
+def summarize_changes(ops):
+    """One-line description of an opcode list, e.g. ``"2 lines changed, 1 added"``."""
+    counts = change_counts(ops)
+    parts = [f"{counts['changed']} line{'s' if counts['changed'] != 1 else ''} changed"
+             if counts["changed"] else "",
+             f"{counts['added']} added" if counts["added"] else "",
+             f"{counts['removed']} removed" if counts["removed"] else ""]
+    return ", ".join(filter(None, parts)) or "No changes"
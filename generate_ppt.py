@@ -6,9 +6,14 @@ Content is derived from the actual codebase and architecture documentation.
 from pptx import Presentation
 from pptx.util import Inches, Pt, Emu
 from pptx.dml.color import RGBColor
-from pptx.enum.text import PP_ALIGN, MSO_ANCHOR
-from pptx.enum.shapes import MSO_SHAPE
+from pptx.enum.text import PP_ALIGN
+import deck_textfit
+from deck_assets import prepare_image
+from deck_styles import ShapeStyle, TextStyle, add_styled_shape, add_styled_text
+from deck_trace import instrument, span
+import dataclasses
 import os
+import sys
 
 # ── Colour palette ──────────────────────────────────────────────────
 BG_DARK    = RGBColor(0x0F, 0x11, 0x1A)   # slide background
@@ -25,6 +30,14 @@ SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 ARCH_IMG   = os.path.join(SCRIPT_DIR, "svgviewer-png-output.png")
 OUTPUT     = os.path.join(SCRIPT_DIR, "Deep_Analysis_Deck.pptx")
 
+# Embedded pictures are resampled to their placed size at this resolution.
+ASSET_DPI = 150
+
+# Text that outgrows its box is "flag"ged (reported, left as is), shrunk
+# until it fits ("shrink", then flagged if it still doesn't) or not measured
+# ("off").  Helpers take fit= to override this per box.
+TEXT_FIT = "flag"
+
 SLIDE_W = Inches(13.333)
 SLIDE_H = Inches(7.5)
 
@@ -38,70 +51,91 @@ def set_slide_bg(slide, color):
 
 
 def add_shape_rect(slide, left, top, width, height, fill_color, opacity=1.0):
-    shape = slide.shapes.add_shape(MSO_SHAPE.ROUNDED_RECTANGLE, left, top, width, height)
-    shape.fill.solid()
-    shape.fill.fore_color.rgb = fill_color
-    shape.line.fill.background()
-    # Rounded corners
-    shape.adjustments[0] = 0.05
-    return shape
+    # Rounded corners (5 %) come with the default ShapeStyle
+    return add_styled_shape(slide, left, top, width, height, ShapeStyle(fill_color))
+
+
+def _fit_text(slide, width, height, paragraphs, style, fit):
+    mode = fit or TEXT_FIT
+    if mode == "off":
+        return style
+    result = deck_textfit.fit(tuple(paragraphs), width, height, style.size, style.font,
+                              bool(style.bold), style.space_after or 0,
+                              min_size=None if mode == "shrink" else style.size)
+    if not result.fits:
+        deck_textfit.flag(slide, paragraphs, result, height)
+    if result.size != style.size:
+        style = dataclasses.replace(style, size=result.size)
+    return style
 
 
 def add_text_box(slide, left, top, width, height, text, font_size=18,
                  bold=False, color=WHITE, alignment=PP_ALIGN.LEFT,
-                 font_name="Segoe UI"):
-    txBox = slide.shapes.add_textbox(left, top, width, height)
-    tf = txBox.text_frame
-    tf.word_wrap = True
-    p = tf.paragraphs[0]
-    p.text = text
-    p.font.size = Pt(font_size)
-    p.font.bold = bold
-    p.font.color.rgb = color
-    p.font.name = font_name
-    p.alignment = alignment
-    return txBox
+                 font_name="Segoe UI", fit=None):
+    style = TextStyle(font_size, color, bold=bold, font=font_name, align=alignment)
+    style = _fit_text(slide, width, height, (text,), style, fit)
+    return add_styled_text(slide, left, top, width, height, (text,), style)
 
 
 def add_bullet_frame(slide, left, top, width, height, items,
-                     font_size=16, color=LIGHT_GRAY, bullet_color=ACCENT):
-    txBox = slide.shapes.add_textbox(left, top, width, height)
-    tf = txBox.text_frame
-    tf.word_wrap = True
-    for i, item in enumerate(items):
-        if i == 0:
-            p = tf.paragraphs[0]
-        else:
-            p = tf.add_paragraph()
-        p.text = item
-        p.font.size = Pt(font_size)
-        p.font.color.rgb = color
-        p.font.name = "Segoe UI"
-        p.space_after = Pt(6)
-        p.level = 0
-    return txBox
+                     font_size=16, color=LIGHT_GRAY, bullet_color=ACCENT, fit=None):
+    style = TextStyle(font_size, color, space_after=6)
+    style = _fit_text(slide, width, height, items, style, fit)
+    return add_styled_text(slide, left, top, width, height, items, style)
 
 
 def add_accent_line(slide, left, top, width, color=ACCENT):
-    shape = slide.shapes.add_shape(MSO_SHAPE.RECTANGLE, left, top, width, Pt(3))
-    shape.fill.solid()
-    shape.fill.fore_color.rgb = color
-    shape.line.fill.background()
-    return shape
+    return add_styled_shape(slide, left, top, width, Pt(3),
+                            ShapeStyle(color, geometry="rect"))
+
+
+def add_picture(slide, image_path, left, top, width=None, height=None):
+    image, width, height = prepare_image(image_path, width, height, dpi=ASSET_DPI)
+    return slide.shapes.add_picture(image, left, top, width, height)
 
 
 def add_card(slide, left, top, width, height, title, body_items,
-             card_color=RGBColor(0x1A, 0x1D, 0x2E), title_color=ACCENT2):
+             card_color=RGBColor(0x1A, 0x1D, 0x2E), title_color=ACCENT2, fit=None):
     card = add_shape_rect(slide, left, top, width, height, card_color)
     add_text_box(slide, left + Inches(0.25), top + Inches(0.15),
                  width - Inches(0.5), Inches(0.4),
-                 title, font_size=15, bold=True, color=title_color)
+                 title, font_size=15, bold=True, color=title_color, fit=fit)
     add_bullet_frame(slide, left + Inches(0.25), top + Inches(0.55),
                      width - Inches(0.5), height - Inches(0.7),
-                     body_items, font_size=13, color=LIGHT_GRAY)
+                     body_items, font_size=13, color=LIGHT_GRAY, fit=fit)
     return card
 
 
+def add_card_grid(slide, left, top, cards, card_w, card_h, columns=2,
+                  gap_x=Inches(0.4), gap_y=Inches(0.25)):
+    """Lay out ``(title, body, title_color)`` cards row by row; body lines split on newlines."""
+    for i, (title, body, col) in enumerate(cards):
+        row_idx, col_idx = divmod(i, columns)
+        x = left + col_idx * (card_w + gap_x)
+        y = top + row_idx * (card_h + gap_y)
+        add_card(slide, x, y, card_w, card_h, title,
+                 body.split("\n"), title_color=col)
+
+
+def add_step_flow(slide, left, top, steps, card_w, card_h, gap=Inches(0.15)):
+    """A row of ``(title, body, title_color)`` step cards joined by connectors."""
+    for i, (title, body, col) in enumerate(steps):
+        x = left + i * (card_w + gap)
+        add_shape_rect(slide, x, top, card_w, card_h, RGBColor(0x1A, 0x1D, 0x2E))
+        add_text_box(slide, x, top + Inches(0.2), card_w, Inches(0.45),
+                     title, font_size=15, bold=True, color=col,
+                     alignment=PP_ALIGN.CENTER)
+        add_text_box(slide, x + Inches(0.1), top + Inches(0.75), card_w - Inches(0.2), Inches(1.5),
+                     body, font_size=12, color=LIGHT_GRAY,
+                     alignment=PP_ALIGN.CENTER)
+
+    # arrow connectors (simple rectangles)
+    for i in range(len(steps) - 1):
+        x = left + (i + 1) * (card_w + gap) - Inches(0.12)
+        add_shape_rect(slide, x, top + Inches(1.0), Inches(0.09), Inches(0.35),
+                       RGBColor(0x44, 0x44, 0x66))
+
+
 # ── Slide builders ──────────────────────────────────────────────────
 def slide_title(prs):
     slide = prs.slides.add_slide(prs.slide_layouts[6])  # blank
@@ -243,25 +277,7 @@ def slide_how_it_works(prs):
         ("⑥ View Insights", "Summary, concepts,\nrecommendations",         ACCENT2),
         ("⑦ Dashboard",     "KPIs, SWOT,\nmonthly reports",                GREEN_ACC),
     ]
-    card_w = Inches(1.55)
-    card_h = Inches(2.4)
-    start_x = Inches(0.5)
-    y = Inches(1.6)
-    for i, (title, body, col) in enumerate(steps):
-        x = start_x + i * (card_w + Inches(0.15))
-        c = add_shape_rect(slide, x, y, card_w, card_h, RGBColor(0x1A, 0x1D, 0x2E))
-        add_text_box(slide, x, y + Inches(0.2), card_w, Inches(0.45),
-                     title, font_size=15, bold=True, color=col,
-                     alignment=PP_ALIGN.CENTER)
-        add_text_box(slide, x + Inches(0.1), y + Inches(0.75), card_w - Inches(0.2), Inches(1.5),
-                     body, font_size=12, color=LIGHT_GRAY,
-                     alignment=PP_ALIGN.CENTER)
-
-    # arrow connectors (simple rectangles)
-    for i in range(len(steps) - 1):
-        x = start_x + (i + 1) * (card_w + Inches(0.15)) - Inches(0.12)
-        add_shape_rect(slide, x, y + Inches(1.0), Inches(0.09), Inches(0.35),
-                       RGBColor(0x44, 0x44, 0x66))
+    add_step_flow(slide, Inches(0.5), Inches(1.6), steps, Inches(1.55), Inches(2.4))
 
     add_text_box(slide, Inches(0.8), Inches(4.5), Inches(11.5), Inches(2.5),
                  "Key implementation details from the codebase:\n\n"
@@ -285,9 +301,7 @@ def slide_architecture(prs):
 
     # Architecture image
     if os.path.exists(ARCH_IMG):
-        slide.shapes.add_picture(ARCH_IMG,
-                                 Inches(0.5), Inches(1.15),
-                                 width=Inches(8.5))
+        add_picture(slide, ARCH_IMG, Inches(0.5), Inches(1.15), width=Inches(8.5))
 
     # Tech stack sidebar
     stack_items = [
@@ -395,15 +409,7 @@ def slide_competitive_advantage(prs):
          "into ML-ready training data for predictive learning recommendations.",
          ORANGE_ACC),
     ]
-    card_w = Inches(5.7)
-    card_h = Inches(1.35)
-    for i, (title, body, col) in enumerate(advantages):
-        col_idx = i % 2
-        row_idx = i // 2
-        x = Inches(0.8) + col_idx * (card_w + Inches(0.4))
-        y = Inches(2.2) + row_idx * (card_h + Inches(0.25))
-        add_card(slide, x, y, card_w, card_h, title,
-                 body.split("\n"), title_color=col)
+    add_card_grid(slide, Inches(0.8), Inches(2.2), advantages, Inches(5.7), Inches(1.35))
 
 
 def slide_demo_and_future(prs):
@@ -480,25 +486,77 @@ def slide_closing(prs):
     add_accent_line(slide, Inches(0), Inches(7.2), SLIDE_W, ACCENT)
 
 
-# ── Main ────────────────────────────────────────────────────────────
-def main():
-    prs = Presentation()
+# ── Deck assembly ───────────────────────────────────────────────────
+# Wrap builders and helpers with counters/timers when DECK_TRACE is set.
+instrument(globals())
+
+# Ordered registry of slide builders; deck specs refer to slides by name.
+SLIDE_BUILDERS = {
+    "title":                 slide_title,                  # 1: Title
+    "problem_statement":     slide_problem_statement,      # 2: Problem
+    "our_solution":          slide_our_solution,           # 3: Solution
+    "how_it_works":          slide_how_it_works,           # 4: User flow
+    "architecture":          slide_architecture,           # 5: Architecture + image
+    "tech_deep_dive":        slide_tech_deep_dive,         # 6: Analysis engine deep dive
+    "competitive_advantage": slide_competitive_advantage,  # 7: Why us
+    "demo_and_future":       slide_demo_and_future,        # 8: Demo + Roadmap
+    "closing":               slide_closing,                # 9: Closing
+}
+DEFAULT_SLIDES = tuple(SLIDE_BUILDERS)
+
+
+def resolve_slides(names=None):
+    """Map slide names to builder callables, failing early on unknown names."""
+    if names is None:
+        names = DEFAULT_SLIDES
+    unknown = [n for n in names if n not in SLIDE_BUILDERS]
+    if unknown:
+        raise ValueError(f"Unknown slide(s): {', '.join(unknown)}")
+    return tuple(SLIDE_BUILDERS[n] for n in names)
+
+
+def new_presentation(template=None):
+    """Create a 16:9 presentation, optionally from a template path or stream."""
+    prs = Presentation(template)
     prs.slide_width = SLIDE_W
     prs.slide_height = SLIDE_H
+    return prs
 
-    slide_title(prs)              # 1: Title
-    slide_problem_statement(prs)  # 2: Problem
-    slide_our_solution(prs)       # 3: Solution
-    slide_how_it_works(prs)       # 4: User flow
-    slide_architecture(prs)       # 5: Architecture + image
-    slide_tech_deep_dive(prs)     # 6: Analysis engine deep dive
-    slide_competitive_advantage(prs)  # 7: Why us
-    slide_demo_and_future(prs)    # 8: Demo + Roadmap
-    slide_closing(prs)            # 9: Closing
-
-    prs.save(OUTPUT)
+
+def build_deck(prs, builders=None):
+    for builder in builders or resolve_slides():
+        builder(prs)
+    return prs
+
+
+# ── Main ────────────────────────────────────────────────────────────
+def main():
+    from deck_cache import SlideCache, build_deck_cached, deck_key
+    from deck_package import save_package
+
+    cache = None if "--no-cache" in sys.argv[1:] else SlideCache()
+    builders = resolve_slides()
+    if cache is not None:
+        key = deck_key(builders)
+        if cache.deck_is_current(OUTPUT, key):
+            print(f"✅ Presentation is up to date: {OUTPUT}")
+            return
+        with deck_textfit.collect() as overflows:
+            prs = build_deck_cached(new_presentation(), builders, cache)
+    else:
+        with deck_textfit.collect() as overflows:
+            prs = build_deck(new_presentation(), builders)
+
+    with span("save"):
+        save_package(prs, OUTPUT)
+    if cache is not None:
+        from deck_manifest import spec_digest
+
+        cache.record_deck(OUTPUT, key, len(prs.slides), spec_digest())
     print(f"✅ Presentation saved to: {OUTPUT}")
     print(f"   Slides: {len(prs.slides)}")
+    for line in deck_textfit.report(overflows):
+        print(line)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,394 @@
+"""
+Append-only store for code snapshots: content-addressed, delta-compressed.
+
+    store = SnapshotStore("snapshots")
+    store.put("u1", "two-sum", code, ts=1788220800)   # autosave, run or submit
+    store.load_session("u1", "two-sum")               # [(ts, code), ...] oldest first
+    store.history("u1", "two-sum")                    # as a diff_analyzer.AttemptHistory
+    store.compact()                                   # regroup records by session
+
+Autosaves every 30 seconds produce long runs of nearly identical source.
+Each snapshot is addressed by the BLAKE2 digest of its text, so saving the
+same code again only adds an index entry.  New code is stored as a line
+delta against the session's previous snapshot (copy runs of the old lines,
+insert new ones, the whole record deflated), with a full keyframe at the
+start of a session and whenever a chain reaches ``KEYFRAME_INTERVAL``
+records, so no read decodes more than that many deltas.
+
+Records go into numbered segment files of up to ``SEGMENT_SIZE`` bytes and
+are read through ``mmap``.  The index, ``index.jsonl``, holds one line per
+snapshot: (user, problem, timestamp, digest, segment, offset), kept in
+memory sorted by timestamp per (user, problem).  ``load_session`` maps the
+span of each segment holding the session's records and decodes it front to
+back, so after ``compact()`` (which rewrites every session's chain
+contiguously) a whole history is one sequential read.
+
+A record is a fixed header (kind, digest, chain depth, base segment and
+offset, payload length) followed by its deflated payload.  When a store is
+opened, the segment being appended to is cut back to the end of its last
+complete record and index lines that do not point at a complete record are
+dropped from ``index.jsonl``, so a crash mid-write loses only that write.
+
+Files live in a generation directory named by the ``CURRENT`` file under
+the store root.  ``compact()`` writes a new generation beside the old one
+and switches ``CURRENT`` with an atomic rename, so a crash during compaction
+leaves the old generation in use and the partial new one is removed by the
+next ``compact()``.
+"""
+
+import bisect
+import hashlib
+import json
+import mmap
+import os
+import shutil
+import struct
+import time
+import zlib
+
+KEYFRAME_INTERVAL = 32
+SEGMENT_SIZE = 64 << 20
+LEVEL = 6
+CURRENT = "CURRENT"
+
+_KEY, _DELTA = 0, 1
+_HEAD = struct.Struct("<B16sHIQI")  # kind, digest, depth, base segment, base offset, payload size
+_COPY = struct.Struct("<BII")  # 0, first base line, line count
+_INSERT = struct.Struct("<BII")  # 1, line count, byte count; followed by the lines
+
+
+def digest(code):
+    return hashlib.blake2b(code.encode("utf-8"), digest_size=16).digest()
+
+
+def _delta(base, lines):
+    """Encode ``lines`` as copies from ``base`` plus inserted lines."""
+    from diff_analyzer import diff_lines
+
+    out = []
+    for tag, i1, i2, j1, j2 in diff_lines(base, lines):
+        if tag == "equal":
+            out.append(_COPY.pack(0, i1, i2 - i1))
+        elif j2 > j1:
+            text = "\n".join(lines[j1:j2]).encode("utf-8")
+            out.append(_INSERT.pack(1, j2 - j1, len(text)) + text)
+    return b"".join(out)
+
+
+def _apply(base, payload):
+    lines = []
+    pos = 0
+    while pos < len(payload):
+        op, a, b = _COPY.unpack_from(payload, pos)
+        pos += _COPY.size
+        if op == 0:
+            lines.extend(base[a:a + b])
+        else:
+            lines.extend(payload[pos:pos + b].decode("utf-8").split("\n"))
+            pos += b
+    return lines
+
+
+def _generation_number(name):
+    return int(name[4:]) if name.startswith("gen-") and name[4:].isdigit() else 0
+
+
+class SnapshotStore:
+    def __init__(self, root, keyframe_interval=KEYFRAME_INTERVAL, segment_size=SEGMENT_SIZE,
+                 generation=None):
+        self.root = root
+        self.keyframe_interval = keyframe_interval
+        self.segment_size = segment_size
+        self.generation = generation or self._current()
+        self.dir = os.path.join(root, self.generation)
+        os.makedirs(self.dir, exist_ok=True)
+        self._maps = {}  # segment -> mmap
+        self._sessions = {}  # (user, problem) -> sorted [(ts, digest, segment, offset)]
+        self._addr = {}  # digest -> (segment, offset)
+        segments = sorted(int(name[:-4]) for name in os.listdir(self.dir) if name.endswith(".seg"))
+        self._segment = segments[-1] if segments else 0
+        self._sizes = {seg: os.path.getsize(self._seg_path(seg)) for seg in segments}
+        self._out = None
+        self._load_index(self._recover(self._segment) if segments else set())
+
+    def _current(self):
+        try:
+            with open(os.path.join(self.root, CURRENT), encoding="utf-8") as fh:
+                return fh.read().strip()
+        except FileNotFoundError:
+            return "gen-000000"
+
+    def _seg_path(self, seg):
+        return os.path.join(self.dir, f"{seg:06d}.seg")
+
+    @property
+    def _index_path(self):
+        return os.path.join(self.dir, "index.jsonl")
+
+    def _recover(self, seg):
+        """Offsets of the complete records in segment ``seg``, cutting off a torn tail."""
+        size = self._sizes[seg]
+        mm = self._map(seg, size) if size else b""
+        offsets = []
+        off = 0
+        while off + _HEAD.size <= size:
+            kind, _, _, _, _, n = _HEAD.unpack_from(mm, off)
+            if kind not in (_KEY, _DELTA) or n < 8 or off + _HEAD.size + n > size:
+                break  # a deflate stream is at least 8 bytes; zero-filled tails stop here
+            offsets.append(off)
+            off += _HEAD.size + n
+        if offsets:  # the last record must decompress (zlib checks its Adler-32)
+            last = offsets[-1]
+            n = _HEAD.unpack_from(mm, last)[-1]
+            try:
+                zlib.decompress(mm[last + _HEAD.size:last + _HEAD.size + n])
+            except zlib.error:
+                off = offsets.pop()
+        if off < size:
+            self._maps.pop(seg).close()
+            with open(self._seg_path(seg), "r+b") as fh:
+                fh.truncate(off)
+            self._sizes[seg] = off
+        return set(offsets)
+
+    def _valid(self, seg, off, tail):
+        """Whether an index entry points at a complete record."""
+        if seg == self._segment:
+            return off in tail
+        size = self._sizes.get(seg, 0)
+        return off + _HEAD.size <= size and off + _HEAD.size + self._header(seg, off)[-1] <= size
+
+    def _load_index(self, tail):
+        """Load ``index.jsonl``, rewriting it without lines that are torn or point at lost records."""
+        try:
+            fh = open(self._index_path, "rb")
+        except FileNotFoundError:
+            return
+        kept = []
+        dropped = False
+        with fh:
+            for line in fh:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("unterminated")
+                    user, problem, ts, hexdigest, seg, off = json.loads(line)
+                except ValueError:
+                    dropped = True
+                    break  # torn final line
+                if not self._valid(seg, off, tail):
+                    dropped = True
+                    continue
+                kept.append(line)
+                self._remember(user, problem, ts, bytes.fromhex(hexdigest), seg, off)
+        if dropped:
+            tmp = self._index_path + ".tmp"
+            with open(tmp, "wb") as out:
+                out.writelines(kept)
+                out.flush()
+                os.fsync(out.fileno())
+            os.replace(tmp, self._index_path)
+
+    def _remember(self, user, problem, ts, key, seg, off):
+        entries = self._sessions.setdefault((user, problem), [])
+        entry = (ts, key, seg, off)
+        if not entries or entries[-1][0] <= ts:
+            entries.append(entry)
+        else:
+            bisect.insort(entries, entry, key=lambda e: e[0])
+        self._addr.setdefault(key, (seg, off))
+
+    def __len__(self):
+        return sum(map(len, self._sessions.values()))
+
+    def sessions(self):
+        return list(self._sessions)
+
+    # ── Reading ─────────────────────────────────────────────────────
+    def _map(self, seg, end):
+        mm = self._maps.get(seg)
+        if mm is None or len(mm) < end:
+            if self._out is not None:
+                self._out.flush()
+            if mm is not None:
+                mm.close()
+            with open(self._seg_path(seg), "rb") as fh:
+                mm = self._maps[seg] = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        return mm
+
+    def _header(self, seg, off):
+        return _HEAD.unpack_from(self._map(seg, off + _HEAD.size), off)
+
+    def _lines(self, seg, off, decoded, view=None):
+        """Lines of the record at (seg, off), using and filling the ``decoded`` cache.
+
+        ``view`` is an optional (segment, start, bytes) window already read.
+        """
+        key = (seg, off)
+        lines = decoded.get(key)
+        if lines is not None:
+            return lines
+        if view is not None and view[0] == seg and view[1] <= off < view[1] + len(view[2]) - _HEAD.size:
+            buf, pos = view[2], off - view[1]
+        else:
+            buf, pos = self._map(seg, off + _HEAD.size), off
+        kind, _, _, base_seg, base_off, size = _HEAD.unpack_from(buf, pos)
+        if pos + _HEAD.size + size > len(buf):  # runs past the window
+            buf, pos = self._map(seg, off + _HEAD.size + size), off
+        payload = zlib.decompress(buf[pos + _HEAD.size:pos + _HEAD.size + size])
+        if kind == _KEY:
+            lines = payload.decode("utf-8").split("\n")
+        else:
+            lines = _apply(self._lines(base_seg, base_off, decoded, view), payload)
+        decoded[key] = lines
+        return lines
+
+    def get(self, key):
+        """Code for a digest (bytes or hex)."""
+        key = bytes.fromhex(key) if isinstance(key, str) else key
+        if key not in self._addr:
+            raise KeyError(key.hex())
+        return "\n".join(self._lines(*self._addr[key], {}))
+
+    def entries(self, user, problem, start=None, end=None):
+        """Index entries ``(ts, digest, segment, offset)`` with ``start <= ts < end``."""
+        entries = self._sessions.get((user, problem), [])
+        lo = 0 if start is None else bisect.bisect_left(entries, start, key=lambda e: e[0])
+        hi = len(entries) if end is None else bisect.bisect_left(entries, end, key=lambda e: e[0])
+        return entries[lo:hi]
+
+    def load_session(self, user, problem, start=None, end=None):
+        """``[(ts, code), ...]`` for one session, oldest first."""
+        entries = self.entries(user, problem, start, end)
+        decoded = {}
+        spans = {}
+        for _, _, seg, off in entries:
+            lo, hi = spans.get(seg, (off, off))
+            spans[seg] = (min(lo, off), max(hi, off))
+        for seg, (lo, hi) in spans.items():
+            size = self._header(seg, hi)[-1]
+            mm = self._map(seg, hi + _HEAD.size + size)
+            view = (seg, lo, memoryview(mm)[lo:hi + _HEAD.size + size])  # one sequential read
+            try:
+                for _, _, s, off in sorted(e for e in entries if e[2] == seg):
+                    self._lines(s, off, decoded, view)
+            finally:
+                view[2].release()
+        return [(ts, "\n".join(decoded[seg, off])) for ts, _, seg, off in entries]
+
+    def history(self, user, problem, start=None, end=None):
+        """The session as a ``diff_analyzer.AttemptHistory``."""
+        from diff_analyzer import AttemptHistory
+
+        return AttemptHistory(code for _, code in self.load_session(user, problem, start, end))
+
+    # ── Writing ─────────────────────────────────────────────────────
+    def _writer(self, size):
+        end = self._sizes.get(self._segment, 0)
+        if end and end + size > self.segment_size:
+            self.close()
+            self._segment += 1
+            end = 0
+        if self._out is None:
+            self._out = open(self._seg_path(self._segment), "ab")
+            self._index = open(self._index_path, "a", encoding="utf-8")
+        return end
+
+    def _write_record(self, key, lines, base=None):
+        """Append a record; ``base`` is ``(segment, offset, lines, depth)`` to delta against.
+
+        Returns ``(segment, offset, depth)``.
+        """
+        depth = 0 if base is None else base[3] + 1
+        if depth and depth < self.keyframe_interval:
+            base_seg, base_off = base[:2]
+            kind, body = _DELTA, _delta(base[2], lines)
+        else:
+            kind, body, base_seg, base_off, depth = _KEY, "\n".join(lines).encode("utf-8"), 0, 0, 0
+        payload = zlib.compress(body, LEVEL)
+        off = self._writer(_HEAD.size + len(payload))
+        self._out.write(_HEAD.pack(kind, key, depth, base_seg, base_off, len(payload)) + payload)
+        self._sizes[self._segment] = off + _HEAD.size + len(payload)
+        return self._segment, off, depth
+
+    def _index_line(self, user, problem, ts, key, seg, off):
+        self._index.write(json.dumps([user, problem, ts, key.hex(), seg, off]) + "\n")
+        self._remember(user, problem, ts, key, seg, off)
+
+    def put(self, user, problem, code, ts=None):
+        """Save a snapshot of ``code``; returns its hex digest."""
+        ts = time.time() if ts is None else ts
+        key = digest(code)
+        addr = self._addr.get(key)
+        if addr is None:
+            entries = self._sessions.get((user, problem))
+            base = None
+            if entries:
+                _, _, seg, off = entries[-1]
+                base = (seg, off, self._lines(seg, off, {}), self._header(seg, off)[2])
+            addr = self._write_record(key, code.split("\n"), base)[:2]
+            self._out.flush()
+        else:
+            self._writer(0)
+        self._index_line(user, problem, ts, key, *addr)
+        self._index.flush()
+        return key.hex()
+
+    def close(self, sync=False):
+        if self._out is not None:
+            if sync:
+                for fh in (self._out, self._index):
+                    fh.flush()
+                    os.fsync(fh.fileno())
+            self._out.close()
+            self._index.close()
+            self._out = None
+        for mm in self._maps.values():
+            mm.close()
+        self._maps.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ── Maintenance ─────────────────────────────────────────────────
+    def stats(self):
+        """Snapshot count, distinct snapshots, their raw size and the bytes on disk."""
+        raw = sum(len(self.get(key).encode("utf-8")) for key in self._addr)
+        return {"snapshots": len(self), "distinct": len(self._addr), "raw_bytes": raw,
+                "stored_bytes": sum(self._sizes.values())}
+
+    def compact(self):
+        """Rewrite every session's chain contiguously, oldest snapshot first.
+
+        Records shared between sessions are written once per session, so each
+        session reads as one span.  The result is a new generation that
+        replaces the current one only once it is complete.
+        """
+        for name in os.listdir(self.root):  # left by a compaction that crashed
+            if name.startswith("gen-") and name != self.generation:
+                shutil.rmtree(os.path.join(self.root, name))
+        new = f"gen-{_generation_number(self.generation) + 1:06d}"
+        fresh = SnapshotStore(self.root, self.keyframe_interval, self.segment_size, generation=new)
+        for user, problem in self.sessions():
+            written = {}
+            base = None
+            for ts, code in self.load_session(user, problem):
+                key = digest(code)
+                if key not in written:
+                    lines = code.split("\n")
+                    seg, off, depth = fresh._write_record(key, lines, base)
+                    written[key] = seg, off
+                    base = (seg, off, lines, depth)
+                fresh._index_line(user, problem, ts, key, *written[key])
+        fresh.close(sync=True)
+        self.close()
+        marker = os.path.join(self.root, CURRENT)
+        with open(marker + ".tmp", "w", encoding="utf-8") as fh:
+            fh.write(new)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(marker + ".tmp", marker)  # the switch
+        shutil.rmtree(self.dir)
+        self.__init__(self.root, self.keyframe_interval, self.segment_size)
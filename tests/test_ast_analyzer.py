@@ -0,0 +1,105 @@
+import ast_analyzer
+
+FIB = '''
+from functools import lru_cache
+
+def fib(n):
+    if n < 2:
+        return n
+    return fib(n - 1) + fib(n - 2)
+
+def pairs(xs):
+    out = []
+    for i in xs:
+        for j in xs:
+            out.append((i, j))
+    return out
+'''
+
+
+def test_counts_and_complexity():
+    result = ast_analyzer.analyze(FIB)
+    counts = result["counts"]
+    assert counts["functions"] == 2
+    assert counts["recursion"] == 2 and counts["recursive_branching"] == 2
+    assert counts["max_loop_depth"] == 2 and counts["loops"] == 2
+    assert result["complexity"] == "O(2^n)"
+    assert result["concepts"]["recursion"]["used"]
+
+
+BINARY_SEARCH = '''
+def search(a, x, lo, hi):
+    if lo > hi:
+        return -1
+    mid = (lo + hi) // 2
+    if a[mid] == x:
+        return mid
+    elif a[mid] < x:
+        return search(a, x, mid + 1, hi)
+    else:
+        return search(a, x, lo, mid - 1)
+'''
+
+MERGE_SORT = '''
+def merge_sort(a):
+    if len(a) <= 1:
+        return a
+    mid = len(a) // 2
+    return merge(merge_sort(a[:mid]), merge_sort(a[mid:]))
+
+def merge(left, right):
+    out = []
+    while left and right:
+        out.append(left.pop(0) if left[0] <= right[0] else right.pop(0))
+    return out + left + right
+'''
+
+
+def test_recursive_calls_are_counted_per_path():
+    result = ast_analyzer.analyze(BINARY_SEARCH)
+    assert result["counts"]["recursion"] == 2 and result["counts"]["recursive_branching"] == 1
+    assert result["complexity"] == "O(log n)"
+    result = ast_analyzer.analyze(MERGE_SORT)
+    assert result["counts"]["recursive_branching"] == 2
+    assert result["complexity"] == "O(n log n)"
+
+
+def test_complexity_is_the_worst_function():
+    code = BINARY_SEARCH + "\ndef pairs(xs):\n    return [(i, j) for i in xs for j in xs]\n"
+    assert ast_analyzer.analyze(code)["complexity"] == "O(n^2)"
+
+
+def test_loop_depth_is_per_function():
+    code = "for a in x:\n    def g():\n        for b in y:\n            pass\n"
+    assert ast_analyzer.parse_code(code)["max_loop_depth"] == 1
+
+
+def test_deep_expression_does_not_recurse():
+    code = "s = " + " + ".join(f"'{i}'" for i in range(600)) + "\n"
+    counts = ast_analyzer.parse_code(code)
+    assert "error" not in counts and counts["strings"] == 600
+
+
+def test_too_deep_for_the_parser_is_a_result():
+    code = "s = " + " + ".join(f"'{i}'" for i in range(20000)) + "\n"
+    assert "RecursionError" in ast_analyzer.analyze_batch([code], workers=1)[0]["counts"]["error"]
+
+
+def test_syntax_error_is_a_result():
+    assert "SyntaxError" in ast_analyzer.parse_code("def (:\n")["error"]
+
+
+def test_batch_in_process_matches_analyze():
+    codes = [FIB, "x = 1\n", FIB, "def (:\n"]
+    results = ast_analyzer.analyze_batch(codes, workers=1)
+    assert results[0] is results[2]
+    assert results[1]["complexity"] == "O(1)" and results[3]["complexity"] is None
+
+
+def test_parallel_batch_matches_in_process_analysis(monkeypatch):
+    monkeypatch.setattr(ast_analyzer, "MIN_PARALLEL", 2)
+    codes = [f"def f{i}(n):\n    return [x * {i} for x in range(n)]\n" for i in range(6)]
+    codes += [codes[0], "def broken(:\n"]
+    parallel = ast_analyzer.analyze_batch(codes, workers=2, chunksize=2)
+    assert parallel == [ast_analyzer._analyze_uncached(code) for code in codes]
+    assert "error" in parallel[-1]["counts"]
@@ -0,0 +1,34 @@
+import io
+
+from PIL import Image
+
+from deck_assets import EMU_PER_INCH, AssetPipeline
+
+
+def _diagram(path, size=(1200, 800)):
+    im = Image.new("RGB", size, "white")
+    im.paste((30, 60, 200), (100, 100, 700, 500))
+    im.save(path, "PNG")
+    return str(path)
+
+
+def test_variant_is_placed_size_and_shared_through_the_disk_cache(tmp_path):
+    source = _diagram(tmp_path / "diagram.png")
+    cache = tmp_path / "assets"
+    image, width, height = AssetPipeline(str(cache), dpi=100).prepare(source, width=2 * EMU_PER_INCH)
+    assert (width, height) == (2 * EMU_PER_INCH, round(2 * EMU_PER_INCH * 800 / 1200))
+    with Image.open(image) as im:
+        assert im.size == (200, 133)
+    [variant] = cache.iterdir()
+
+    again, _, _ = AssetPipeline(str(cache), dpi=100).prepare(source, width=2 * EMU_PER_INCH)
+    assert again.getvalue() == variant.read_bytes()
+
+
+def test_small_or_unsized_images_pass_through(tmp_path):
+    source = _diagram(tmp_path / "small.png", size=(100, 50))
+    pipeline = AssetPipeline(str(tmp_path / "assets"))
+    assert pipeline.prepare(source) == (source, None, None)
+    image, width, height = pipeline.prepare(source, height=EMU_PER_INCH)
+    assert image == source and (width, height) == (2 * EMU_PER_INCH, EMU_PER_INCH)
+    assert not any((tmp_path / "assets").iterdir())
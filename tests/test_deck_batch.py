@@ -0,0 +1,54 @@
+import os
+
+import pytest
+
+import deck_batch
+from deck_batch import DeckResult, DeckSpec
+
+
+def _fake_chunk(specs):
+    if any(spec.name == "crash" for spec in specs):
+        os._exit(1)  # the worker dies mid-chunk
+    return [DeckResult(spec.name, spec.output, slides=1) for spec in specs]
+
+
+def _specs(names):
+    return [DeckSpec(name, f"{name}.pptx") for name in names]
+
+
+@pytest.mark.parametrize("workers, chunksize", [(1, 1), (2, 3)])
+def test_parallel_fails_only_the_deck_that_kills_its_worker(monkeypatch, workers, chunksize):
+    monkeypatch.setattr(deck_batch, "_render_chunk", _fake_chunk)  # workers are forked
+    names = ["a", "b", "crash", "c", "d", "e", "f", "g"]
+    results = list(deck_batch.render_parallel(_specs(names), workers=workers, chunksize=chunksize))
+    assert [r.name for r in results] == names
+    assert "BrokenProcessPool" in results[names.index("crash")].error
+    assert [r.name for r in results if r.ok] == [n for n in names if n != "crash"]
+
+
+def test_parallel_rejects_bad_chunksize():
+    with pytest.raises(ValueError, match="chunksize"):
+        next(deck_batch.render_parallel(_specs(["a"]), chunksize=0))
+
+
+def test_malformed_jsonl_lines_become_failed_specs(tmp_path):
+    source = tmp_path / "specs.jsonl"
+    source.write_text('{"name": "a"}\n{"name": \n# comment\n{"slides": ["title"]}\n{"name": "b"}\n')
+    specs = list(deck_batch.iter_specs(str(source)))
+    assert [s.name for s in specs] == ["a", f"{source}:2", f"{source}:4", "b"]
+    assert specs[1].error.startswith("bad deck spec:")
+    assert "needs a 'name'" in specs[2].error
+    result = deck_batch.DeckRenderer(str(tmp_path)).render(specs[1])
+    assert not result.ok and result.name == f"{source}:2"
+
+
+def test_malformed_json_files_become_failed_specs(tmp_path):
+    (tmp_path / "a.json").write_text('{"name": "a"}')
+    (tmp_path / "b.json").write_text("[{")
+    (tmp_path / "c.json").write_text('{"name": "c", "slides": "title"}')
+    (tmp_path / "d.jsonl").write_text('{"name": "d", "slides": ["title", {"title": "x"}]}\n')
+    specs = list(deck_batch.iter_specs(str(tmp_path)))
+    assert [s.name for s in specs] == ["a", str(tmp_path / "b.json"), str(tmp_path / "c.json"), "d"]
+    assert specs[1].error.startswith("bad deck spec:")
+    assert "'slides' must be a list" in specs[2].error
+    assert specs[0].error is None and specs[3].slides == ("title", {"title": "x"})
@@ -0,0 +1,34 @@
+import io
+
+import deck_bench
+
+
+def _results(**cases):
+    return {"cases": cases}
+
+
+def test_compare_flags_regressions_and_missing_cases():
+    baseline = _results(a={"wall_s": 1.0, "peak_mem_kb": 100, "output_bytes": 10},
+                        b={"wall_s": 1.0, "peak_mem_kb": 100, "output_bytes": 10})
+    current = _results(a={"wall_s": 1.5, "peak_mem_kb": 100, "output_bytes": 10})
+    out = io.StringIO()
+    regressions = deck_bench.compare(baseline, current, 0.10, stream=out)
+    assert ("b", "missing", None) in regressions
+    assert [r[:2] for r in regressions if r[0] == "a"] == [("a", "wall_s")]
+    assert "❌ b: missing from the results" in out.getvalue()
+
+
+def test_case_runs_without_touching_the_asset_cache(monkeypatch, tmp_path):
+    import deck_assets
+
+    monkeypatch.setattr(deck_assets, "DEFAULT_ASSET_DIR", str(tmp_path / "untouched"))
+    monkeypatch.setattr(deck_assets, "_cache_dir", str(tmp_path / "untouched"))
+    result = deck_bench.run_case("slide:architecture", repeat=1)
+    assert "error" not in result and result["output_bytes"] > 0
+    assert not (tmp_path / "untouched").exists()
+
+
+def test_cases_save_like_main(monkeypatch):
+    calls = []
+    monkeypatch.setattr(deck_bench, "save_package", lambda prs, buf: calls.append(prs) or buf.write(b"x"))
+    assert deck_bench._full_deck() == 1 and len(calls) == 1
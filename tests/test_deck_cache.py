@@ -0,0 +1,97 @@
+import os
+
+from pptx import Presentation
+from pptx.util import Inches, Pt
+
+import deck_textfit
+import generate_ppt as gp
+from deck_cache import SlideCache, build_slide_cached
+
+
+def _two_slides(prs):
+    for label in ("first", "second"):
+        slide = prs.slides.add_slide(prs.slide_layouts[6])
+        gp.add_text_box(slide, Inches(1), Inches(1), Inches(6), Inches(1), label)
+    result = deck_textfit.fit(("overflowing " * 40,), Inches(1), Inches(0.3), 14)
+    deck_textfit.flag(slide, ("overflowing",), result, Inches(0.3))
+
+
+_two_slides.fingerprint = lambda: "two-slides"
+
+
+def _build(cache):
+    prs = Presentation()
+    with deck_textfit.collect() as overflows:
+        build_slide_cached(prs, _two_slides, cache)
+    texts = [[s.text_frame.text for s in slide.shapes if s.has_text_frame] for slide in prs.slides]
+    return texts, [o.slide for o in overflows]
+
+
+def test_entry_holds_every_slide_the_builder_appends(tmp_path):
+    cache = SlideCache(str(tmp_path))
+    fresh = _build(cache)
+    cached = _build(cache)
+    assert (cache.misses, cache.hits) == (1, 1)
+    assert fresh == cached == ([["first"], ["second"]], [2])
+
+
+def test_eviction_bounds_the_whole_cache_without_rescanning(tmp_path, monkeypatch):
+    cache = SlideCache(str(tmp_path), max_bytes=4096)
+    assets = tmp_path / "assets"
+    assets.mkdir()
+    stale = assets / "old.png"
+    stale.write_bytes(b"x" * 3000)
+    os.utime(stale, (0, 0))
+
+    scans = []
+    files = cache._files
+    monkeypatch.setattr(cache, "_files", lambda: scans.append(1) or files())
+    prs = Presentation()
+    for i in range(3):
+        slide = prs.slides.add_slide(prs.slide_layouts[6])
+        slide.shapes.add_textbox(0, 0, Pt(10), Pt(10)).text_frame.text = str(i)
+        cache.store(f"k{i}", prs, [slide])
+    assert not stale.exists()  # the oldest file went, though it isn't a slide entry
+    assert len(scans) < 3 + 1  # one initial scan plus one per eviction, not one per store
+    total = sum(f.stat().st_size for f in tmp_path.rglob("*") if f.is_file())
+    assert total <= 4096
+
+
+def test_helper_module_changes_miss_the_cache(tmp_path, monkeypatch):
+    import importlib
+    import sys
+
+    import deck_cache
+
+    monkeypatch.setattr(deck_cache, "PROJECT_DIR", str(tmp_path))
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(sys, "dont_write_bytecode", True)  # edits below keep the file's size
+    helper = tmp_path / "cache_helper.py"
+    helper.write_text(
+        "from dataclasses import dataclass\n\n"
+        "@dataclass\nclass Style:\n    text: str = 'old'\n\n"
+        "def draw(slide, style):\n    slide.shapes.add_textbox(0, 0, 10, 10).text_frame.text = style.text\n"
+    )
+    (tmp_path / "cache_builder.py").write_text(
+        "import cache_helper\n\n"
+        "def build(prs):\n"
+        "    cache_helper.draw(prs.slides.add_slide(prs.slide_layouts[6]), cache_helper.Style())\n"
+    )
+    import cache_builder
+    import cache_helper
+
+    def texts():
+        deck_cache._func_digests.clear()
+        cache = SlideCache(str(tmp_path / "cache"))
+        prs = Presentation()
+        build_slide_cached(prs, cache_builder.build, cache)
+        return cache.misses, prs.slides[0].shapes[0].text_frame.text
+
+    assert texts() == (1, "old")
+    assert texts() == (0, "old")
+    helper.write_text(helper.read_text().replace("'old'", "'new'"))
+    importlib.reload(cache_helper)
+    assert texts() == (1, "new")
+    helper.write_text(helper.read_text().replace("style.text", "style.text.upper()"))
+    importlib.reload(cache_helper)
+    assert texts() == (1, "NEW")
@@ -0,0 +1,62 @@
+import io
+import zipfile
+
+import numpy as np
+import pytest
+from pptx import Presentation
+from pptx.util import Inches
+
+import deck_charts
+import generate_ppt as gp
+
+
+def _reopen(prs):
+    buf = io.BytesIO()
+    prs.save(buf)
+    buf.seek(0)
+    return Presentation(buf)
+
+
+def test_chart_round_trips_with_gaps_and_workbook():
+    prs = gp.new_presentation()
+    series = {"mean": np.array([1.5, np.nan, 3.0]), "best": np.array([2, 4, np.inf])}
+    deck_charts.chart_slide(prs, "Scores", ["a<b", "c", "d"], series)
+
+    chart = next(s for s in _reopen(prs).slides[0].shapes if s.has_chart).chart
+    assert list(chart.plots[0].categories) == ["a<b", "c", "d"]
+    assert [s.name for s in chart.series] == ["mean", "best"]
+    assert [tuple(s.values) for s in chart.series] == [(1.5, None, 3.0), (2.0, 4.0, None)]
+
+    workbook = chart.part.chart_workbook.xlsx_part.blob
+    with zipfile.ZipFile(io.BytesIO(workbook)) as zf:
+        sheet = zf.read("xl/worksheets/sheet1.xml").decode("utf-8")
+    assert "a&lt;b" in sheet and "<v>1.5</v>" in sheet
+
+
+def test_two_dimensional_series_need_matching_lengths():
+    prs = gp.new_presentation()
+    deck_charts.chart_slide(prs, "Lines", [1, 2], np.array([[1, 2], [3, 4]]),
+                            kind="line", names=["x", "y"])
+    chart = next(s for s in _reopen(prs).slides[0].shapes if s.has_chart).chart
+    assert [tuple(s.values) for s in chart.series] == [(1.0, 2.0), (3.0, 4.0)]
+    with pytest.raises(ValueError, match="categories"):
+        deck_charts.ArrayChartData(["a", "b", "c"], {"x": [1, 2]})
+    with pytest.raises(ValueError, match="Unknown chart kind"):
+        deck_charts.chart_slide(prs, "Pie", [1], {"x": [1]}, kind="pie")
+
+
+def test_heatmap_table_cells_and_limits():
+    prs = gp.new_presentation()
+    values = np.array([[0.0, 50.0], [np.nan, 100.0]])
+    deck_charts.heatmap_slide(prs, "Mastery", values, ["s1", "s2"], ["loops", "recursion"])
+
+    table = next(s for s in _reopen(prs).slides[0].shapes if s.has_table).table
+    cells = [[cell.text for cell in row.cells] for row in table.rows]
+    assert cells == [["", "loops", "recursion"], ["s1", "0", "50"], ["s2", "", "100"]]
+
+    slide = prs.slides[0]
+    with pytest.raises(ValueError, match="labels"):
+        deck_charts.add_heatmap_table(slide, 0, 0, Inches(1), Inches(1), values, ["s1"], ["a", "b"])
+    with pytest.raises(ValueError, match="limited"):
+        deck_charts.add_heatmap_table(slide, 0, 0, Inches(1), Inches(1), np.zeros((1, 80)),
+                                      ["r"], [str(i) for i in range(80)])
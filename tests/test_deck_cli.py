@@ -0,0 +1,25 @@
+import deck_cli
+from deck_batch import DeckSpec
+
+
+def test_build_reports_unreadable_sources(tmp_path, capsys):
+    assert deck_cli.main(["build", str(tmp_path / "nope.json")]) == 1
+    assert capsys.readouterr().out.startswith("❌")
+
+
+def test_check_spec_finds_problems():
+    builders = deck_cli.builder_names()
+    assert "title" in builders
+    spec = DeckSpec("d", "d.pptx", slides=("title", "nope", {"elements": 1}), template="missing.pptx")
+    problems = deck_cli.check_spec(spec, builders)
+    assert len(problems) == 3
+    assert deck_cli.check_spec(DeckSpec("ok", "ok.pptx", slides=("title",)), builders) == []
+
+
+def test_dry_run_lists_output_under_out_dir(tmp_path, capsys):
+    source = tmp_path / "specs.jsonl"
+    source.write_text('{"name": "a", "slides": ["title"]}\n')
+    out_dir = tmp_path / "out"
+    assert deck_cli.main(["build", str(source), "--out-dir", str(out_dir),
+                          "--cache-dir", str(tmp_path / "cache"), "--dry-run"]) == 0
+    assert f"would build {out_dir / 'a.pptx'}" in capsys.readouterr().out
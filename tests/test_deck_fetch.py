@@ -0,0 +1,62 @@
+import asyncio
+import io
+import os
+
+import deck_fetch
+from deck_fetch import STUDENT_ENDPOINTS, ApiClient, StubApi
+
+
+class _OddStub(StubApi):
+    def _route(self, path, query):
+        if path == STUDENT_ENDPOINTS["overview"] and query.get("student") == ["odd"]:
+            return 200, ["unexpected"]
+        return super()._route(path, query)
+
+
+def test_host_header_carries_non_default_port():
+    assert b"Host: api.example.com:8080\r\n" in ApiClient("http://api.example.com:8080")._head("GET", "/", None)
+    assert b"Host: api.example.com\r\n" in ApiClient("https://api.example.com:443/api")._head("GET", "/", None)
+
+
+def test_bad_record_is_reported_and_others_are_built(tmp_path):
+    out = io.StringIO()
+
+    async def run():
+        stub = _OddStub(latency=0)
+        url = await stub.start()
+        try:
+            async with ApiClient(url, max_connections=2) as client:
+                return await deck_fetch.build_student_decks(
+                    client, ["ana", "odd", "bo"], str(tmp_path), concurrency=2,
+                    stream=out, render_backlog=1)
+        finally:
+            await stub.close()
+
+    assert asyncio.run(run()) == 1
+    lines = out.getvalue().splitlines()
+    assert any(line.startswith("❌ odd: AttributeError") for line in lines)
+    assert sorted(os.listdir(tmp_path)) == ["ana_report.pptx", "bo_report.pptx"]
+
+
+def test_closing_the_stream_cancels_pending_loads(monkeypatch):
+    cancelled = []
+
+    async def load_student(client, student, month=None):
+        if student != "s0":
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(student)
+                raise
+        return {"student": student}
+
+    monkeypatch.setattr(deck_fetch, "load_student", load_student)
+
+    async def run():
+        records = deck_fetch.stream_students(None, [f"s{i}" for i in range(6)], concurrency=4)
+        assert (await records.__anext__())["student"] == "s0"
+        await records.aclose()
+        await asyncio.sleep(0)
+        return sorted(cancelled)  # before asyncio.run cancels whatever is left
+
+    assert asyncio.run(run()) == ["s1", "s2", "s3"]  # s4 was cancelled before it started
@@ -0,0 +1,28 @@
+import os
+
+import deck_cache
+import deck_manifest
+
+
+def test_manifest_tracks_inputs_and_missing_inputs(tmp_path):
+    output = tmp_path / "deck.pptx"
+    output.write_bytes(b"deck")
+    asset = tmp_path / "asset.png"
+    asset.write_bytes(b"png")
+    absent = tmp_path / "later.png"
+    deck_manifest.write(str(tmp_path), str(output), "key", 1, "spec", [str(asset), str(absent)])
+    assert deck_manifest.is_fresh(str(tmp_path), str(output), "spec") is not None
+    assert deck_manifest.is_fresh(str(tmp_path), str(output), "other spec") is None
+
+    absent.write_bytes(b"png")  # the optional input appears
+    assert deck_manifest.is_fresh(str(tmp_path), str(output), "spec") is None
+    os.remove(absent)
+
+    asset.write_bytes(b"changed")
+    assert deck_manifest.is_fresh(str(tmp_path), str(output), "spec") is None
+
+
+def test_absent_asset_constants_are_noted(tmp_path):
+    absent = str(tmp_path / "diagram.png")
+    deck_cache._value_token(absent)
+    assert absent in deck_manifest.hashed_paths()
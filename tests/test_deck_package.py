@@ -0,0 +1,85 @@
+import io
+import os
+import zipfile
+
+import pytest
+from pptx import Presentation
+
+import generate_ppt as gp
+from deck_package import package_bytes, save_package
+
+
+def _deck():
+    prs = gp.new_presentation()
+    for name in ("title", "architecture"):
+        gp.SLIDE_BUILDERS[name](prs)
+    return prs
+
+
+def _parts(blob):
+    with zipfile.ZipFile(io.BytesIO(blob)) as zf:
+        assert zf.testzip() is None
+        return {info.filename: zf.read(info) for info in zf.infolist()}
+
+
+def test_round_trip_matches_python_pptx(tmp_path):
+    prs = _deck()
+    reference = io.BytesIO()
+    prs.save(reference)
+    path = tmp_path / "deck.pptx"
+    save_package(prs, str(path), workers=3)
+
+    assert _parts(path.read_bytes()) == _parts(reference.getvalue())
+    reopened = Presentation(str(path))
+    assert len(reopened.slides) == 2
+    assert [shape.shape_type for shape in reopened.slides[1].shapes] == \
+           [shape.shape_type for shape in prs.slides[1].shapes]
+
+
+def test_output_is_reproducible_and_stores_media():
+    prs = _deck()
+    blob = package_bytes(prs, workers=2)
+    assert blob == package_bytes(prs, workers=5)
+    with zipfile.ZipFile(io.BytesIO(blob)) as zf:
+        infos = zf.infolist()
+    assert {info.date_time for info in infos} == {(1980, 1, 1, 0, 0, 0)}
+    media = [info for info in infos if info.filename.endswith(".png")]
+    assert media and all(info.compress_type == zipfile.ZIP_STORED for info in media)
+
+
+def test_level_zero_stores_everything_and_bad_levels_raise():
+    prs = _deck()
+    with zipfile.ZipFile(io.BytesIO(package_bytes(prs, level=0))) as zf:
+        assert {info.compress_type for info in zf.infolist()} == {zipfile.ZIP_STORED}
+    with pytest.raises(ValueError):
+        package_bytes(prs, level=10)
+
+
+def test_part_failure_propagates_and_closes_the_file(tmp_path, monkeypatch):
+    import deck_package
+
+    def broken(name, source, level):
+        raise RuntimeError(f"cannot compress {name}")
+
+    monkeypatch.setattr(deck_package, "_compress", broken)
+    with open(tmp_path / "deck.pptx", "wb") as fh:
+        with pytest.raises(RuntimeError, match="cannot compress"):
+            save_package(_deck(), fh)
+        assert not fh.closed  # caller's stream is left to the caller
+
+
+def test_failed_save_to_a_path_keeps_the_previous_file(tmp_path, monkeypatch):
+    import deck_package
+
+    path = tmp_path / "deck.pptx"
+    save_package(_deck(), str(path))
+    before = path.read_bytes()
+
+    def broken(name, source, level):
+        raise RuntimeError(f"cannot compress {name}")
+
+    monkeypatch.setattr(deck_package, "_compress", broken)
+    with pytest.raises(RuntimeError, match="cannot compress"):
+        save_package(_deck(), path)
+    assert path.read_bytes() == before
+    assert os.listdir(tmp_path) == ["deck.pptx"]  # no temporary file left behind
@@ -0,0 +1,44 @@
+from pptx import Presentation
+from pptx.oxml.ns import qn
+from pptx.util import Inches
+
+import generate_ppt as gp
+from deck_prototype import advantage_grid_prototype
+
+
+def _texts(slide):
+    return [shape.text_frame.text for shape in slide.shapes if shape.has_text_frame]
+
+
+def test_stamp_fills_slots_and_keeps_later_shapes(tmp_path):
+    proto = advantage_grid_prototype(cards=1)
+    prs = gp.new_presentation()
+    slide = proto.stamp(prs, {"title": "Ana", "subtitle": "Strengths",
+                              "card0.title": "Recursion", "card0.body": ["base case", "memo"]})
+    slide.shapes.add_textbox(Inches(1), Inches(6), Inches(3), Inches(0.5)).text_frame.text = "added"
+    path = tmp_path / "stamped.pptx"
+    prs.save(path)
+
+    texts = _texts(Presentation(path).slides[0])
+    assert "Ana" in texts and "Strengths" in texts and "added" in texts
+    assert "base case\nmemo" in texts
+    assert not any("{{" in text for text in texts)
+
+
+def test_stamped_text_is_measured_in_its_box(monkeypatch):
+    import deck_textfit
+
+    proto = advantage_grid_prototype(cards=1)
+    values = {"title": "Ana", "subtitle": "Strengths", "card0.title": "Recursion",
+              "card0.body": [f"note {i} " * 8 for i in range(12)]}
+    prs = gp.new_presentation()
+    with deck_textfit.collect() as overflows:
+        proto.stamp(prs, values)
+        proto.stamp(prs, {**values, "card0.body": ["short"]})
+    assert [o.slide for o in overflows] == [1]
+    assert overflows[0].text.startswith("note 0") and overflows[0].size == 13
+
+    monkeypatch.setattr(gp, "TEXT_FIT", "shrink")
+    slide = proto.stamp(prs, values)
+    body = next(s for s in slide.shapes if s.has_text_frame and s.text_frame.text.startswith("note"))
+    assert int(body._element.find(f".//{qn('a:defRPr')}").get("sz")) < 1300
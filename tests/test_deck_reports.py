@@ -0,0 +1,55 @@
+import pytest
+from pptx import Presentation
+
+import deck_reports
+from deck_reports import AttemptStore
+
+CSV = """student,concept,timestamp,seconds,passed,total,error
+ana,arrays;hashing,2026-09-02T10:00:00Z,60,3,3,
+ana,arrays,2026-09-03T10:00:00Z,30,1,3,off_by_one
+ana,arrays,2026-09-04T10:00:00Z,30,3,3,
+bo,graphs,2026-09-05T10:00:00Z,90,0,2,timeout
+bo,graphs,2026-08-20T10:00:00Z,90,2,2,
+"""
+
+
+@pytest.fixture
+def store(tmp_path):
+    export = tmp_path / "export.csv"
+    export.write_text(CSV)
+    store = AttemptStore(str(tmp_path / "store"))
+    assert store.ingest(str(export)) == 6  # one row per attempt and concept
+    return AttemptStore(str(tmp_path / "store"))
+
+
+def test_store_round_trip_and_aggregate(store):
+    assert store.vocab["student"] == ["ana", "bo"]
+    assert sorted(store.vocab["concept"]) == ["arrays", "graphs", "hashing"]
+    agg = deck_reports.aggregate(store, "2026-09")
+    ana, arrays = agg.student_index("ana"), agg.concept_index("arrays")
+    assert agg.passed[ana, arrays] == 7 and agg.total[ana, arrays] == 9
+    bo, graphs = agg.student_index("bo"), agg.concept_index("graphs")
+    assert agg.prev_total[bo, graphs] == 2 and agg.delta[bo, graphs] < 0
+
+
+def test_unknown_ids_have_a_clear_error(store):
+    agg = deck_reports.aggregate(store, "2026-09")
+    with pytest.raises(ValueError, match="unknown student 'cy'"):
+        deck_reports.monthly_report(agg, "cy")
+    with pytest.raises(ValueError, match="unknown concept 'trees'"):
+        deck_reports.mastery_slide(None, agg, concepts=["trees"])
+
+
+def test_empty_student_id_is_rejected(tmp_path):
+    export = tmp_path / "export.csv"
+    export.write_text("student,concept,timestamp\n,arrays,1788220800\n")
+    store = AttemptStore(str(tmp_path / "store"))
+    with pytest.raises(ValueError, match="student must not be empty"):
+        store.ingest(str(export))
+    assert len(store) == 0
+
+
+def test_build_reports_saves_a_deck(store, tmp_path):
+    output = tmp_path / "reports.pptx"
+    slides = deck_reports.build_reports(store, "2026-09", output=str(output))
+    assert slides == 4 and len(Presentation(output).slides) == 4
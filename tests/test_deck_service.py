@@ -0,0 +1,118 @@
+import asyncio
+import os
+import time
+
+import deck_service
+from deck_batch import DeckSpec
+
+
+def _fake_render(spec, output=None):
+    if spec.name == "crash":
+        os._exit(1)
+    if spec.name == "slow":
+        time.sleep(0.6)
+    return b"deck", 1
+
+
+def _fake_init(cache_dir, templates):
+    pass
+
+
+def _service(monkeypatch, **options):
+    monkeypatch.setattr(deck_service, "_render", _fake_render)  # workers are forked
+    monkeypatch.setattr(deck_service, "_init_worker", _fake_init)
+    return deck_service.DeckService(workers=1, cache_dir=None, **options)
+
+
+async def _outcome(job):
+    try:
+        return await job.done
+    except Exception as exc:
+        return exc
+
+
+def test_dead_worker_fails_its_job_and_the_pool_is_replaced(monkeypatch):
+    async def run():
+        service = _service(monkeypatch)
+        await service.start()
+        try:
+            crashed = await _outcome(service.submit(DeckSpec("crash", "crash.pptx")))
+            after = await _outcome(service.submit(DeckSpec("ok", "ok.pptx")))
+            return crashed, after, service.stats()
+        finally:
+            await service.close()
+
+    crashed, after, stats = asyncio.run(run())
+    assert "BrokenProcessPool" in str(crashed)
+    assert after == b"deck"
+    assert stats["pool_restarts"] == 1
+
+
+def test_timed_out_job_holds_its_worker_until_it_finishes(monkeypatch):
+    async def run():
+        service = _service(monkeypatch, timeout=0.2)
+        await service.start()
+        try:
+            slow = service.submit(DeckSpec("slow", "slow.pptx"))
+            assert isinstance(await _outcome(slow), TimeoutError)
+            overrunning = service.stats()["overrunning"]
+            service.timeout = 5.0
+            start = time.monotonic()
+            after = await _outcome(service.submit(DeckSpec("ok", "ok.pptx")))
+            return overrunning, after, time.monotonic() - start, service.stats()
+        finally:
+            await service.close()
+
+    overrunning, after, waited, stats = asyncio.run(run())
+    assert overrunning == 1
+    assert after == b"deck" and waited > 0.2  # queued behind the overrunning deck
+    assert stats["overrunning"] == 0
+
+
+class _Writer:
+    def __init__(self):
+        self.data = b""
+
+    def write(self, data):
+        self.data += data
+
+    async def drain(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def _exchange(request):
+    async def run():
+        reader = asyncio.StreamReader()
+        reader.feed_data(request)
+        reader.feed_eof()
+        writer = _Writer()
+        await deck_service.DeckService(workers=1).serve_client(reader, writer)
+        return writer.data
+
+    return asyncio.run(run())
+
+
+def test_malformed_request_line_gets_400():
+    assert _exchange(b"GARBAGE\r\n\r\n").startswith(b"HTTP/1.1 400 Bad Request")
+
+
+def test_malformed_content_length_gets_400():
+    for length in (b"ten", b"-5"):
+        reply = _exchange(b"POST /decks HTTP/1.1\r\nContent-Length: " + length + b"\r\n\r\n{}")
+        assert reply.startswith(b"HTTP/1.1 400 Bad Request") and b"Connection: close" in reply
+
+
+def test_background_jobs_get_their_own_timeout(monkeypatch):
+    async def run():
+        service = _service(monkeypatch, timeout=0.2, job_timeout=5.0)
+        await service.start()
+        try:
+            job = service.submit(DeckSpec("slow", "slow.pptx"), background=True)
+            return await _outcome(job), job.state
+        finally:
+            await service.close()
+
+    assert asyncio.run(run()) == (b"deck", "done")  # outlived the 0.2s request timeout
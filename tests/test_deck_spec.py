@@ -0,0 +1,84 @@
+import json
+
+import pytest
+from pptx import Presentation
+from pptx.enum.shapes import MSO_SHAPE_TYPE
+
+import deck_spec
+import generate_ppt as gp
+
+
+def _spec(title, cards):
+    return {"background": "BG_DARK", "elements": [
+        {"type": "heading", "text": title, "color": "RED_ACCENT"},
+        {"type": "card_grid", "columns": 2,
+         "items": [{"title": t, "body": [b]} for t, b in cards]},
+    ]}
+
+
+def _texts(slide):
+    return [shape.text_frame.text for shape in slide.shapes if shape.has_text_frame]
+
+
+def test_content_variants_share_one_plan_and_render_their_text():
+    one = _spec("Alice", [("Loops", "ok"), ("Recursion", "weak")])
+    two = _spec("Bob", [("Sorting", "good"), ("Graphs", "none")])
+    assert deck_spec.compile_spec(one) is deck_spec.compile_spec(two)
+
+    prs = gp.new_presentation()
+    deck_spec.render_spec(prs, one)
+    deck_spec.render_spec(prs, two)
+    assert "Alice" in _texts(prs.slides[0]) and "Bob" in _texts(prs.slides[1])
+    assert any("Recursion" in text for text in _texts(prs.slides[0]))
+    assert not any("Recursion" in text for text in _texts(prs.slides[1]))
+
+
+def test_spec_file_round_trip_and_fingerprint(tmp_path):
+    path = tmp_path / "problem.json"
+    path.write_text(json.dumps(_spec("Problem", [("A", "x")])), encoding="utf-8")
+    slide = deck_spec.resolve_slide(str(path))
+    assert slide.__qualname__ == "problem"
+
+    prs = gp.new_presentation()
+    slide(prs)
+    out = tmp_path / "deck.pptx"
+    prs.save(str(out))
+    assert "Problem" in _texts(Presentation(str(out)).slides[0])
+
+    same = deck_spec.SpecSlide(_spec("Problem", [("A", "x")]))
+    other = deck_spec.SpecSlide(_spec("Problem", [("A", "y")]))
+    assert slide.fingerprint() == same.fingerprint() != other.fingerprint()
+
+
+@pytest.mark.parametrize("spec, message", [
+    ({"elements": [{"type": "wobble"}]}, "Unknown element type"),
+    ({"elements": [{"type": "text", "box": [1, 2]}]}, "'box'"),
+    ({"elements": [{"type": "heading", "text": "x", "color": "NOT_A_COLOUR"}]}, "Unknown colour"),
+    ({"elements": [{"type": "text", "box": [1, 1, 2, 1], "align": "middle"}]},
+     r"text \(element 0\): 'align'"),
+    ({"elements": [{"type": "picture", "box": [1, 1]}]}, r"picture \(element 0\): needs a 'path'"),
+])
+def test_bad_specs_raise_spec_error(spec, message):
+    with pytest.raises(deck_spec.SpecError, match=message):
+        deck_spec.compile_spec(spec)
+
+
+def test_load_spec_needs_elements(tmp_path):
+    path = tmp_path / "empty.json"
+    path.write_text("{}", encoding="utf-8")
+    with pytest.raises(deck_spec.SpecError, match="elements"):
+        deck_spec.load_spec(str(path))
+
+
+def test_spec_file_pictures_are_relative_to_the_file(tmp_path, monkeypatch):
+    from PIL import Image
+
+    (tmp_path / "specs").mkdir()
+    Image.new("RGB", (8, 8), "red").save(tmp_path / "specs" / "dot.png")
+    path = tmp_path / "specs" / "pic.json"
+    path.write_text(json.dumps({"elements": [
+        {"type": "picture", "path": "dot.png", "box": [1, 1, 1, 1]}]}), encoding="utf-8")
+    monkeypatch.chdir(tmp_path)
+    prs = gp.new_presentation()
+    deck_spec.resolve_slide(str(path))(prs)
+    assert [shape.shape_type for shape in prs.slides[0].shapes] == [MSO_SHAPE_TYPE.PICTURE]
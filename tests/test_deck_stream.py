@@ -0,0 +1,56 @@
+from pptx import Presentation
+from pptx.util import Inches
+
+import generate_ppt as gp
+from deck_stream import stream_deck
+
+
+def _labelled(*labels):
+    def build(prs):
+        for label in labels:
+            slide = prs.slides.add_slide(prs.slide_layouts[6])
+            gp.add_text_box(slide, Inches(1), Inches(1), Inches(6), Inches(1), label)
+    return build
+
+
+def _texts(path):
+    return [[s.text_frame.text for s in slide.shapes if s.has_text_frame]
+            for slide in Presentation(path).slides]
+
+
+def test_streams_every_new_slide(tmp_path):
+    path = tmp_path / "streamed.pptx"
+    count = stream_deck(str(path), [_labelled("one", "two"), _labelled(), _labelled("three")])
+    assert count == 3
+    assert _texts(path) == [["one"], ["two"], ["three"]]
+
+
+def test_streamed_deck_matches_in_memory_build(tmp_path):
+    builders = [gp.SLIDE_BUILDERS["title"], gp.SLIDE_BUILDERS["architecture"]]
+    path = tmp_path / "streamed.pptx"
+    stream_deck(str(path), builders)
+    memory = tmp_path / "memory.pptx"
+    gp.build_deck(gp.new_presentation(), builders).save(memory)
+    assert _texts(path) == _texts(memory)
+
+
+def _chart(title, values, notes=None):
+    import deck_charts
+
+    def build(prs):
+        slide = deck_charts.chart_slide(prs, title, ["a", "b", "c"], {"score": values})
+        if notes:
+            slide.notes_slide.notes_text_frame.text = notes
+    return build
+
+
+def test_streams_the_parts_a_slide_owns(tmp_path):
+    path = tmp_path / "charts.pptx"
+    stream_deck(str(path), [_chart("one", [1, 2, 3], notes="first"), _labelled("plain"),
+                            _chart("two", [4, 5, 6])])
+    slides = Presentation(str(path)).slides
+    charts = [next(s for s in slide.shapes if s.has_chart).chart for slide in (slides[0], slides[2])]
+    assert [tuple(c.series[0].values) for c in charts] == [(1.0, 2.0, 3.0), (4.0, 5.0, 6.0)]
+    assert charts[0].part.partname != charts[1].part.partname
+    assert charts[1].part.chart_workbook.xlsx_part.blob
+    assert slides[0].notes_slide.notes_text_frame.text == "first"
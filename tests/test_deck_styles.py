@@ -0,0 +1,26 @@
+from pptx.util import Inches
+
+import generate_ppt as gp
+from deck_styles import ShapeStyle, TextStyle, add_styled_shape, add_styled_text
+
+
+def test_shape_ids_stay_unique_across_mixed_adds():
+    prs = gp.new_presentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[6])
+    box = (Inches(1), Inches(1), Inches(2), Inches(1))
+    add_styled_shape(slide, *box, ShapeStyle(gp.ACCENT))
+    slide.shapes.add_textbox(*box)  # python-pptx's own add in between
+    add_styled_text(slide, *box, ["a", "b"], TextStyle(size=12))
+    add_styled_shape(slide, *box, ShapeStyle(gp.ACCENT, geometry="rect"))
+    ids = [shape.shape_id for shape in slide.shapes]
+    assert len(ids) == len(set(ids)) == 4
+    assert not slide.shapes.turbo_add_enabled
+
+
+def test_styled_text_keeps_paragraphs_and_style():
+    prs = gp.new_presentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[6])
+    shape = add_styled_text(slide, Inches(1), Inches(1), Inches(4), Inches(1),
+                            ["first", "second\nline"], TextStyle(size=14, bold=True))
+    assert [p.text for p in shape.text_frame.paragraphs] == ["first", "second\vline"]
+    assert b'sz="1400"' in shape._element.xml.encode()
@@ -0,0 +1,43 @@
+from pptx.util import Inches
+
+import deck_textfit
+import generate_ppt as gp
+from deck_cache import SlideCache, build_deck_cached
+
+
+def _title(prs):
+    slide = prs.slides.add_slide(prs.slide_layouts[6])
+    gp.add_text_box(slide, Inches(1), Inches(1), Inches(6), Inches(1), "Fits", font_size=24)
+
+
+def _crowded(prs):
+    slide = prs.slides.add_slide(prs.slide_layouts[6])
+    gp.add_text_box(slide, Inches(1), Inches(1), Inches(2), Inches(0.4),
+                    "far too many words for a box this small " * 4, font_size=18)
+
+
+def test_wrap_and_fit():
+    assert deck_textfit.wrap("aaa bbb", deck_textfit.text_width("aaa", 10) + 1, 10) == ["aaa", "bbb"]
+    fit = deck_textfit.fit(("one two three four five six",), Inches(1), Inches(2), 24.0)
+    assert fit.fits and fit.size < 24
+
+
+def test_flags_outside_collect_are_dropped():
+    prs = gp.new_presentation()
+    _crowded(prs)
+    with deck_textfit.collect() as overflows:
+        pass
+    assert overflows == []
+
+
+def test_cached_slides_report_their_overflows(tmp_path):
+    cache = SlideCache(str(tmp_path))
+    runs = []
+    for _ in range(2):
+        with deck_textfit.collect() as overflows:
+            build_deck_cached(gp.new_presentation(), [_title, _crowded], cache)
+        runs.append(overflows)
+    assert cache.hits == 2
+    assert len(runs[0]) == 1 and runs[0][0].slide == 2
+    assert runs[1] == runs[0]
+    assert deck_textfit.report(runs[1])[0].startswith("⚠️  1 text box(es) overflow")
@@ -0,0 +1,36 @@
+import json
+
+import deck_trace
+import generate_ppt as gp
+
+
+def test_spans_are_shared_no_ops_when_disabled(monkeypatch):
+    monkeypatch.setattr(deck_trace, "_tracer", None)
+    assert deck_trace.span("save") is deck_trace.span("load")
+    namespace = {"slide_title": gp.slide_title, "add_text_box": gp.add_text_box}
+    deck_trace.instrument(namespace)
+    assert namespace == {"slide_title": gp.slide_title, "add_text_box": gp.add_text_box}
+
+
+def test_instrumented_build_counts_calls_and_writes_a_trace(monkeypatch, tmp_path):
+    target = tmp_path / "trace.json"
+    tracer = deck_trace.Tracer(str(target))
+    monkeypatch.setattr(deck_trace, "_tracer", tracer)
+    namespace = {"slide_title": gp.slide_title, "add_text_box": gp.add_text_box,
+                 "not_a_helper": gp.new_presentation}
+    deck_trace.instrument(namespace)
+    assert namespace["not_a_helper"] is gp.new_presentation
+
+    prs = gp.new_presentation()
+    with deck_trace.span("build"):
+        namespace["slide_title"](prs)
+        namespace["add_text_box"](prs.slides[0], 0, 0, 100, 100, "extra")
+    calls, _, shapes, elements = tracer.stats["slide_title"]
+    assert calls == 1 and shapes == len(prs.slides[0].shapes) - 1 and elements > shapes
+    assert tracer.stats["add_text_box"][:1] == [1] and tracer.stats["add_text_box"][2] == 1
+    assert "slide_title" in tracer.table()
+
+    tracer.flush()
+    events = json.loads(target.read_text(encoding="utf-8"))["traceEvents"]
+    assert {e["name"] for e in events} == {"slide_title", "add_text_box", "build"}
+    assert all(e["ph"] == "X" and e["dur"] >= 0 for e in events)
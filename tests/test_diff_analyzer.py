@@ -0,0 +1,57 @@
+import random
+
+import diff_analyzer
+from diff_analyzer import AttemptHistory
+
+
+def _apply(a, b, ops):
+    """Rebuild ``b`` from ``a`` using only the opcodes (and ``b`` for inserted text)."""
+    out = []
+    for tag, i1, i2, j1, j2 in ops:
+        out.extend(a[i1:i2] if tag == "equal" else b[j1:j2])
+    return out
+
+
+def _edit(lines, rnd):
+    lines = list(lines)
+    for _ in range(rnd.randrange(1, 4)):
+        pos = rnd.randrange(len(lines) + 1)
+        op = rnd.randrange(3)
+        if op == 0 or not lines:
+            lines.insert(pos, f"x = {rnd.randrange(100)}")
+        elif op == 1:
+            del lines[min(pos, len(lines) - 1)]
+        else:
+            lines[min(pos, len(lines) - 1)] += "  # changed"
+    return lines
+
+
+def test_diff_lines_round_trip():
+    rnd = random.Random(7)
+    for _ in range(200):
+        a = [rnd.choice("abcd") for _ in range(rnd.randrange(30))]
+        b = [rnd.choice("abcd") for _ in range(rnd.randrange(30))]
+        ops = diff_analyzer.diff_lines(a, b)
+        assert _apply(a, b, ops) == b
+        assert all(a[i1:i2] == b[j1:j2] for tag, i1, i2, j1, j2 in ops if tag == "equal")
+
+
+def test_history_composed_diffs_round_trip_and_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(diff_analyzer, "COMPOSED_CACHE", 4)
+    rnd = random.Random(3)
+    snapshots = [[f"line {i}" for i in range(20)]]
+    for _ in range(12):
+        snapshots.append(_edit(snapshots[-1], rnd))
+    history = AttemptHistory("\n".join(s) for s in snapshots)
+    for i in range(len(snapshots)):
+        for j in range(i, len(snapshots)):
+            a, b = history.lines[i], history.lines[j]
+            assert _apply(a, b, history.diff(i, j)) == b
+    assert len(history._composed) == 4
+
+
+def test_summaries_and_hotspots():
+    history = AttemptHistory(["a\nb\nc", "a\nB\nc", "a\nB2\nc\nd"])
+    assert diff_analyzer.summarize_changes(history.diff(0, 2)) == "1 line changed, 1 added"
+    assert history.hotspots(1) == [(2, 2, "B2")]
+    assert diff_analyzer.compute_diff("a\nb", "a\nc") == ["@@ -1,2 +1,2 @@", " a", "-b", "+c"]
@@ -0,0 +1,50 @@
+import os
+
+from snapshot_store import SnapshotStore
+
+CODES = ["def f():\n    return 1\n", "def f():\n    return 2\n", "def f(x):\n    return x\n"]
+
+
+def _seg(store):
+    return store._seg_path(store._segment)
+
+
+def test_round_trip_and_dedup(tmp_path):
+    with SnapshotStore(str(tmp_path), keyframe_interval=2) as store:
+        for ts, code in enumerate(CODES + CODES[:1]):
+            store.put("u1", "p1", code, ts=ts)
+    with SnapshotStore(str(tmp_path)) as store:
+        assert store.load_session("u1", "p1") == list(enumerate(CODES + CODES[:1]))
+        assert store.stats()["snapshots"] == 4
+
+
+def test_torn_tail_is_cut_and_index_line_dropped(tmp_path):
+    with SnapshotStore(str(tmp_path)) as store:
+        store.put("u1", "p1", CODES[0], ts=1)
+        store.put("u1", "p1", CODES[1], ts=2)
+        path = _seg(store)
+    with open(path, "r+b") as fh:  # crash part-way through the second record
+        fh.truncate(os.path.getsize(path) - 3)
+    with SnapshotStore(str(tmp_path)) as store:
+        assert store.load_session("u1", "p1") == [(1, CODES[0])]
+        store.put("u1", "p1", CODES[2], ts=3)
+    with SnapshotStore(str(tmp_path)) as store:
+        assert store.load_session("u1", "p1") == [(1, CODES[0]), (3, CODES[2])]
+        store.put("u2", "p1", CODES[1], ts=4)  # the lost digest is written again, not reused
+        assert store.load_session("u2", "p1") == [(4, CODES[1])]
+
+
+def test_compact_keeps_sessions_and_ignores_stale_generation(tmp_path):
+    with SnapshotStore(str(tmp_path)) as store:
+        for ts, code in enumerate(CODES):
+            store.put("u1", "p1", code, ts=ts)
+            store.put("u2", "p2", code, ts=ts)
+    os.makedirs(tmp_path / "gen-000001")  # left by a compaction that crashed
+    (tmp_path / "gen-000001" / "000000.seg").write_bytes(b"garbage")
+    with SnapshotStore(str(tmp_path)) as store:
+        store.compact()
+        assert store.generation == "gen-000001"
+        assert store.load_session("u2", "p2") == list(enumerate(CODES))
+    assert sorted(os.listdir(tmp_path)) == ["CURRENT", "gen-000001"]
+    with SnapshotStore(str(tmp_path)) as store:
+        assert store.load_session("u1", "p1") == list(enumerate(CODES))